@@ -0,0 +1,76 @@
+"""End-to-end crawl benchmark against the local fixture site
+
+Serves a synthetic site (see fixture_site.py), crawls it with WebCrawler
+into a temporary directory and reports pages/sec, peak RSS and the
+per-stage timing summary. Everything runs offline; JS-rendered pages need
+Chrome and --renderer auto or browser.
+
+    uv run python benchmarks/bench_crawl.py --pages 300 --renderer http --workers 4
+    uv run python benchmarks/bench_crawl.py --pages 100 --js-fraction 0.2 --renderer auto
+    uv run python benchmarks/bench_crawl.py --pages 3 --fanout 1 --html-kb 30000 --spill-mb 4
+"""
+
+import argparse
+import contextlib
+import os
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from fixture_site import FixtureServer, add_site_arguments, site_config
+from mdcrawler.crawler.web_crawler import WebCrawler
+
+
+def peak_rss_mb(who=resource.RUSAGE_SELF) -> float:
+    """Peak resident set size in MB (ru_maxrss is in KB on Linux, bytes on macOS)"""
+    value = resource.getrusage(who).ru_maxrss
+    return value / (1024 * 1024) if sys.platform == "darwin" else value / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_site_arguments(parser)
+    parser.add_argument("--max-pages", type=int, default=None, help="crawl budget (default: every page)")
+    parser.add_argument("--renderer", default="http", choices=("auto", "http", "browser"))
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--convert-workers", type=int, default=0)
+    parser.add_argument("--download-assets", action="store_true")
+    parser.add_argument("--use-sitemap", action="store_true")
+    parser.add_argument("--max-page-mb", type=float, default=50.0, help="truncate or skip pages with more HTML")
+    parser.add_argument("--oversize", default="truncate", choices=("truncate", "skip"))
+    parser.add_argument("--spill-mb", type=float, default=8.0, help="convert pages with more HTML from a file")
+    parser.add_argument("--trace", default=None, help="also write the per-page JSON-lines trace here")
+    parser.add_argument("--quiet", action="store_true", help="hide the crawler's per-page output")
+    args = parser.parse_args()
+    max_pages = args.max_pages or args.pages
+
+    with FixtureServer(site_config(args)) as server, tempfile.TemporaryDirectory() as output_dir:
+        crawler = WebCrawler(output_dir, max_pages=max_pages, depth=0, download_assets=args.download_assets,
+                             use_sitemap=args.use_sitemap, workers=args.workers, renderer=args.renderer,
+                             convert_workers=args.convert_workers, trace_path=args.trace, max_page_mb=args.max_page_mb,
+                             oversize=args.oversize, spill_mb=args.spill_mb)
+        try:
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull if args.quiet else sys.stdout):
+                start = time.perf_counter()
+                crawler.crawl(f"{server.url}/index.html")
+                elapsed = time.perf_counter() - start
+        finally:
+            crawler.close()
+
+        written = sum(1 for _ in Path(output_dir).rglob("*.md"))
+
+    print()
+    print(f"site: {args.pages} pages, fanout {args.fanout}, ~{args.html_kb}KB HTML, "
+          f"{args.images} images, {args.js_fraction:.0%} JS")
+    print(f"crawl: renderer={args.renderer} workers={args.workers} convert_workers={args.convert_workers} "
+          f"assets={args.download_assets}")
+    print(f"pages written: {written} in {elapsed:.2f}s ({written / elapsed:.1f} pages/s)")
+    print(f"peak RSS: {peak_rss_mb():.0f}MB (largest child process {peak_rss_mb(resource.RUSAGE_CHILDREN):.0f}MB)")
+    for line in crawler.metrics.summary():
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Frontier scaling benchmark
+
+Simulates a BFS crawl over a synthetic site graph where every page links to a
+few new pages and to a set of shared nav/footer pages, and times only the
+frontier bookkeeping for the FIFO and the priority frontier. Per-URL cost
+should stay flat (priority: grow with log n) as the site grows.
+
+    uv run python benchmarks/bench_frontier.py
+"""
+
+import random
+import time
+
+from mdcrawler.crawler.frontier import Frontier, PriorityFrontier
+from mdcrawler.crawler.scoring import UrlScorer
+
+
+class ListFrontier:
+    """The original list-based frontier (pop(0) and `in to_visit` scans), for comparison"""
+
+    def __init__(self):
+        self.to_visit = []
+        self.url_depths = {}
+
+    def push(self, url, depth):
+        if url not in self.url_depths and url not in self.to_visit:
+            self.to_visit.append(url)
+            self.url_depths[url] = depth
+            return True
+        return False
+
+    def pop(self):
+        if not self.to_visit:
+            return None
+        url = self.to_visit.pop(0)
+        return url, self.url_depths[url]
+
+
+def simulate(frontier, pages: int, fanout: int = 8, shared: int = 50, seed: int = 0) -> float:
+    """Run a synthetic BFS over `pages` URLs and return elapsed seconds"""
+    rng = random.Random(seed)
+    nav = [f"https://example.com/nav/{i}" for i in range(shared)]
+    next_id = 1
+    start = time.perf_counter()
+
+    frontier.push("https://example.com/p/0", 0)
+    while True:
+        entry = frontier.pop()
+        if entry is None:
+            break
+        _, depth = entry
+        for _ in range(fanout):
+            if next_id < pages and rng.random() < 0.5:
+                frontier.push(f"https://example.com/p/{next_id}", depth + 1)
+                next_id += 1
+            else:
+                frontier.push(rng.choice(nav), depth + 1)
+
+    return time.perf_counter() - start
+
+
+def main():
+    print(f"{'pages':>10} {'frontier':>12} {'us/url':>8} {'priority':>12} {'us/url':>8} {'list (old)':>12} {'us/url':>8}")
+    scorer = UrlScorer(boosts=[("/nav/*", -1.0)])
+    for pages in (10_000, 20_000, 40_000, 80_000, 160_000, 320_000):
+        elapsed = simulate(Frontier(), pages)
+        prioritized = simulate(PriorityFrontier(scorer), pages)
+        row = (f"{pages:>10} {elapsed:>11.3f}s {elapsed / pages * 1e6:>8.2f}"
+               f" {prioritized:>11.3f}s {prioritized / pages * 1e6:>8.2f}")
+        # The quadratic version becomes impractically slow beyond this size
+        if pages <= 40_000:
+            old = simulate(ListFrontier(), pages)
+            row += f" {old:>11.3f}s {old / pages * 1e6:>8.2f}"
+        print(row)
+
+
+if __name__ == "__main__":
+    main()
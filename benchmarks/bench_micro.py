@@ -0,0 +1,70 @@
+"""Microbenchmarks for the crawler's per-page hot paths
+
+Times the small functions that run for every page or every link:
+_make_safe_filename, URL normalization, link resolution, rewrite_html, the
+markdown link and image rewriters, and frontier push/pop. Numbers are the
+best of several runs, per call, so regressions show up as a jump in one row.
+
+    uv run python benchmarks/bench_micro.py
+"""
+
+import tempfile
+import timeit
+
+from fixture_site import FixtureSite, SiteConfig
+from mdcrawler.crawler.frontier import Frontier
+from mdcrawler.crawler.rewriter import rewrite_html
+from mdcrawler.crawler.web_crawler import WebCrawler
+
+BASE_URL = "http://127.0.0.1:8800/page/7.html"
+
+
+def bench(name: str, func, number: int, repeat: int = 5):
+    best = min(timeit.repeat(func, number=number, repeat=repeat)) / number
+    if best >= 1e-3:
+        shown = f"{best * 1e3:9.2f} ms"
+    else:
+        shown = f"{best * 1e6:9.2f} us"
+    print(f"{name:<34} {shown}")
+
+
+def main():
+    html = FixtureSite(SiteConfig(pages=1000, html_kb=30, images=4)).page(7)
+    rewritten = rewrite_html(html, BASE_URL)
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        crawler = WebCrawler(output_dir, renderer="http", download_assets=True)
+        crawler.domain = "127.0.0.1:8800"
+        try:
+            links = crawler._normalize_links(rewritten.links, BASE_URL)
+            markdown = "\n\n".join(f"See [page {i}](/page/{i}.html) and ![fig](/img/{i}.png)" for i in range(200))
+            image_mapping = {f"http://127.0.0.1:8800/img/{i}.png": f"assets/{i:016x}.png" for i in range(200)}
+            urls = [f"http://127.0.0.1:8800/docs/section-{i}/page.html?q={i}&lang=en" for i in range(1000)]
+
+            print(f"{'operation':<34} {'per call':>12}")
+            bench(f"_make_safe_filename ({len(urls)} URLs)", lambda: [crawler._make_safe_filename(u) for u in urls], number=20)
+            bench("_normalize_url", lambda: crawler._normalize_url(BASE_URL, "../docs/a.html#top"), number=20000)
+            bench("_resolve_link (cached)", lambda: crawler._resolve_link(BASE_URL, "/page/3.html"), number=20000)
+            bench(f"rewrite_html ({len(html) // 1024}KB page)", lambda: rewrite_html(html, BASE_URL), number=50)
+            bench(f"_normalize_links ({len(rewritten.links)} links)",
+                  lambda: crawler._normalize_links(rewritten.links, BASE_URL), number=500)
+            bench("_fix_local_links (200 links)", lambda: crawler._fix_local_links(markdown, BASE_URL), number=50)
+            bench("_replace_image_refs (200 images)",
+                  lambda: crawler._replace_image_refs_in_markdown(markdown, image_mapping), number=50)
+
+            def frontier_ops():
+                frontier = Frontier()
+                for depth, url in enumerate(urls):
+                    frontier.push(url, depth % 5)
+                for url in links:
+                    frontier.push(url, 1)
+                while frontier.pop() is not None:
+                    pass
+
+            bench(f"Frontier push+pop ({len(urls) + len(links)} URLs)", frontier_ops, number=20)
+        finally:
+            crawler.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""HTML rewriting benchmark: single-pass rewrite_html vs the previous chained regex passes
+
+Generates synthetic pages of increasing size (paragraphs, links and images)
+and times image/link extraction plus img/anchor rewriting. rewrite_html
+should scale linearly with page size. The "unclosed" column adds a block of
+anchors without closing tags, which makes the old DOTALL `<a ...>.*?</a>`
+pattern rescan the rest of the document for every one of them.
+
+    uv run python benchmarks/bench_rewriter.py
+"""
+
+import re
+import time
+from html.parser import HTMLParser
+from urllib.parse import urljoin
+
+from mdcrawler.crawler.rewriter import rewrite_html
+
+BASE_URL = "https://example.com/docs/page.html"
+
+
+class _ImageExtractor(HTMLParser):
+    def __init__(self):
+        super().__init__()
+        self.images = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'img':
+            for name, value in attrs:
+                if name == 'src':
+                    self.images.append(value)
+
+
+class _LinkExtractor(HTMLParser):
+    def __init__(self):
+        super().__init__()
+        self.links = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'a':
+            for name, value in attrs:
+                if name == 'href' and value:
+                    self.links.append(value)
+
+
+def _old_img_tags(html_content, base_url):
+    def replace_img_tag(match):
+        img_tag = match.group(0)
+        alt_match = re.search(r'alt=["\']([^"\']*)["\']', img_tag)
+        alt_text = alt_match.group(1) if alt_match else "image"
+        src_match = re.search(r'src=["\']([^"\']*)["\']', img_tag)
+        if src_match:
+            return f"![{alt_text}]({urljoin(base_url, src_match.group(1))})"
+        return match.group(0)
+    return re.sub(r'<img[^>]*src=["\'][^"\']*["\'][^>]*>', replace_img_tag, html_content, flags=re.IGNORECASE)
+
+
+def _old_anchor_tags(html_content, base_url):
+    def replace_anchor_tag(match):
+        anchor_tag = match.group(0)
+        text_match = re.search(r'>([^<]*)</a>', anchor_tag, re.IGNORECASE)
+        link_text = text_match.group(1).strip() if text_match else "link"
+        href_match = re.search(r'href=["\']([^"\']*)["\']', anchor_tag)
+        if href_match:
+            return f"[{link_text}]({urljoin(base_url, href_match.group(1))})"
+        return match.group(0)
+    return re.sub(r'<a[^>]*href=["\'][^"\']*["\'][^>]*>.*?</a>', replace_anchor_tag, html_content, flags=re.IGNORECASE | re.DOTALL)
+
+
+def old_pipeline(html_content, base_url):
+    """Image extraction, link extraction and the two regex rewrites, as done before"""
+    images = _ImageExtractor()
+    images.feed(html_content)
+    links = _LinkExtractor()
+    links.feed(html_content)
+    processed = _old_img_tags(html_content, base_url)
+    return _old_anchor_tags(processed, base_url)
+
+
+def make_page(size_bytes: int, unclosed: int = 0) -> str:
+    """Build an HTML page of roughly size_bytes with a mix of text, links and images"""
+    block = (
+        '<div class="section"><h2>Section {i}</h2>'
+        '<p>Lorem ipsum dolor sit amet, consectetur adipiscing elit. '
+        '<a href="/docs/topic-{i}.html" class="ref">Topic <b>{i}</b></a> and '
+        '<a href="../other/{i}?q=1&amp;x=2">other {i}</a>.</p>'
+        '<a href="/img/{i}"><img src="/static/img-{i}.png" alt="Figure {i}" width="200"></a>'
+        '<p>Sed do eiusmod tempor incididunt ut labore et dolore magna aliqua.</p></div>\n'
+    )
+    parts = ['<html><head><title>Bench</title></head><body>']
+    total = 0
+    i = 0
+    while total < size_bytes:
+        chunk = block.format(i=i)
+        parts.append(chunk)
+        total += len(chunk)
+        i += 1
+    parts.extend(f'<a href="/broken/{j}">' for j in range(unclosed))
+    parts.append('</body></html>')
+    return ''.join(parts)
+
+
+def best_of(func, *args, repeat: int = 3) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    print(f"{'size':>8} {'rewrite_html':>13} {'MB/s':>7} {'old passes':>11} {'old unclosed':>13} {'new unclosed':>13}")
+    for megabytes in (1, 2, 4, 8):
+        page = make_page(megabytes * 1024 * 1024)
+        broken = make_page(megabytes * 1024 * 1024, unclosed=500)
+        new = best_of(rewrite_html, page, BASE_URL)
+        old = best_of(old_pipeline, page, BASE_URL)
+        old_broken = best_of(old_pipeline, broken, BASE_URL, repeat=1)
+        new_broken = best_of(rewrite_html, broken, BASE_URL)
+        print(f"{megabytes:>6}MB {new:>12.3f}s {megabytes / new:>7.1f} {old:>10.3f}s {old_broken:>12.3f}s {new_broken:>12.3f}s")
+
+
+if __name__ == "__main__":
+    main()
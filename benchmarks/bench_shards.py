@@ -0,0 +1,101 @@
+"""Sharded crawl scaling benchmark against the local fixture site
+
+Crawls the whole fixture site with 1, 2, 4... shard processes sharing one
+SQLite frontier (--shared-state), merges their output trees and reports
+pages/sec and the speedup over a single shard. Each process loads Docling
+and waits for the others before crawling, so startup is not timed. The
+merged mirror must hold every page exactly once; conversion is CPU bound,
+so scaling stops at the number of cores.
+
+    uv run python benchmarks/bench_shards.py --pages 200 --shards 1,2,4
+"""
+
+import argparse
+import contextlib
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from fixture_site import FixtureServer, add_site_arguments, site_config
+
+
+def run_shard(start_url: str, output_dir: str, state_path: str, shard: int, shards: int, args, barrier, results):
+    """One shard process: warm the converter, wait for the others, crawl and report its timing"""
+    from mdcrawler.crawler.web_crawler import WebCrawler
+
+    crawler = WebCrawler(output_dir, max_pages=args.pages * 2, depth=0, workers=args.workers, renderer=args.renderer,
+                         shared_state=state_path, shard=shard, shards=shards)
+    try:
+        crawler._convert_to_markdown("<html><body><p>warm up</p></body></html>", start_url)
+        barrier.wait()
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull if args.quiet else sys.stdout):
+            start = time.time()
+            pages = crawler.crawl(start_url)
+            end = time.time()
+    finally:
+        crawler.close()
+    results.put((shard, pages, start, end))
+
+
+def crawl_sharded(server_url: str, shards: int, workdir: Path, args):
+    """Crawl with shards processes, returns (pages per shard, seconds, merged markdown files)"""
+    from mdcrawler.crawler.sharding import merge_mirrors
+
+    context = multiprocessing.get_context("spawn")
+    barrier = context.Barrier(shards)
+    results = context.Queue()
+    processes = [context.Process(target=run_shard, args=(f"{server_url}/index.html", str(workdir / f"shard-{shard}"),
+                                                         str(workdir / "state.sqlite"), shard, shards, args,
+                                                         barrier, results))
+                 for shard in range(shards)]
+    for process in processes:
+        process.start()
+    reports = sorted(results.get() for _ in processes)
+    for process in processes:
+        process.join()
+
+    seconds = max(end for _, _, _, end in reports) - min(start for _, _, start, _ in reports)
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        merge_mirrors([workdir / f"shard-{shard}" for shard in range(shards)], workdir / "mirror")
+    written = sum(1 for _ in (workdir / "mirror").rglob("*.md"))
+    return [pages for _, pages, _, _ in reports], seconds, written
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_site_arguments(parser)
+    parser.add_argument("--shards", default="1,2,4", help="comma separated shard counts to compare")
+    parser.add_argument("--renderer", default="http", choices=("auto", "http", "browser"))
+    parser.add_argument("--workers", type=int, default=1, help="workers per shard")
+    parser.add_argument("--quiet", action="store_true", help="hide the crawlers' per-page output")
+    args = parser.parse_args()
+
+    # Shard processes must find mdcrawler the same way this script does
+    os.environ["PYTHONPATH"] = os.pathsep.join(p for p in sys.path if p)
+
+    rows = []
+    with FixtureServer(site_config(args)) as server:
+        for shards in (int(n) for n in args.shards.split(",")):
+            with tempfile.TemporaryDirectory() as workdir:
+                per_shard, seconds, written = crawl_sharded(server.url, shards, Path(workdir), args)
+            rows.append((shards, per_shard, seconds, written))
+
+    print()
+    print(f"site: {args.pages} pages, fanout {args.fanout}, ~{args.html_kb}KB HTML; {os.cpu_count()} CPUs, "
+          f"renderer={args.renderer} workers={args.workers} per shard")
+    print(f"{'shards':>6} {'merged':>7} {'seconds':>8} {'pages/s':>8} {'speedup':>8}  pages per shard")
+    base = None
+    for shards, per_shard, seconds, written in rows:
+        rate = written / seconds
+        base = base or rate
+        print(f"{shards:>6} {written:>7} {seconds:>8.2f} {rate:>8.1f} {rate / base:>7.2f}x  "
+              f"{' '.join(map(str, per_shard))}")
+        if written != rows[0][3]:
+            print(f"       merged mirror has {written} files, {rows[0][3]} with {rows[0][0]} shard(s)")
+
+
+if __name__ == "__main__":
+    main()
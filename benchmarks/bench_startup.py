@@ -0,0 +1,79 @@
+"""CLI cold start benchmark
+
+Runs `mdcrawler version`, `mdcrawler --help` and `mdcrawler single-page`
+(against a page of the local fixture site, HTTP renderer) in fresh
+interpreters and reports the wall time of each, plus which heavy
+dependencies importing the CLI module pulls in. Only single-page should pay
+for Docling, and none of them for Selenium unless a browser is needed.
+
+    uv run python benchmarks/bench_startup.py --runs 5
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from fixture_site import FixtureServer, SiteConfig
+
+HEAVY_MODULES = ("selenium", "docling", "torch", "httpx", "charset_normalizer")
+
+
+def cli(*args: str):
+    return [sys.executable, "-m", "mdcrawler.main", *args]
+
+
+def time_command(command, runs: int, cwd: str):
+    """Wall times of running command `runs` times, failing loudly if it errors"""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = subprocess.run(command, cwd=cwd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+        timings.append(time.perf_counter() - start)
+        if result.returncode != 0:
+            raise SystemExit(f"{' '.join(command)} failed:\n{result.stderr}")
+    return timings
+
+
+def loaded_modules(module: str):
+    """Heavy modules present in sys.modules after importing module in a fresh interpreter"""
+    probe = (f"import sys, {module}; "
+             f"print(' '.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))")
+    output = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True, check=True).stdout
+    return output.split()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="runs per command")
+    parser.add_argument("--renderer", default="http", help="renderer for the single-page run")
+    args = parser.parse_args()
+
+    # Subprocesses must find mdcrawler the same way this script does
+    os.environ["PYTHONPATH"] = os.pathsep.join(p for p in sys.path if p)
+
+    for module in ("mdcrawler.main", "mdcrawler.crawler.web_crawler"):
+        print(f"import {module}: {', '.join(loaded_modules(module)) or 'no heavy modules'}")
+    print()
+
+    baseline = time_command([sys.executable, "-c", "pass"], args.runs, ".")
+    print(f"{'command':<28} {'min':>8} {'median':>8} {'max':>8}")
+    print(f"{'python (interpreter only)':<28} {min(baseline):>7.2f}s {statistics.median(baseline):>7.2f}s {max(baseline):>7.2f}s")
+
+    with FixtureServer(SiteConfig(pages=10, html_kb=30, images=2)) as server, tempfile.TemporaryDirectory() as workdir:
+        commands = {
+            "version": cli("version"),
+            "--help": cli("--help"),
+            "crawl --help": cli("crawl", "--help"),
+            "single-page": cli("single-page", f"{server.url}/page/1.html", "-o", "page.md", "--renderer", args.renderer),
+        }
+        for name, command in commands.items():
+            timings = time_command(command, args.runs, workdir)
+            print(f"{name:<28} {min(timings):>7.2f}s {statistics.median(timings):>7.2f}s {max(timings):>7.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""Synthetic fixture site served from a local HTTP server, for offline benchmarks
+
+Pages are generated on request from their number, so the same parameters
+always produce the same site without writing anything to disk:
+
+- /page/<n>.html links to `fanout` other pages (the next pages in BFS order
+  plus a few random ones) and to shared nav pages, and embeds `images` images
+- roughly `js_fraction` of the pages are JavaScript app shells whose content
+  only appears after rendering
+- /img/<n>.png, /robots.txt and /sitemap.xml are served as well
+
+Run on its own to browse or crawl the site by hand:
+
+    uv run python benchmarks/fixture_site.py --pages 500 --port 8800
+"""
+
+import argparse
+import random
+import struct
+import threading
+import zlib
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+LOREM = (
+    "Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod tempor "
+    "incididunt ut labore et dolore magna aliqua. Ut enim ad minim veniam, quis nostrud "
+    "exercitation ullamco laboris nisi ut aliquip ex ea commodo consequat. "
+)
+
+
+@dataclass
+class SiteConfig:
+    pages: int = 200
+    fanout: int = 8
+    html_kb: int = 30
+    images: int = 2
+    js_fraction: float = 0.0
+    seed: int = 0
+
+
+def _png(n: int) -> bytes:
+    """A tiny valid PNG whose colour depends on n, so images differ in content"""
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+    pixel = bytes([0, n % 256, (n // 256) % 256, 128])
+    return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", struct.pack(">IIBBBBB", 1, 1, 8, 2, 0, 0, 0))
+            + chunk(b"IDAT", zlib.compress(pixel)) + chunk(b"IEND", b""))
+
+
+class FixtureSite:
+    """Deterministic page generator for a SiteConfig"""
+
+    def __init__(self, config: SiteConfig):
+        self.config = config
+
+    def is_js(self, n: int) -> bool:
+        return n > 0 and random.Random(f"{self.config.seed}-js-{n}").random() < self.config.js_fraction
+
+    def links(self, n: int):
+        """Page numbers linked from page n: BFS children first, then random pages"""
+        config = self.config
+        rng = random.Random(f"{config.seed}-links-{n}")
+        children = [c for c in range(n * config.fanout + 1, (n + 1) * config.fanout + 1) if c < config.pages]
+        extra = [rng.randrange(config.pages) for _ in range(max(0, config.fanout - len(children)))]
+        return children + extra
+
+    def page(self, n: int) -> str:
+        config = self.config
+        nav = "".join(f'<li><a href="/page/{i}.html">Section {i}</a></li>' for i in range(min(5, config.pages)))
+        links = "".join(f'<li><a href="/page/{i}.html">Page {i}</a></li>' for i in self.links(n))
+        images = "".join(f'<img src="/img/{n * config.images + i}.png" alt="Figure {i}">' for i in range(config.images))
+
+        # Pad with paragraphs up to roughly html_kb
+        # Shuffled filler words, so pages are not near duplicates of each other
+        rng = random.Random(f"{config.seed}-text-{n}")
+        words = (LOREM * 3).split()
+        paragraphs = []
+        size = len(nav) + len(links) + len(images)
+        i = 0
+        while size < config.html_kb * 1024:
+            rng.shuffle(words)
+            paragraph = f"<h2>Heading {n}.{i}</h2><p>{' '.join(words)}</p>"
+            paragraphs.append(paragraph)
+            size += len(paragraph)
+            i += 1
+        content = f"<h1>Page {n}</h1>{images}{''.join(paragraphs)}<ul>{links}</ul>"
+
+        if self.is_js(n):
+            # App shell: the content is only inserted by script
+            body = (f'<div id="app"></div><noscript>Enable JavaScript</noscript>'
+                    f'<script>document.getElementById("app").innerHTML = {content!r};</script>')
+        else:
+            body = content
+        return (f'<!DOCTYPE html><html><head><meta charset="utf-8"><title>Page {n}</title></head>'
+                f'<body><nav><ul>{nav}</ul></nav><main>{body}</main></body></html>')
+
+    def sitemap(self, base_url: str) -> str:
+        urls = "".join(f"<url><loc>{base_url}/page/{n}.html</loc></url>" for n in range(self.config.pages))
+        return f'<?xml version="1.0"?><urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{urls}</urlset>'
+
+
+def _handler(site: FixtureSite):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Headers and body go out in separate writes; without this, keep-alive
+        # connections stall on delayed ACKs and asset timings are mostly waiting
+        disable_nagle_algorithm = True
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, body: bytes, content_type: str, status: int = 200):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            if self.command != "HEAD":
+                self.wfile.write(body)
+
+        def do_GET(self):
+            path = self.path.split("?")[0]
+            try:
+                if path in ("/", "/index.html"):
+                    return self._send(site.page(0).encode(), "text/html; charset=utf-8")
+                if path.startswith("/page/") and path.endswith(".html"):
+                    n = int(path[len("/page/"):-len(".html")])
+                    if 0 <= n < site.config.pages:
+                        return self._send(site.page(n).encode(), "text/html; charset=utf-8")
+                if path.startswith("/img/") and path.endswith(".png"):
+                    return self._send(_png(int(path[len("/img/"):-len(".png")])), "image/png")
+                if path == "/robots.txt":
+                    return self._send(b"User-agent: *\nAllow: /\n", "text/plain")
+                if path == "/sitemap.xml":
+                    host = self.headers.get("Host", "localhost")
+                    return self._send(site.sitemap(f"http://{host}").encode(), "application/xml")
+            except ValueError:
+                pass
+            self._send(b"not found", "text/plain", status=404)
+
+        do_HEAD = do_GET
+
+    return Handler
+
+
+class FixtureServer:
+    """Serve a FixtureSite on localhost from a background thread"""
+
+    def __init__(self, config: SiteConfig, port: int = 0):
+        self.site = FixtureSite(config)
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), _handler(self.site))
+        self.httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}"
+
+    def __enter__(self) -> "FixtureServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def add_site_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--pages", type=int, default=SiteConfig.pages, help="number of pages on the site")
+    parser.add_argument("--fanout", type=int, default=SiteConfig.fanout, help="links per page")
+    parser.add_argument("--html-kb", type=int, default=SiteConfig.html_kb, help="approximate HTML size per page")
+    parser.add_argument("--images", type=int, default=SiteConfig.images, help="images per page")
+    parser.add_argument("--js-fraction", type=float, default=SiteConfig.js_fraction, help="share of pages that need JavaScript")
+    parser.add_argument("--seed", type=int, default=SiteConfig.seed)
+
+
+def site_config(args) -> SiteConfig:
+    return SiteConfig(pages=args.pages, fanout=args.fanout, html_kb=args.html_kb, images=args.images,
+                      js_fraction=args.js_fraction, seed=args.seed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_site_arguments(parser)
+    parser.add_argument("--port", type=int, default=8800)
+    args = parser.parse_args()
+
+    with FixtureServer(site_config(args), port=args.port) as server:
+        print(f"Serving {args.pages} pages at {server.url}/ (Ctrl+C to stop)")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""Concurrent asset downloader with content-addressed storage"""
+
+import asyncio
+import hashlib
+import re
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, wait
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+from urllib.parse import urlparse
+
+from mdcrawler.crawler.capture import CaptureWriter
+from mdcrawler.crawler.fetcher import AsyncFetcher
+
+CHUNK_SIZE = 64 * 1024
+
+
+def asset_extension(url: str, content_type: str) -> str:
+    """File extension from the URL path, falling back to the Content-Type subtype"""
+    suffix = Path(urlparse(url).path).suffix.lower()
+    if not suffix and '/' in content_type:
+        suffix = '.' + content_type.split('/')[1].split(';')[0].split('+')[0].strip()
+    suffix = re.sub(r'[^a-z0-9.]', '', suffix)
+    return suffix if 1 < len(suffix) <= 10 else ''
+
+
+class AssetDownloader:
+    """Download assets over the shared async fetcher, storing each distinct file once
+
+    Files are named after the SHA-256 of their content, so the same image
+    served from several URLs is kept once and different images that happen
+    to share a filename never overwrite each other. Downloads are coroutines
+    on the fetcher's event loop, at most max_workers at once and per_host
+    per host, and bodies are streamed to disk from a worker thread so file
+    I/O never blocks the loop. With a capture store, every downloaded asset
+    is also recorded there.
+
+    Only downloads in progress are tracked as futures; a finished one leaves
+    its local path behind, a failed one nothing, so a later page may retry it.
+    The max_paths most recently used paths are kept; an asset referenced again
+    after its path was evicted is fetched again and lands on the same file.
+    """
+
+    def __init__(self, fetcher: AsyncFetcher, assets_dir: Path, output_dir: Path,
+                 max_workers: int = 8, per_host: int = 4, capture: Optional[CaptureWriter] = None,
+                 max_paths: int = 65536):
+        self.fetcher = fetcher
+        self.assets_dir = Path(assets_dir)
+        self.output_dir = Path(output_dir)
+        self.max_workers = max(1, max_workers)
+        self.per_host = max(1, per_host)
+        self.capture = capture
+        self.max_paths = max(1, max_paths)
+        self._lock = threading.Lock()
+        # Semaphores live on the event loop and are only touched from it
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._host_slots: Dict[str, asyncio.Semaphore] = {}
+        # One future per asset URL being downloaded: repeated references share it
+        self._downloads: Dict[str, Future] = {}
+        # Local paths, relative to the output directory, of recently downloaded URLs, least recently used first
+        self._paths: "OrderedDict[str, str]" = OrderedDict()
+
+    def _host_slot(self, url: str) -> asyncio.Semaphore:
+        host = urlparse(url).netloc
+        slot = self._host_slots.get(host)
+        if slot is None:
+            slot = self._host_slots[host] = asyncio.Semaphore(self.per_host)
+        return slot
+
+    async def _fetch(self, url: str) -> Optional[str]:
+        """Stream url to a content-addressed file and return its path relative to the output directory"""
+        tmp_path = self.assets_dir / f".download.{uuid.uuid4().hex}.part"
+        digest = hashlib.sha256()
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_workers)
+
+        try:
+            async with self._slots, self._host_slot(url):
+                async with self.fetcher.stream(url) as response:
+                    response.raise_for_status()
+                    content_type = response.headers.get('Content-Type', '')
+                    f = await asyncio.to_thread(self._open_part, tmp_path)
+                    try:
+                        async for chunk in response.aiter_bytes(CHUNK_SIZE):
+                            digest.update(chunk)
+                            await asyncio.to_thread(f.write, chunk)
+                    finally:
+                        await asyncio.to_thread(f.close)
+
+            local_path = self.assets_dir / f"{digest.hexdigest()[:16]}{asset_extension(url, content_type)}"
+            await asyncio.to_thread(self._store, tmp_path, local_path, url, content_type)
+            return str(local_path.relative_to(self.output_dir))
+
+        except Exception as e:
+            print(f"Error downloading {url}: {e}")
+            await asyncio.to_thread(tmp_path.unlink, missing_ok=True)
+            return None
+
+    def _open_part(self, tmp_path: Path):
+        self.assets_dir.mkdir(parents=True, exist_ok=True)
+        return open(tmp_path, 'wb')
+
+    def _store(self, tmp_path: Path, local_path: Path, url: str, content_type: str):
+        """Move a finished download to its content-addressed name and record it in the capture store"""
+        if local_path.exists():
+            tmp_path.unlink()
+        else:
+            tmp_path.replace(local_path)
+        if self.capture is not None:
+            self.capture.write_asset(url, local_path, content_type)
+
+    def _finished(self, url: str, future: Future):
+        """Stop tracking a download, remembering where it was stored if it succeeded"""
+        local_path = None if future.cancelled() or future.exception() else future.result()
+        with self._lock:
+            if self._downloads.get(url) is future:
+                del self._downloads[url]
+            if local_path:
+                self._paths[url] = local_path
+                self._paths.move_to_end(url)
+                if len(self._paths) > self.max_paths:
+                    self._paths.popitem(last=False)
+
+    def submit(self, url: str) -> Future:
+        """Schedule a download of url, reusing an earlier or running download of the same URL"""
+        with self._lock:
+            local_path = self._paths.get(url)
+            if local_path is not None:
+                self._paths.move_to_end(url)
+                future = Future()
+                future.set_result(local_path)
+                return future
+            future = self._downloads.get(url)
+            # A failed download may linger until its callback runs: retry rather than reuse it
+            if future is not None and not (future.done() and (future.cancelled() or not future.result())):
+                return future
+            future = self.fetcher.loop.submit(self._fetch(url))
+            self._downloads[url] = future
+        # Outside the lock: the callback runs right here if the download already finished
+        future.add_done_callback(lambda done: self._finished(url, done))
+        return future
+
+    def download(self, url: str) -> Optional[str]:
+        """Download a single asset and return its local relative path"""
+        return self.submit(url).result()
+
+    def download_all(self, urls: Iterable[str]) -> Dict[str, str]:
+        """Download assets concurrently and return a URL to local path mapping for those that succeeded"""
+        futures = {url: self.submit(url) for url in urls}
+        mapping = {}
+        for url, future in futures.items():
+            local_path = future.result()
+            if local_path:
+                mapping[url] = local_path
+        return mapping
+
+    def close(self):
+        """Wait for pending downloads"""
+        with self._lock:
+            pending = list(self._downloads.values())
+        wait(pending)
@@ -0,0 +1,209 @@
+"""Batch crawls: many sites through one set of warm browsers, converter and HTTP connections"""
+
+import shlex
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+from urllib.parse import urlparse
+
+from mdcrawler.crawler.scoring import parse_boost
+from mdcrawler.crawler.web_crawler import WebCrawler
+
+
+def _flag(value: str) -> bool:
+    lowered = value.lower()
+    if lowered in ("1", "true", "yes", "on"):
+        return True
+    if lowered in ("0", "false", "no", "off"):
+        return False
+    raise ValueError(f"expected true or false, got {value!r}")
+
+
+# Per-site options: name in the sites file -> (WebCrawler argument, parser, repeatable)
+SITE_OPTIONS: Dict[str, tuple] = {
+    "output": ("output", str, False),
+    "max-pages": ("max_pages", int, False),
+    "depth": ("depth", int, False),
+    "workers": ("workers", int, False),
+    "download-assets": ("download_assets", _flag, False),
+    "use-sitemap": ("use_sitemap", _flag, False),
+    "since": ("since", date.fromisoformat, False),
+    "renderer": ("renderer", str, False),
+    "wait": ("wait_strategy", str, False),
+    "wait-timeout": ("wait_timeout", float, False),
+    "wait-quiet": ("wait_quiet", float, False),
+    "state": ("persist_state", _flag, False),
+    "resume": ("resume", _flag, False),
+    "incremental": ("incremental", _flag, False),
+    "order": ("order", str, False),
+    "include": ("include", str, True),
+    "exclude": ("exclude", str, True),
+    "boost": ("boosts", parse_boost, True),
+    "canonicalize": ("canonicalize", _flag, False),
+    "drop-param": ("drop_params", str, True),
+    "dedupe": ("dedupe", _flag, False),
+    "max-per-host": ("max_per_host", int, False),
+    "rate": ("rate", float, False),
+    "trace": ("trace_path", str, False),
+    "capture": ("capture_path", str, False),
+    "max-page-mb": ("max_page_mb", float, False),
+    "oversize": ("oversize", str, False),
+    "spill-mb": ("spill_mb", float, False),
+}
+
+
+@dataclass
+class SiteSpec:
+    """A seed URL and the WebCrawler options that differ from the batch defaults"""
+    url: str
+    options: Dict[str, Any] = field(default_factory=dict)
+
+
+def parse_site_line(line: str) -> Optional[SiteSpec]:
+    """Parse `URL [option=value ...]`, returns None for blank and comment lines
+
+    Option names are the crawl command's long options without the dashes
+    (max-pages=50, include=/docs/*); include, exclude, boost and drop-param
+    may be repeated.
+    """
+    tokens = shlex.split(line, comments=True)
+    if not tokens:
+        return None
+    url, options = tokens[0], {}
+    if urlparse(url).scheme not in ("http", "https"):
+        raise ValueError(f"expected an http(s) URL first, got {url!r}")
+    for token in tokens[1:]:
+        name, sep, value = token.partition("=")
+        name = name.replace("_", "-")
+        if not sep or name not in SITE_OPTIONS:
+            raise ValueError(f"unknown site option {token!r}, expected one of {', '.join(SITE_OPTIONS)}")
+        argument, parse, repeatable = SITE_OPTIONS[name]
+        parsed = parse(value)
+        if repeatable:
+            options.setdefault(argument, []).append(parsed)
+        else:
+            options[argument] = parsed
+    return SiteSpec(url, options)
+
+
+def read_sites(path: Path) -> List[SiteSpec]:
+    """Site specs from a file with one `URL [option=value ...]` per line"""
+    sites = []
+    with open(path, encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            try:
+                spec = parse_site_line(line)
+            except ValueError as e:
+                raise ValueError(f"{path}:{number}: {e}") from None
+            if spec is not None:
+                sites.append(spec)
+    return sites
+
+
+@dataclass
+class SiteResult:
+    url: str
+    output_dir: Path
+    pages: int = 0
+    seconds: float = 0.0
+    error: Optional[str] = None
+
+
+class BatchCrawler:
+    """Crawl many sites with one pool of workers and one set of warm resources
+
+    A host WebCrawler owns the browser sessions, the Docling converter, the
+    HTTP client and the politeness scheduler; every site gets its own
+    WebCrawler (frontier, state, output tree) that borrows them. Up to
+    parallel_sites sites are crawled at once, each keeping at most
+    site_workers pages in flight on the shared pool of `workers` threads, so
+    a site waiting on its host's rate limit leaves the workers to other sites.
+    """
+
+    def __init__(self, output_dir: str = "mirrors", workers: int = 4, parallel_sites: int = 4,
+                 site_workers: int = 2, **defaults):
+        self.output_dir = Path(output_dir)
+        self.workers = max(1, workers)
+        self.parallel_sites = max(1, parallel_sites)
+        self.site_workers = max(1, site_workers)
+        self.defaults = defaults
+
+        # Options that belong to the shared resources rather than to a site
+        shared_options = {name: defaults.pop(name) for name in
+                          ("http2", "recycle_pages", "recycle_rss_mb", "block_resources", "respect_robots",
+                           "max_per_host", "rate")
+                          if name in defaults}
+        self.host = WebCrawler(str(self.output_dir), workers=self.workers, **shared_options)
+        # Browser sessions serve every site in turn, so they can always reach recycling
+        self.host.browsers.standby = bool(self.host.browsers.max_pages or self.host.browsers.max_rss_mb)
+        self._used_dirs: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def _site_dir(self, spec: SiteSpec) -> Path:
+        """Output tree for a site: its output option, or its host name, made unique within the batch"""
+        name = spec.options.get("output") or urlparse(spec.url).netloc.lower().replace(":", "_")
+        with self._lock:
+            candidate, n = name, 1
+            while candidate in self._used_dirs:
+                n += 1
+                candidate = f"{name}-{n}"
+            self._used_dirs.add(candidate)
+        return self.output_dir / candidate
+
+    def _crawl_site(self, spec: SiteSpec, pool: ThreadPoolExecutor) -> SiteResult:
+        result = SiteResult(spec.url, self._site_dir(spec))
+        options = {**self.defaults, "workers": self.site_workers, **spec.options}
+        options.pop("output", None)
+
+        start = time.monotonic()
+        crawler = None
+        try:
+            crawler = WebCrawler(str(result.output_dir), shared=self.host, **options)
+            # Site specific politeness goes to the shared scheduler, keyed by the host as this site's crawler requests it
+            if "max_per_host" in spec.options or "rate" in spec.options:
+                url = crawler.canonicalizer.canonicalize(spec.url) if crawler.canonicalizer is not None else spec.url
+                self.host.scheduler.configure_host(url, max_per_host=spec.options.get("max_per_host"),
+                                                   rate=spec.options.get("rate"))
+            result.pages = crawler.crawl(spec.url, pool=pool)
+        except Exception as e:
+            print(f"Error crawling site {spec.url}: {e}")
+            result.error = str(e)
+        finally:
+            if crawler is not None:
+                crawler.close()
+            result.seconds = time.monotonic() - start
+        return result
+
+    def crawl(self, sites: List[SiteSpec]) -> List[SiteResult]:
+        """Crawl every site, interleaved, and return their results in input order"""
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="mdcrawler") as pool, \
+                ThreadPoolExecutor(max_workers=self.parallel_sites, thread_name_prefix="mdcrawler-site") as sites_pool:
+            futures = [sites_pool.submit(self._crawl_site, spec, pool) for spec in sites]
+            return [future.result() for future in futures]
+
+    def close(self):
+        """Shut down the shared browsers and connections"""
+        self.host.close()
+
+
+def crawl_batch(sites: List[SiteSpec], output_dir: str = "mirrors", workers: int = 4, parallel_sites: int = 4,
+                site_workers: int = 2, **defaults) -> List[SiteResult]:
+    """Convenience function to crawl a batch of sites and print a summary"""
+    batch = BatchCrawler(output_dir, workers=workers, parallel_sites=parallel_sites, site_workers=site_workers, **defaults)
+    start = time.monotonic()
+    try:
+        results = batch.crawl(sites)
+    finally:
+        batch.close()
+
+    elapsed = time.monotonic() - start
+    print(f"\nBatch complete: {len(results)} sites, {sum(r.pages for r in results)} pages in {elapsed:.1f}s")
+    for r in results:
+        status = f"error: {r.error}" if r.error else f"{r.pages} pages in {r.seconds:.1f}s"
+        print(f"  {r.url} -> {r.output_dir}: {status}")
+    return results
@@ -0,0 +1,193 @@
+"""Managed headless Chrome sessions: recycling, crash recovery, resource blocking and a warm standby"""
+
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, List, Optional, TYPE_CHECKING
+
+try:
+    import psutil
+except ImportError:  # RSS based recycling is skipped without psutil, with a warning
+    psutil = None
+
+if TYPE_CHECKING:
+    from selenium import webdriver
+
+# Requests that never affect the rendered DOM we convert: images (their src is
+# still in the HTML and downloaded separately), fonts, media and trackers
+BLOCKED_URLS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico", "*.bmp",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*.mp4", "*.webm", "*.ogg", "*.mp3", "*.wav", "*.m4a",
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*", "*connect.facebook.net*",
+    "*hotjar.com*", "*segment.io*", "*cdn.segment.com*", "*clarity.ms*", "*mixpanel.com*",
+]
+
+
+def _quit_started(future: Future):
+    """Quit the browser a standby future started, if it started"""
+    if future.cancelled() or future.exception() is not None:
+        return
+    try:
+        future.result().quit()
+    except Exception as e:
+        print(f"Error closing browser: {e}")
+
+
+class _Session:
+    """A browser and the number of pages it has loaded"""
+
+    def __init__(self, driver: "webdriver.Chrome"):
+        self.driver = driver
+        self.pages = 0
+
+
+class BrowserPool:
+    """One Chrome session per worker thread, replaced before it degrades
+
+    A session is recycled after max_pages page loads or once Chrome's
+    process tree uses more than max_rss_mb (0 disables either check), and
+    restarted when it has crashed. With standby set, replacements come from
+    a browser started in the background once pages are being loaded, so a
+    swap does not wait for Chrome to boot; it only pays off when a session
+    can be recycled before the crawl ends. With block_resources, images,
+    fonts, media and common analytics are blocked through CDP.
+    """
+
+    def __init__(self, create_driver: Callable[[], "webdriver.Chrome"], max_pages: int = 200,
+                 max_rss_mb: int = 2048, block_resources: bool = True, standby: bool = False):
+        self.create_driver = create_driver
+        self.max_pages = max(0, max_pages)
+        self.max_rss_mb = max(0, max_rss_mb)
+        self.block_resources = block_resources
+        self.standby = standby
+        self.recycled = 0
+        self.restarts = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._sessions: List[_Session] = []
+        self._standby: Optional[Future] = None
+        self._starter: Optional[ThreadPoolExecutor] = None
+        self._closed = False
+        self._rss_warned = False
+
+    def _start(self) -> "webdriver.Chrome":
+        """Start a browser, with resource blocking applied"""
+        if self.max_rss_mb and psutil is None:
+            with self._lock:
+                warn, self._rss_warned = not self._rss_warned, True
+            if warn:
+                print(f"Warning: psutil is not installed, browsers will not be recycled at {self.max_rss_mb}MB")
+        driver = self.create_driver()
+        if self.block_resources:
+            try:
+                driver.execute_cdp_cmd("Network.enable", {})
+                driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URLS})
+            except Exception as e:
+                print(f"Could not enable resource blocking: {e}")
+        return driver
+
+    def _warm_standby(self):
+        """Start the next standby browser in the background if none is pending (lock held)"""
+        if not self.standby or self._closed or self._standby is not None:
+            return
+        if self._starter is None:
+            self._starter = ThreadPoolExecutor(max_workers=1, thread_name_prefix="mdcrawler-standby")
+        self._standby = self._starter.submit(self._start)
+
+    def _next_driver(self) -> "webdriver.Chrome":
+        """The standby browser if one was started, otherwise a fresh one"""
+        with self._lock:
+            future, self._standby = self._standby, None
+        if future is not None:
+            try:
+                return future.result()
+            except Exception as e:
+                print(f"Standby browser failed to start: {e}")
+        return self._start()
+
+    def driver(self) -> "webdriver.Chrome":
+        """Browser session owned by the calling thread"""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = _Session(self._next_driver())
+            self._local.session = session
+            with self._lock:
+                self._sessions.append(session)
+        return session.driver
+
+    def _rss_mb(self, driver: "webdriver.Chrome") -> float:
+        """Resident memory of chromedriver and every Chrome process under it"""
+        try:
+            root = psutil.Process(driver.service.process.pid)
+            return sum(p.memory_info().rss for p in [root, *root.children(recursive=True)]) / (1024 * 1024)
+        except Exception:
+            return 0.0
+
+    def _replace(self, session: _Session):
+        old = session.driver
+        try:
+            old.quit()
+        except Exception:
+            pass
+        session.driver = self._next_driver()
+        session.pages = 0
+
+    def page_loaded(self):
+        """Count a page load on the calling thread's session and recycle it when it is due"""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            return
+        session.pages += 1
+        reason = None
+        if self.max_pages and session.pages >= self.max_pages:
+            reason = f"after {session.pages} pages"
+        elif self.max_rss_mb and psutil is not None:
+            rss = self._rss_mb(session.driver)
+            if rss > self.max_rss_mb:
+                reason = f"at {rss:.0f}MB"
+        if reason:
+            print(f"Recycling browser {reason}")
+            self._replace(session)
+            with self._lock:
+                self.recycled += 1
+        with self._lock:
+            self._warm_standby()
+
+    def alive(self) -> bool:
+        """Whether the calling thread's browser still responds"""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            return True
+        try:
+            session.driver.current_window_handle
+            return True
+        except Exception:
+            return False
+
+    def restart(self):
+        """Replace the calling thread's crashed browser"""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            return
+        print("Browser crashed, restarting")
+        self._replace(session)
+        with self._lock:
+            self.restarts += 1
+
+    def close(self):
+        """Quit every browser; a standby still starting is cancelled, or quit as soon as it is up"""
+        with self._lock:
+            self._closed = True
+            sessions, self._sessions = self._sessions, []
+            standby, self._standby = self._standby, None
+        if standby is not None and not standby.cancel():
+            standby.add_done_callback(_quit_started)
+        if self._starter is not None:
+            self._starter.shutdown(wait=False)
+            self._starter = None
+        for driver in (session.driver for session in sessions):
+            try:
+                driver.quit()
+            except Exception as e:
+                print(f"Error closing browser: {e}")
+        self._local = threading.local()
@@ -0,0 +1,70 @@
+"""Per-URL validators for incremental recrawls, stored next to the mirror"""
+
+import json
+import sqlite3
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Optional
+
+CACHE_FILENAME = ".mdcrawler_cache.sqlite"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    url TEXT PRIMARY KEY,
+    etag TEXT,
+    last_modified TEXT,
+    lastmod TEXT,
+    sha256 TEXT NOT NULL,
+    links TEXT NOT NULL
+);
+"""
+
+
+@dataclass
+class CachedPage:
+    """What we knew about a page the last time its markdown was written"""
+    url: str
+    sha256: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    lastmod: Optional[str] = None
+    links: List[str] = field(default_factory=list)
+
+
+class PageCache:
+    """SQLite store of HTTP validators, sitemap lastmod and HTML hashes per URL
+
+    Unlike the crawl state this file survives across runs, so a nightly crawl can
+    tell which pages changed since the last one.
+    """
+
+    def __init__(self, output_dir: Path):
+        self.path = Path(output_dir) / CACHE_FILENAME
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def get(self, url: str) -> Optional[CachedPage]:
+        """Return the cached record for url, if any"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT url, sha256, etag, last_modified, lastmod, links FROM pages WHERE url = ?", (url,)).fetchone()
+        if row is None:
+            return None
+        return CachedPage(url=row[0], sha256=row[1], etag=row[2], last_modified=row[3], lastmod=row[4],
+                          links=json.loads(row[5]))
+
+    def put(self, page: CachedPage):
+        """Insert or replace the record for page.url"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages(url, etag, last_modified, lastmod, sha256, links) VALUES (?, ?, ?, ?, ?, ?)",
+                (page.url, page.etag, page.last_modified, page.lastmod, page.sha256, json.dumps(sorted(page.links))))
+            self._conn.commit()
+
+    def close(self):
+        """Close the database"""
+        with self._lock:
+            self._conn.close()
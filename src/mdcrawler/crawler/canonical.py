@@ -0,0 +1,87 @@
+"""URL canonicalization: tracking and session parameters, query order, host case and index pages"""
+
+import fnmatch
+import re
+from typing import Iterable, Tuple
+from urllib.parse import unquote_plus, urlsplit, urlunsplit
+
+# Query parameters that never change page content (glob patterns, matched case-insensitively).
+# Generic names such as sid select content on some sites; add them with drop_params where they do not
+TRACKING_PARAMS: Tuple[str, ...] = (
+    "utm_*", "gclid", "gclsrc", "dclid", "fbclid", "msclkid", "yclid", "twclid", "igshid",
+    "mc_cid", "mc_eid", "_ga", "_gl", "_hsenc", "_hsmi", "mkt_tok", "ref_src",
+    "jsessionid", "phpsessid", "aspsessionid*", "cfid", "cftoken",
+)
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+# ;jsessionid=... style session ids embedded in the path
+_PATH_SESSION = re.compile(r';(?:jsessionid|phpsessid)=[^/?#]*', re.IGNORECASE)
+# Directory index documents, equivalent to the directory itself
+_INDEX_PAGE = re.compile(r'/(?:index|default)\.(?:html?|php|aspx?)$', re.IGNORECASE)
+
+
+def _param_name(param: str) -> str:
+    """Decoded name of a raw name=value query parameter"""
+    return unquote_plus(param.split('=', 1)[0])
+
+
+class UrlCanonicalizer:
+    """Rewrite URLs so that trivially different spellings of a page compare equal
+
+    canonicalize() lowercases scheme and host name, drops default ports,
+    fragments, session ids in the path and the configured query parameters,
+    and sorts the remaining query. Userinfo and the query parameters that are
+    kept stay byte for byte as written (`?print` is not turned into
+    `?print=`), since the canonical URL is the one fetched. key()
+    additionally ignores a trailing slash and a directory index document,
+    for use as an identity only: those variants cannot be rewritten without
+    changing how relative links on the page resolve.
+    """
+
+    def __init__(self, drop_params: Iterable[str] = TRACKING_PARAMS, sort_query: bool = True):
+        self.sort_query = sort_query
+        self._drop_exact = set()
+        self._drop_patterns = []
+        for param in drop_params:
+            param = param.strip().lower()
+            if not param:
+                continue
+            if any(c in param for c in "*?["):
+                self._drop_patterns.append(param)
+            else:
+                self._drop_exact.add(param)
+
+    def _keep_param(self, name: str) -> bool:
+        name = name.lower()
+        if name in self._drop_exact:
+            return False
+        return not any(fnmatch.fnmatchcase(name, pattern) for pattern in self._drop_patterns)
+
+    def canonicalize(self, url: str) -> str:
+        parts = urlsplit(url)
+        scheme = parts.scheme.lower()
+
+        userinfo, at, hostport = parts.netloc.rpartition('@')
+        hostport = hostport.lower()
+        if parts.port is not None and DEFAULT_PORTS.get(scheme) == parts.port:
+            hostport = hostport.rsplit(':', 1)[0]
+        netloc = userinfo + at + hostport
+
+        path = _PATH_SESSION.sub('', parts.path) or '/'
+
+        query = parts.query
+        if query:
+            # Parameters are filtered and sorted as written, never decoded and re-encoded
+            params = [param for param in query.split('&') if self._keep_param(_param_name(param))]
+            if self.sort_query:
+                params.sort(key=lambda param: (_param_name(param), param))
+            query = '&'.join(params)
+
+        return urlunsplit((scheme, netloc, path, query, ''))
+
+    def key(self, canonical_url: str) -> str:
+        """Identity of an already canonical URL, ignoring trailing slashes and index documents"""
+        parts = urlsplit(canonical_url)
+        path = _INDEX_PAGE.sub('/', parts.path).rstrip('/')
+        return urlunsplit((parts.scheme, parts.netloc, path, parts.query, ''))
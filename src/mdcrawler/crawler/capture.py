@@ -0,0 +1,165 @@
+"""Capture store: rendered pages, response headers and assets recorded as gzipped WARC records
+
+Every record is its own gzip member, as in standard .warc.gz files, so the
+store can be appended to by later runs and a crash only loses the record
+being written. Pages are stored as they were rendered (the HTML the crawler
+converted), not as the raw HTTP response, which is what offline
+re-conversion needs.
+"""
+
+import gzip
+import json
+import threading
+import uuid
+import zlib
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterable, Iterator, Optional, Union
+
+from mdcrawler import __version__
+from mdcrawler.utils.memory import iter_utf8, utf8_size
+
+# Kind of content a resource record holds (pages and assets both use WARC-Type resource)
+KIND_HEADER = "X-Mdcrawler-Kind"
+PAGE = "page"
+ASSET = "asset"
+
+CHUNK_SIZE = 64 * 1024
+
+
+@dataclass
+class CaptureRecord:
+    """One record read back from a capture store"""
+    type: str
+    url: Optional[str]
+    headers: Dict[str, str]
+    content: bytes
+
+    @property
+    def kind(self) -> Optional[str]:
+        return self.headers.get(KIND_HEADER)
+
+    @property
+    def content_type(self) -> str:
+        return self.headers.get("Content-Type", "")
+
+
+class CaptureWriter:
+    """Append WARC records to a .warc.gz file, safe to call from several threads"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file: BinaryIO = open(self.path, "ab")
+        self._lock = threading.Lock()
+        self.pages = 0
+        self.assets = 0
+
+    def _write(self, warc_type: str, url: Optional[str], content_type: str, length: int,
+               body: Union[bytes, Path, Iterable[bytes]], extra: Optional[Dict[str, str]] = None) -> str:
+        """Write one record whose block is body (bytes, chunks of bytes, or a file streamed from disk), returns its id"""
+        record_id = f"<urn:uuid:{uuid.uuid4()}>"
+        headers = {
+            "WARC-Type": warc_type,
+            "WARC-Record-ID": record_id,
+            "WARC-Date": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        }
+        if url:
+            headers["WARC-Target-URI"] = url
+        headers.update(extra or {})
+        headers["Content-Type"] = content_type
+        headers["Content-Length"] = str(length)
+        head = "WARC/1.1\r\n" + "".join(f"{name}: {value}\r\n" for name, value in headers.items()) + "\r\n"
+
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # one gzip member per record
+        with self._lock:
+            self._file.write(compressor.compress(head.encode("utf-8")))
+            if isinstance(body, Path):
+                with open(body, "rb") as f:
+                    for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                        self._file.write(compressor.compress(chunk))
+            elif isinstance(body, bytes):
+                self._file.write(compressor.compress(body))
+            else:
+                for chunk in body:
+                    self._file.write(compressor.compress(chunk))
+            self._file.write(compressor.compress(b"\r\n\r\n"))
+            self._file.write(compressor.flush())
+        return record_id
+
+    def write_info(self, fields: Dict[str, object]):
+        """Record the crawl's settings in a warcinfo record"""
+        block = "".join(f"{name}: {value}\r\n" for name, value in {"software": f"mdcrawler/{__version__}", **fields}.items())
+        data = block.encode("utf-8")
+        self._write("warcinfo", None, "application/warc-fields", len(data), data)
+
+    def write_page(self, url: str, html_content: str, response: Optional[dict] = None):
+        """Record a page's HTML as converted, plus its HTTP status and headers when it was fetched statically"""
+        # Encoded in chunks, so a large page is not copied whole
+        record_id = self._write("resource", url, "text/html; charset=utf-8", utf8_size(html_content),
+                                iter_utf8(html_content), {KIND_HEADER: PAGE})
+        if response:
+            metadata = json.dumps(response).encode("utf-8")
+            self._write("metadata", url, "application/json", len(metadata), metadata,
+                        {"WARC-Concurrent-To": record_id})
+        with self._lock:
+            self.pages += 1
+
+    def write_asset(self, url: str, path: Path, content_type: str):
+        """Record a downloaded asset, streamed from its file"""
+        self._write("resource", url, content_type or "application/octet-stream", path.stat().st_size, path,
+                    {KIND_HEADER: ASSET})
+        with self._lock:
+            self.assets += 1
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+def read_capture(path: Path) -> Iterator[CaptureRecord]:
+    """Records of a capture store in the order they were written
+
+    A record cut short by a crash ends the iteration with a warning instead
+    of an error.
+    """
+    with gzip.open(path, "rb") as f:
+        while True:
+            try:
+                line = f.readline()
+                while line in (b"\r\n", b"\n"):
+                    line = f.readline()
+                if not line:
+                    return
+                if not line.startswith(b"WARC/"):
+                    raise ValueError(f"{path}: not a WARC record: {line[:40]!r}")
+
+                headers: Dict[str, str] = {}
+                for line in iter(f.readline, b""):
+                    line = line.decode("utf-8").rstrip("\r\n")
+                    if not line:
+                        break
+                    name, _, value = line.partition(":")
+                    headers[name.strip()] = value.strip()
+                length = int(headers.get("Content-Length", 0))
+                content = f.read(length)
+                if len(content) < length:
+                    raise EOFError
+            except (EOFError, zlib.error, gzip.BadGzipFile):
+                print(f"Warning: {path} ends with an incomplete record, ignoring it")
+                return
+            yield CaptureRecord(headers.get("WARC-Type", ""), headers.get("WARC-Target-URI"), headers, content)
+
+
+def read_info(path: Path) -> Dict[str, str]:
+    """Fields of the first warcinfo record of a capture store"""
+    for record in read_capture(path):
+        if record.type == "warcinfo":
+            fields = {}
+            for line in record.content.decode("utf-8").splitlines():
+                name, sep, value = line.partition(":")
+                if sep:
+                    fields[name.strip()] = value.strip()
+            return fields
+    return {}
@@ -0,0 +1,151 @@
+"""Content fingerprints: exact text hashes and SimHash for near-duplicate pages"""
+
+import hashlib
+import re
+import threading
+from collections import Counter
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+_SKIPPED = re.compile(r'<(script|style|noscript|template|svg)\b[^>]*>.*?</\1\s*>|<!--.*?-->', re.IGNORECASE | re.DOTALL)
+_TAG = re.compile(r'<[^>]+>')
+_WORD = re.compile(r'\w+')
+# The same split in one scan, for pages too large for text-only copies: only group 2 is a word
+_TOKEN = re.compile(r'<(script|style|noscript|template|svg)\b[^>]*>.*?</\1\s*>|<!--.*?-->|<[^>]+>|(\w+)',
+                    re.IGNORECASE | re.DOTALL)
+
+BANDS = 4
+BAND_BITS = 64 // BANDS
+
+# Words handled per batch, bounding the token and feature buffers on very large pages
+TOKEN_BATCH = 65536
+# Pages up to this many characters are tokenized with whole-text substitutions, which is faster
+STREAM_CHARS = 1024 * 1024
+
+
+def token_batches(html_content: str, size: int = TOKEN_BATCH) -> Iterator[List[str]]:
+    """Lowercased words of the page's visible text, in batches
+
+    Large pages are scanned in place rather than through text-only copies.
+    """
+    if len(html_content) <= STREAM_CHARS:
+        words = _WORD.findall(_TAG.sub(' ', _SKIPPED.sub(' ', html_content)).lower())
+        for start in range(0, len(words), size):
+            yield words[start:start + size]
+        return
+    matches = _TOKEN.finditer(html_content)
+    while True:
+        words = [match.group(2) for match in islice(matches, size)]
+        if not words:
+            return
+        words = [word.lower() for word in words if word]
+        if words:
+            yield words
+
+
+def page_tokens(html_content: str) -> List[str]:
+    """Lowercased words of the page's visible text"""
+    return [word for batch in token_batches(html_content) for word in batch]
+
+
+def simhash(tokens: List[str], shingle: int = 3) -> int:
+    """64-bit SimHash over word shingles; similar texts get hashes a few bits apart"""
+    return simhash_batches([tokens], shingle)
+
+
+def simhash_batches(batches: Iterable[List[str]], shingle: int = 3) -> int:
+    """SimHash of the words in consecutive batches, shingles spanning batch boundaries included"""
+    # Tally each byte column of the feature hashes, batch by batch
+    columns = [Counter() for _ in range(8)]
+    carry: List[str] = []
+    hashed = False
+    for batch in batches:
+        window = carry + batch
+        count = len(window) - shingle + 1
+        if count <= 0:
+            carry = window
+            continue
+        features = b''.join(hashlib.blake2b(' '.join(window[i:i + shingle]).encode('utf-8'), digest_size=8).digest()
+                            for i in range(count))
+        for column in range(8):
+            columns[column].update(features[column::8])
+        carry = window[count:]
+        hashed = True
+    if not hashed and carry:
+        # Fewer words than one shingle: the whole text is the only feature
+        columns = [Counter([byte]) for byte in hashlib.blake2b(' '.join(carry).encode('utf-8'), digest_size=8).digest()]
+
+    # Turn the tallies into per-bit votes
+    fingerprint = 0
+    for column in range(8):
+        votes = [0] * 8
+        for byte, count in columns[column].items():
+            for bit in range(8):
+                votes[bit] += count if byte >> bit & 1 else -count
+        for bit in range(8):
+            if votes[bit] > 0:
+                fingerprint |= 1 << (column * 8 + bit)
+    return fingerprint
+
+
+class ContentIndex:
+    """Remember the fingerprint of every page and spot exact or near duplicates
+
+    Pages with the same visible text are exact duplicates; with max_distance
+    > 0, pages whose SimHash differs in at most that many bits are near
+    duplicates. Near-duplicate lookup splits the hash into four bands: two
+    hashes within three bits share at least one band exactly, so only pages
+    in the same band buckets are compared.
+    """
+
+    def __init__(self, max_distance: int = 0):
+        self.max_distance = max(0, min(max_distance, BANDS - 1))
+        self._lock = threading.Lock()
+        self._exact: Dict[str, str] = {}
+        self._bands: Dict[Tuple[int, int], List[Tuple[int, str]]] = {}
+
+    def _band_keys(self, fingerprint: int):
+        mask = (1 << BAND_BITS) - 1
+        return [(band, fingerprint >> (band * BAND_BITS) & mask) for band in range(BANDS)]
+
+    def add(self, url: str, html_content: str) -> Optional[str]:
+        """Index url's content, returns the URL of an earlier page it duplicates, if any"""
+        # The text hash is fed batch by batch while the SimHash consumes the same batches
+        text_hash = hashlib.sha256()
+        words = 0
+
+        def hashed_batches():
+            nonlocal words
+            for batch in token_batches(html_content):
+                text_hash.update(' '.join(batch).encode('utf-8') + b' ')
+                words += len(batch)
+                yield batch
+
+        if self.max_distance:
+            fingerprint = simhash_batches(hashed_batches())
+        else:
+            fingerprint = None
+            for _ in hashed_batches():
+                pass
+        if not words:
+            # Nothing to compare (empty page or an app shell)
+            return None
+        return self._match_or_add(url, text_hash.hexdigest(), fingerprint)
+
+    def _match_or_add(self, url: str, digest: str, fingerprint: Optional[int]) -> Optional[str]:
+        """URL of an indexed page with the same digest or a close fingerprint, else index url and return None"""
+        with self._lock:
+            original = self._exact.get(digest)
+            if original is not None:
+                return original
+            if fingerprint is not None:
+                keys = self._band_keys(fingerprint)
+                for key in keys:
+                    for other, other_url in self._bands.get(key, ()):
+                        if bin(fingerprint ^ other).count('1') <= self.max_distance:
+                            return other_url
+            self._exact[digest] = url
+            if fingerprint is not None:
+                for key in keys:
+                    self._bands.setdefault(key, []).append((fingerprint, url))
+        return None
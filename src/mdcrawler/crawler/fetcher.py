@@ -0,0 +1,260 @@
+"""Asynchronous HTTP layer: pooled HTTP/1.1 and HTTP/2 connections, DNS cache and bounded concurrency"""
+
+import asyncio
+import importlib.util
+import ipaddress
+import socket
+import time
+import urllib.request
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import charset_normalizer
+import httpcore
+import httpx
+
+from mdcrawler import __version__
+from mdcrawler.utils.aio import EventLoopThread
+
+# HTTP/2 needs the optional h2 package (pip install httpx[http2])
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+READ_CHUNK = 64 * 1024
+
+# Product token robots.txt rules are matched against; sent as User-Agent with the version
+USER_AGENT = "mdcrawler"
+
+# httpcore errors and the httpx errors callers expect instead, most specific first
+_ERRORS = (
+    (httpcore.ConnectTimeout, httpx.ConnectTimeout),
+    (httpcore.ReadTimeout, httpx.ReadTimeout),
+    (httpcore.WriteTimeout, httpx.WriteTimeout),
+    (httpcore.PoolTimeout, httpx.PoolTimeout),
+    (httpcore.TimeoutException, httpx.TimeoutException),
+    (httpcore.ConnectError, httpx.ConnectError),
+    (httpcore.ReadError, httpx.ReadError),
+    (httpcore.WriteError, httpx.WriteError),
+    (httpcore.NetworkError, httpx.NetworkError),
+    (httpcore.RemoteProtocolError, httpx.RemoteProtocolError),
+    (httpcore.LocalProtocolError, httpx.LocalProtocolError),
+    (httpcore.ProtocolError, httpx.ProtocolError),
+    (httpcore.UnsupportedProtocol, httpx.UnsupportedProtocol),
+)
+
+
+def _detect_encoding(content: bytes) -> str:
+    """Charset for bodies without one in Content-Type, guessed like requests' apparent_encoding"""
+    best = charset_normalizer.from_bytes(content).best()
+    return best.encoding if best else "utf-8"
+
+
+@contextmanager
+def _httpx_errors() -> Iterator[None]:
+    """Raise httpcore errors as their httpx counterparts"""
+    try:
+        yield
+    except Exception as e:
+        for error, httpx_error in _ERRORS:
+            if isinstance(e, error):
+                raise httpx_error(str(e)) from e
+        raise
+
+
+class _CachingBackend(httpcore.AsyncNetworkBackend):
+    """Network backend that resolves each host once per ttl instead of on every new connection
+
+    Only the TCP connect goes to the cached addresses, tried in the order the
+    resolver returned them, so a dual-stack or multi-A host still falls back
+    to its other addresses; TLS still uses the original hostname for SNI and
+    certificate checks.
+    """
+
+    def __init__(self, backend: httpcore.AsyncNetworkBackend, ttl: float = 300.0):
+        self._backend = backend
+        self._ttl = ttl
+        self._cache: Dict[Tuple[str, int], Tuple[List[str], float]] = {}
+
+    async def _resolve(self, host: str, port: int) -> List[str]:
+        try:
+            ipaddress.ip_address(host)
+            return [host]
+        except ValueError:
+            pass
+        cached = self._cache.get((host, port))
+        if cached and cached[1] > time.monotonic():
+            return cached[0]
+        try:
+            infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        except socket.gaierror as e:
+            raise httpcore.ConnectError(str(e)) from e
+        addresses = list(dict.fromkeys(info[4][0] for info in infos))
+        self._cache[(host, port)] = (addresses, time.monotonic() + self._ttl)
+        return addresses
+
+    async def connect_tcp(self, host, port, timeout=None, local_address=None, socket_options=None):
+        error = None
+        for address in await self._resolve(host, port):
+            try:
+                return await self._backend.connect_tcp(address, port, timeout=timeout, local_address=local_address,
+                                                       socket_options=socket_options)
+            except Exception as e:
+                error = e
+        # The host may have moved: resolve again on the next attempt
+        self._cache.pop((host, port), None)
+        raise error
+
+    async def connect_unix_socket(self, path, timeout=None, socket_options=None):
+        return await self._backend.connect_unix_socket(path, timeout=timeout, socket_options=socket_options)
+
+    async def sleep(self, seconds: float):
+        await self._backend.sleep(seconds)
+
+
+class _ResponseStream(httpx.AsyncByteStream):
+    """Body of an httpcore response as httpx reads it"""
+
+    def __init__(self, stream):
+        self._stream = stream
+
+    async def __aiter__(self):
+        with _httpx_errors():
+            async for chunk in self._stream:
+                yield chunk
+
+    async def aclose(self):
+        await self._stream.aclose()
+
+
+class _CachingTransport(httpx.AsyncBaseTransport):
+    """httpx transport over an httpcore connection pool that connects through a _CachingBackend"""
+
+    def __init__(self, http2: bool, limits: httpx.Limits, dns_ttl: float = 300.0):
+        self._pool = httpcore.AsyncConnectionPool(
+            ssl_context=httpx.create_ssl_context(),
+            max_connections=limits.max_connections,
+            max_keepalive_connections=limits.max_keepalive_connections,
+            keepalive_expiry=limits.keepalive_expiry,
+            http2=http2,
+            network_backend=_CachingBackend(httpcore.AnyIOBackend(), dns_ttl),
+        )
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        core_request = httpcore.Request(
+            method=request.method,
+            url=httpcore.URL(scheme=request.url.raw_scheme, host=request.url.raw_host, port=request.url.port,
+                             target=request.url.raw_path),
+            headers=request.headers.raw,
+            content=request.stream,
+            extensions=request.extensions,
+        )
+        with _httpx_errors():
+            response = await self._pool.handle_async_request(core_request)
+        return httpx.Response(status_code=response.status, headers=response.headers,
+                              stream=_ResponseStream(response.stream), extensions=response.extensions)
+
+    async def aclose(self):
+        await self._pool.aclose()
+
+
+class AsyncFetcher:
+    """Shared async HTTP client running on a background event loop
+
+    At most max_concurrency requests are in flight overall and per_host per
+    host, so hundreds of downloads can be pending without a thread each.
+    Coroutines run on the fetcher's EventLoopThread; synchronous callers use
+    the fetch/head wrappers.
+
+    Direct connections go through a DNS cache. When HTTP_PROXY, HTTPS_PROXY
+    or ALL_PROXY is set, httpx's own transports are used instead, so the
+    proxy and NO_PROXY settings apply as usual (the proxy resolves names).
+    """
+
+    def __init__(self, max_concurrency: int = 64, per_host: int = 16, timeout: float = 10.0,
+                 http2: bool = True, loop: Optional[EventLoopThread] = None):
+        self.max_concurrency = max(1, max_concurrency)
+        self.per_host = max(1, per_host)
+        self.timeout = timeout
+        self.http2 = http2 and HTTP2_AVAILABLE
+        self.loop = loop or EventLoopThread()
+        self._client: Optional[httpx.AsyncClient] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._host_slots: Dict[str, asyncio.Semaphore] = {}
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """The pooled client, created on the event loop on first use"""
+        if self._client is None:
+            limits = httpx.Limits(max_connections=self.max_concurrency, max_keepalive_connections=self.max_concurrency)
+            if any(scheme != "no" for scheme in urllib.request.getproxies_environment()):
+                transport = None  # httpx mounts the proxies itself, only without a custom transport
+            else:
+                transport = _CachingTransport(http2=self.http2, limits=limits)
+            self._client = httpx.AsyncClient(transport=transport, http2=self.http2, limits=limits,
+                                             timeout=self.timeout, follow_redirects=True,
+                                             headers={"User-Agent": f"{USER_AGENT}/{__version__}"},
+                                             default_encoding=_detect_encoding)
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+        return self._client
+
+    @asynccontextmanager
+    async def _slot(self, url: str) -> AsyncIterator[None]:
+        client = self.client  # creates the global semaphore on first use
+        host = urlparse(url).netloc
+        host_slot = self._host_slots.get(host)
+        if host_slot is None:
+            host_slot = self._host_slots[host] = asyncio.Semaphore(self.per_host)
+        async with self._slots, host_slot:
+            yield
+
+    @asynccontextmanager
+    async def stream(self, url: str, headers: Optional[dict] = None) -> AsyncIterator[httpx.Response]:
+        """GET url without reading the body, for streaming it in chunks"""
+        async with self._slot(url):
+            async with self.client.stream("GET", url, headers=headers) as response:
+                yield response
+
+    async def get(self, url: str, headers: Optional[dict] = None, read: bool = True, max_bytes: int = 0) -> httpx.Response:
+        """GET url; with read unset only the status line and headers are received
+
+        With max_bytes, at most that many bytes of the (decoded) body are read
+        and the connection is dropped, so an oversized page never sits in memory
+        whole. The response returned then holds that decoded body, so it comes
+        without the Content-Encoding and Content-Length headers of the original.
+        """
+        async with self.stream(url, headers=headers) as response:
+            if read and max_bytes:
+                body = bytearray()
+                async for chunk in response.aiter_bytes(READ_CHUNK):
+                    body += chunk
+                    if len(body) >= max_bytes:
+                        del body[max_bytes:]
+                        break
+                headers = [(name, value) for name, value in response.headers.multi_items()
+                           if name not in ("content-encoding", "content-length")]
+                truncated = httpx.Response(response.status_code, headers=headers, content=bytes(body),
+                                           request=response.request, default_encoding=_detect_encoding)
+                truncated.history = response.history
+                return truncated
+            elif read:
+                await response.aread()
+            return response
+
+    async def head(self, url: str) -> httpx.Response:
+        async with self._slot(url):
+            return await self.client.head(url)
+
+    def fetch(self, url: str, headers: Optional[dict] = None, read: bool = True, max_bytes: int = 0) -> httpx.Response:
+        """Blocking GET for synchronous callers"""
+        return self.loop.run(self.get(url, headers=headers, read=read, max_bytes=max_bytes))
+
+    def fetch_head(self, url: str) -> httpx.Response:
+        """Blocking HEAD for synchronous callers"""
+        return self.loop.run(self.head(url))
+
+    def close(self):
+        """Close pooled connections and stop the event loop"""
+        if self._client is not None and self.loop.started:
+            self.loop.run(self._client.aclose())
+            self._client = None
+        self.loop.close()
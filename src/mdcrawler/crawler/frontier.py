@@ -0,0 +1,131 @@
+"""Crawl frontier: URLs waiting to be crawled together with their depth"""
+
+import heapq
+import itertools
+from collections import deque
+from typing import Deque, Dict, Iterable, List, Optional, Set, Tuple
+
+from mdcrawler.crawler.scoring import UrlScorer
+
+
+class Frontier:
+    """In-memory FIFO frontier that remembers every URL it has ever queued
+
+    Push, pop and membership checks are all O(1): the queue is a deque, and a
+    seen dict (URL to depth) plus a pending set replace scans of the queue.
+
+    Its methods are the backend interface WebCrawler.crawl works through;
+    CrawlState (one node, on disk) and ShardedCrawlState (several nodes
+    sharing one database) provide the same methods.
+    """
+
+    def __init__(self):
+        self.to_visit: Deque[str] = deque()
+        self.url_depths: Dict[str, int] = {}
+        self.pending: Set[str] = set()
+
+    def push(self, url: str, depth: int) -> bool:
+        """Queue url at depth, returns False if it was already seen
+
+        A URL that is still waiting keeps the smallest depth it was discovered at,
+        since parallel workers can report links out of BFS order.
+        """
+        if url not in self.url_depths:
+            self.url_depths[url] = depth
+            self.to_visit.append(url)
+            self.pending.add(url)
+            return True
+        if depth < self.url_depths[url] and url in self.pending:
+            self.url_depths[url] = depth
+        return False
+
+    def push_many(self, entries: Iterable[Tuple[str, int]]):
+        """Queue several (url, depth) entries"""
+        for url, depth in entries:
+            self.push(url, depth)
+
+    def pop(self) -> Optional[Tuple[str, int]]:
+        """Take the next URL and its depth, or None if nothing is waiting"""
+        if not self.to_visit:
+            return None
+        url = self.to_visit.popleft()
+        self.pending.discard(url)
+        return url, self.url_depths.get(url, 0)
+
+    def done(self, url: str):
+        """Record that url has been fully crawled"""
+
+    def release(self, url: str):
+        """Record that url was dropped or failed without being written"""
+
+    def claim_form(self, key: str, url: str) -> str:
+        """Spelling that stands for every URL with canonical key, the first one claimed"""
+        return url
+
+    def wait_for_work(self) -> bool:
+        """Whether more URLs may still arrive once the queue is empty, after waiting a moment for them"""
+        return False
+
+    def completed(self) -> int:
+        """Number of pages completed in earlier runs"""
+        return 0
+
+    def close(self):
+        """Release any resources held by the frontier"""
+
+    def __len__(self) -> int:
+        return len(self.to_visit)
+
+
+class PriorityFrontier(Frontier):
+    """In-memory frontier that hands out the highest scoring URL first
+
+    Every push of a waiting URL counts as one more inlink and rescores it.
+    Rescored URLs are pushed onto the heap again and outdated heap entries
+    are skipped when popped, so push and pop stay O(log n). Equal scores
+    come out in discovery order.
+    """
+
+    def __init__(self, scorer: UrlScorer):
+        super().__init__()
+        self.scorer = scorer
+        self._heap: List[Tuple[float, int, str]] = []
+        self._order = itertools.count()
+        # Discovery order, inlinks and current score of waiting URLs
+        self._waiting: Dict[str, Tuple[int, int, float]] = {}
+
+    def push(self, url: str, depth: int) -> bool:
+        """Queue url at depth, or count another inlink if it is waiting; returns False if it was already seen"""
+        if url not in self.url_depths:
+            self.url_depths[url] = depth
+            self.pending.add(url)
+            self._enqueue(url, next(self._order), 1)
+            return True
+        waiting = self._waiting.get(url)
+        if waiting is not None:
+            if depth < self.url_depths[url]:
+                self.url_depths[url] = depth
+            self._enqueue(url, waiting[0], waiting[1] + 1)
+        return False
+
+    def _enqueue(self, url: str, order: int, inlinks: int):
+        score = self.scorer.score(url, self.url_depths[url], inlinks)
+        previous = self._waiting.get(url)
+        self._waiting[url] = (order, inlinks, score)
+        if previous is None or previous[2] != score:
+            heapq.heappush(self._heap, (-score, order, url))
+
+    def pop(self) -> Optional[Tuple[str, int]]:
+        """Take the best scoring URL and its depth, or None if nothing is waiting"""
+        while self._heap:
+            neg_score, _, url = heapq.heappop(self._heap)
+            waiting = self._waiting.get(url)
+            if waiting is None or waiting[2] != -neg_score:
+                continue  # superseded by a later rescore
+            del self._waiting[url]
+            self.pending.discard(url)
+            return url, self.url_depths.get(url, 0)
+        return None
+
+    def __len__(self) -> int:
+        return len(self._waiting)
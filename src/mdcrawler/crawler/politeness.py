@@ -0,0 +1,245 @@
+"""Per-host politeness: concurrency caps, request pacing, robots.txt and adaptive backoff"""
+
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from typing import Dict, Iterator, Optional, Tuple
+from urllib.parse import urlparse
+from urllib.robotparser import RobotFileParser
+
+from mdcrawler.crawler.fetcher import USER_AGENT, AsyncFetcher
+
+# Responses that mean "slow down"
+BACKOFF_STATUSES = (429, 503)
+
+# Attempts at fetching a robots.txt that answers 429/5xx or cannot be reached, the longest
+# wait between them, and how long the host then stays disallowed before robots.txt is
+# fetched again (RFC 9309 2.3.1.4)
+ROBOTS_ATTEMPTS = 3
+ROBOTS_MAX_WAIT = 5.0
+ROBOTS_UNREACHABLE_TTL = 300.0
+
+
+def _retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds from a Retry-After header, given either as seconds or as an HTTP date"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class _Host:
+    """Pacing state of one host"""
+
+    def __init__(self, max_concurrent: int):
+        self.slots = threading.BoundedSemaphore(max_concurrent) if max_concurrent > 0 else None
+        self.min_interval: Optional[float] = None  # per-host override of the scheduler's rate
+        self.next_start = 0.0
+        self.crawl_delay = 0.0
+        self.backoff = 0.0
+        self.latency: Optional[float] = None
+        self.baseline: Optional[float] = None
+        self.robots: Optional[RobotFileParser] = None
+        self.robots_expires: Optional[float] = None  # when rules assumed for an unreachable robots.txt lapse
+        self.robots_fetch: Optional[Future] = None  # robots.txt being fetched, shared by every caller meanwhile
+        self.robots_lock = threading.Lock()
+
+
+class PolitenessScheduler:
+    """Decide when requests to a host may start
+
+    Requests to one host start at least max(1 / rate, Crawl-delay, backoff)
+    seconds apart and at most max_per_host run at once (0 = no cap). The
+    backoff grows on 429/503 responses, honoring Retry-After, and when a
+    host's smoothed latency climbs well above the best seen so far; it
+    decays again while responses are healthy. robots.txt is fetched once
+    per host and its disallow rules and Crawl-delay are applied. Following
+    RFC 9309, a missing robots.txt (4xx) allows everything, while one that
+    answers 429/5xx or cannot be reached is retried and, if it stays
+    unreachable, disallows the whole host until it is fetched again
+    ROBOTS_UNREACHABLE_TTL seconds later.
+    """
+
+    def __init__(self, fetcher: AsyncFetcher, max_per_host: int = 0, rate: float = 0.0,
+                 respect_robots: bool = True, max_delay: float = 60.0, user_agent: str = USER_AGENT):
+        self.fetcher = fetcher
+        self.max_per_host = max(0, max_per_host)
+        self.min_interval = 1.0 / rate if rate > 0 else 0.0
+        self.respect_robots = respect_robots
+        self.max_delay = max_delay
+        self.user_agent = user_agent
+        self.backoffs = 0
+        self._hosts: Dict[str, _Host] = {}
+        self._lock = threading.Lock()
+
+    def _host(self, url: str) -> _Host:
+        netloc = urlparse(url).netloc
+        with self._lock:
+            host = self._hosts.get(netloc)
+            if host is None:
+                host = _Host(self.max_per_host)
+                self._hosts[netloc] = host
+            return host
+
+    def configure_host(self, url: str, max_per_host: Optional[int] = None, rate: Optional[float] = None):
+        """Override the concurrency cap and rate for url's host
+
+        Requests already holding a slot release it to the cap they started
+        under, so reconfiguring a busy host is safe; the new cap applies to
+        the requests that start afterwards.
+        """
+        host = self._host(url)
+        with self._lock:
+            if max_per_host is not None:
+                host.slots = threading.BoundedSemaphore(max_per_host) if max_per_host > 0 else None
+            if rate is not None:
+                host.min_interval = 1.0 / rate if rate > 0 else 0.0
+
+    def _robots(self, url: str, host: _Host) -> RobotFileParser:
+        """robots.txt rules for the host of url, fetched on first use
+
+        The fetch and its retries run without holding the host's lock: callers
+        arriving meanwhile wait for that same fetch, or keep applying the
+        expired rules of an unreachable robots.txt while it is fetched again.
+        """
+        with host.robots_lock:
+            if host.robots is not None and (host.robots_expires is None or time.monotonic() < host.robots_expires):
+                return host.robots
+            if host.robots_fetch is not None:
+                if host.robots is not None:
+                    return host.robots
+                waiting = host.robots_fetch
+            else:
+                waiting = None
+                fetching = host.robots_fetch = Future()
+        if waiting is not None:
+            return waiting.result()
+
+        try:
+            robots, expires = self._fetch_robots(url)
+        except BaseException as e:
+            with host.robots_lock:
+                host.robots_fetch = None
+            fetching.set_exception(e)
+            raise
+        delay = robots.crawl_delay(self.user_agent)
+        if delay:
+            host.crawl_delay = min(float(delay), self.max_delay)
+            print(f"Crawl-delay for {urlparse(url).netloc}: {host.crawl_delay}s")
+        with host.robots_lock:
+            host.robots, host.robots_expires, host.robots_fetch = robots, expires, None
+        fetching.set_result(robots)
+        return robots
+
+    def _fetch_robots(self, url: str) -> Tuple[RobotFileParser, Optional[float]]:
+        """Fetch and parse robots.txt for the host of url, returns the rules and when they expire (None = never)
+
+        429/5xx answers and network errors are retried, waiting at most
+        ROBOTS_MAX_WAIT seconds in between; if robots.txt stays unreachable
+        the whole host is disallowed for ROBOTS_UNREACHABLE_TTL seconds.
+        """
+        parsed = urlparse(url)
+        robots = RobotFileParser(f"{parsed.scheme}://{parsed.netloc}/robots.txt")
+        wait = 0.0
+        for attempt in range(ROBOTS_ATTEMPTS):
+            if attempt:
+                time.sleep(min(ROBOTS_MAX_WAIT, self.max_delay, wait))
+            try:
+                response = self.fetcher.fetch(robots.url)
+            except Exception as e:
+                print(f"Error fetching {robots.url}: {e}")
+                wait = 2.0 ** attempt
+                continue
+            if response.status_code in BACKOFF_STATUSES or response.status_code >= 500:
+                print(f"{robots.url} answered {response.status_code}")
+                wait = _retry_after(response.headers.get('Retry-After')) or 2.0 ** attempt
+                continue
+            if response.status_code in (401, 403):
+                robots.disallow_all = True
+            elif response.status_code >= 400:
+                robots.allow_all = True
+            else:
+                robots.parse(response.text.splitlines())
+            return robots, None
+
+        # Unreachable: assume a complete disallow for now, and ask again later
+        print(f"robots.txt of {parsed.netloc} is unreachable, not crawling it for {ROBOTS_UNREACHABLE_TTL:.0f}s")
+        robots.disallow_all = True
+        return robots, time.monotonic() + ROBOTS_UNREACHABLE_TTL
+
+    def allowed(self, url: str) -> bool:
+        """Whether robots.txt lets us fetch url"""
+        if not self.respect_robots:
+            return True
+        return self._robots(url, self._host(url)).can_fetch(self.user_agent, url)
+
+    def _min_interval(self, host: _Host) -> float:
+        return self.min_interval if host.min_interval is None else host.min_interval
+
+    def _interval(self, host: _Host) -> float:
+        return max(self._min_interval(host), host.crawl_delay, host.backoff)
+
+    def ready_in(self, url: str) -> float:
+        """Seconds until a request to url's host may start, without reserving anything"""
+        host = self._host(url)
+        with self._lock:
+            return max(0.0, host.next_start - time.monotonic())
+
+    @contextmanager
+    def slot(self, url: str) -> Iterator[float]:
+        """Hold a concurrency slot for url's host, starting no earlier than its pacing allows
+
+        Yields the seconds spent waiting for the slot.
+        """
+        waiting = time.monotonic()
+        host = self._host(url)
+        if self.respect_robots:
+            self._robots(url, host)
+        # configure_host may replace the semaphore meanwhile: release the one acquired
+        slots = host.slots
+        if slots is not None:
+            slots.acquire()
+        try:
+            with self._lock:
+                now = time.monotonic()
+                start = max(now, host.next_start)
+                host.next_start = start + self._interval(host)
+            if start > now:
+                time.sleep(start - now)
+            yield time.monotonic() - waiting
+        finally:
+            if slots is not None:
+                slots.release()
+
+    def record(self, url: str, status: Optional[int], elapsed: float, retry_after: Optional[str] = None):
+        """Adapt the host's backoff to a finished request (status None when unknown, e.g. browser loads)"""
+        host = self._host(url)
+        with self._lock:
+            host.latency = elapsed if host.latency is None else 0.7 * host.latency + 0.3 * elapsed
+            host.baseline = host.latency if host.baseline is None else min(host.baseline, host.latency)
+            floor = max(self._min_interval(host), 0.25)
+
+            if status in BACKOFF_STATUSES:
+                self.backoffs += 1
+                wait = _retry_after(retry_after)
+                host.backoff = min(self.max_delay, max(host.backoff * 2, floor, wait or 0.0))
+                host.next_start = max(host.next_start, time.monotonic() + host.backoff)
+            elif host.latency > 2 * host.baseline and host.latency - host.baseline > 0.5:
+                # The host is slowing down under our load
+                host.backoff = min(self.max_delay, max(host.backoff * 1.5, floor))
+            else:
+                host.backoff *= 0.8
+                if host.backoff < 0.05:
+                    host.backoff = 0.0
+
+    def should_retry(self, status: Optional[int]) -> bool:
+        """Whether a response asked us to come back later"""
+        return status in BACKOFF_STATUSES
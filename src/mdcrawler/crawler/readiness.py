@@ -0,0 +1,75 @@
+"""Page readiness strategies used after a browser navigation"""
+
+import time
+
+# Installs a MutationObserver once per document and records the time of the last DOM change
+_MUTATION_PROBE = """
+if (window.__mdcrawlerLastMutation === undefined) {
+    window.__mdcrawlerLastMutation = performance.now();
+    new MutationObserver(function () {
+        window.__mdcrawlerLastMutation = performance.now();
+    }).observe(document, {subtree: true, childList: true, attributes: true, characterData: true});
+}
+return [document.readyState, performance.now() - window.__mdcrawlerLastMutation];
+"""
+
+_NETWORK_PROBE = """
+return [document.readyState, performance.getEntriesByType('resource').length];
+"""
+
+_READY_STATE_PROBE = "return document.readyState;"
+
+STRATEGIES = ('fixed', 'load', 'network-idle', 'mutation')
+
+POLL_INTERVAL = 0.1
+
+
+def wait_until_ready(driver, strategy: str = "mutation", timeout: float = 10.0, quiet: float = 0.5) -> float:
+    """Block until the current page is ready according to strategy, returns seconds waited
+
+    - fixed: sleep for `quiet` seconds regardless of page state (legacy behaviour)
+    - load: document.readyState == 'complete'
+    - network-idle: page loaded and no new resource entries for `quiet` seconds
+    - mutation: page loaded and no DOM mutations for `quiet` seconds
+
+    Waiting never exceeds `timeout`; a page that is still busy at the cap is used as is.
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown readiness strategy {strategy!r}, expected one of {', '.join(STRATEGIES)}")
+
+    start = time.monotonic()
+    deadline = start + timeout
+
+    if strategy == 'fixed':
+        time.sleep(min(quiet, timeout))
+        return time.monotonic() - start
+
+    resource_count = -1
+    resources_changed_at = start
+
+    while True:
+        now = time.monotonic()
+        try:
+            if strategy == 'load':
+                if driver.execute_script(_READY_STATE_PROBE) == 'complete':
+                    break
+            elif strategy == 'network-idle':
+                ready_state, count = driver.execute_script(_NETWORK_PROBE)
+                if count != resource_count:
+                    resource_count = count
+                    resources_changed_at = now
+                if ready_state == 'complete' and now - resources_changed_at >= quiet:
+                    break
+            else:
+                ready_state, idle_ms = driver.execute_script(_MUTATION_PROBE)
+                if ready_state == 'complete' and idle_ms / 1000.0 >= quiet:
+                    break
+        except Exception:
+            # Navigations in progress can make scripts fail transiently; keep polling
+            pass
+
+        if now >= deadline:
+            break
+        time.sleep(POLL_INTERVAL)
+
+    return time.monotonic() - start
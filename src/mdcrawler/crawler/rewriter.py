@@ -0,0 +1,131 @@
+"""Single-pass HTML rewriter for img and anchor tags, plus the page's rel=canonical link"""
+
+import html
+import re
+from typing import List, NamedTuple, Optional
+from urllib.parse import urljoin
+
+from mdcrawler.utils.memory import utf8_prefix_length
+
+# One scanner for everything the rewriter cares about. Comments, scripts and styles
+# are matched whole so tags inside them are left alone; the attribute part of a tag
+# allows '>' inside quoted values. Every alternative consumes input linearly.
+_TOKEN = re.compile(
+    r'<!--.*?-->'
+    r'|<(?P<raw>script|style)\b[^>]*>.*?</(?P=raw)\s*>'
+    r'|<(?P<close>/?)(?P<tag>a|img)\b(?P<attrs>(?:[^>"\']|"[^"]*"|\'[^\']*\')*)>',
+    re.IGNORECASE | re.DOTALL,
+)
+_ATTR = re.compile(r'([^\s=/>"\']+)\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s>"\']+))')
+_LINK_TAG = re.compile(r'<link\b(?P<attrs>(?:[^>"\']|"[^"]*"|\'[^\']*\')*)>', re.IGNORECASE)
+_HEAD_END = re.compile(r'</head\s*>|<body\b', re.IGNORECASE)
+_INNER_TAG = re.compile(r'<[^>]*>')
+_WHITESPACE = re.compile(r'\s+')
+
+
+class RewriteResult(NamedTuple):
+    """Rewritten HTML plus the image sources and anchor hrefs (entities decoded) found on the way"""
+    html: str
+    images: List[str]
+    links: List[str]
+
+
+def _attributes(attrs: str) -> dict:
+    """Parse a tag's attribute string, first occurrence of a name wins"""
+    parsed = {}
+    for match in _ATTR.finditer(attrs):
+        name = match.group(1).lower()
+        if name not in parsed:
+            value = match.group(2)
+            if value is None:
+                value = match.group(3) if match.group(3) is not None else match.group(4)
+            parsed[name] = value
+    return parsed
+
+
+def find_canonical(html_content: str, base_url: str) -> Optional[str]:
+    """Absolute URL of the page's <link rel="canonical">, if it declares one in its head"""
+    head_end = _HEAD_END.search(html_content)
+    head = html_content[:head_end.start()] if head_end else html_content
+    for match in _LINK_TAG.finditer(head):
+        attrs = _attributes(match.group('attrs'))
+        if 'canonical' in (attrs.get('rel') or '').lower().split() and attrs.get('href'):
+            return urljoin(base_url, html.unescape(attrs['href'].strip()))
+    return None
+
+
+def truncate_html(html_content: str, max_bytes: int) -> str:
+    """Start of a page that fits in max_bytes of UTF-8, cut before the last tag that would be split"""
+    max_chars = utf8_prefix_length(html_content, max_bytes)
+    if len(html_content) <= max_chars:
+        return html_content
+    end = html_content.rfind('<', 0, max_chars + 1)
+    return html_content[:end if end > 0 else max_chars]
+
+
+def rewrite_html(html_content: str, base_url: str) -> RewriteResult:
+    """Turn img tags into ![alt](url) and anchors into [text](url) in one scan
+
+    Image and link URLs are resolved against base_url. Anchor text is the
+    anchor's content with inner tags removed, so linked images become
+    [![alt](src)](href). Anchors without an href, or never closed, are kept as is.
+    """
+    out: List[str] = []
+    images: List[str] = []
+    links: List[str] = []
+
+    # While inside an anchor: its opening tag, href and the output index where its content starts
+    anchor_tag = None
+    anchor_href = None
+    anchor_start = 0
+    pos = 0
+
+    for match in _TOKEN.finditer(html_content):
+        tag = match.group('tag')
+        if tag is None:
+            continue
+
+        out.append(html_content[pos:match.start()])
+        pos = match.end()
+        tag = tag.lower()
+
+        if tag == 'img':
+            attrs = _attributes(match.group('attrs'))
+            src = attrs.get('src')
+            if src is None or match.group('close'):
+                out.append(match.group(0))
+                continue
+            images.append(html.unescape(src))
+            alt_text = attrs.get('alt', 'image')
+            out.append(f"![{alt_text}]({urljoin(base_url, src)})")
+
+        elif not match.group('close'):
+            if anchor_tag is not None:
+                # Unclosed anchor: leave it untouched
+                out.insert(anchor_start, anchor_tag)
+            attrs = _attributes(match.group('attrs'))
+            href = attrs.get('href')
+            if href is None:
+                anchor_tag = None
+                out.append(match.group(0))
+                continue
+            links.append(html.unescape(href))
+            anchor_tag = match.group(0)
+            anchor_href = href
+            anchor_start = len(out)
+
+        elif anchor_tag is not None:
+            inner = ''.join(out[anchor_start:])
+            del out[anchor_start:]
+            link_text = _WHITESPACE.sub(' ', _INNER_TAG.sub('', inner)).strip() or "link"
+            out.append(f"[{link_text}]({urljoin(base_url, anchor_href)})")
+            anchor_tag = None
+
+        else:
+            out.append(match.group(0))
+
+    out.append(html_content[pos:])
+    if anchor_tag is not None:
+        out.insert(anchor_start, anchor_tag)
+
+    return RewriteResult(''.join(out), images, links)
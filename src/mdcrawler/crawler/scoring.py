@@ -0,0 +1,72 @@
+"""URL filters and priority scores deciding which pages a limited crawl fetches first"""
+
+import fnmatch
+import math
+from typing import Dict, Iterable, List, Tuple
+from urllib.parse import urlsplit
+
+
+def parse_boost(spec: str) -> Tuple[str, float]:
+    """Split a GLOB=WEIGHT boost into its pattern and weight"""
+    pattern, sep, weight = spec.rpartition('=')
+    if not sep or not pattern:
+        raise ValueError(f"expected GLOB=WEIGHT, got {spec!r}")
+    return pattern, float(weight)
+
+
+class UrlScorer:
+    """Score URLs for the priority frontier and filter them before they are queued
+
+    A URL's score is
+
+        sitemap_weight * <priority> - depth_weight * depth
+            + inlink_weight * log2(1 + inlinks) + sum of matching boosts
+
+    where <priority> is the sitemap's value for the URL (0.5 when it has
+    none) and inlinks counts the crawled pages linking to it so far. Glob
+    patterns are matched against the path and query, or against the whole
+    URL if they contain "://".
+    """
+
+    def __init__(self, include: Iterable[str] = (), exclude: Iterable[str] = (),
+                 boosts: Iterable[Tuple[str, float]] = (), depth_weight: float = 1.0,
+                 inlink_weight: float = 0.5, sitemap_weight: float = 1.0):
+        self.include: List[str] = list(include)
+        self.exclude: List[str] = list(exclude)
+        self.boosts: List[Tuple[str, float]] = list(boosts)
+        self.depth_weight = depth_weight
+        self.inlink_weight = inlink_weight
+        self.sitemap_weight = sitemap_weight
+        # <priority> of sitemap entries, filled in while sitemaps are read
+        self.sitemap_priority: Dict[str, float] = {}
+
+    @staticmethod
+    def _matches(pattern: str, url: str, target: str) -> bool:
+        """Match pattern against the full url if it names a scheme, else against target"""
+        return fnmatch.fnmatchcase(url if '://' in pattern else target, pattern)
+
+    @staticmethod
+    def _target(url: str) -> str:
+        """Path plus query of url"""
+        parts = urlsplit(url)
+        path = parts.path or '/'
+        return f"{path}?{parts.query}" if parts.query else path
+
+    def allowed(self, url: str) -> bool:
+        """Whether url passes the include and exclude globs"""
+        if not self.include and not self.exclude:
+            return True
+        target = self._target(url)
+        if self.include and not any(self._matches(p, url, target) for p in self.include):
+            return False
+        return not any(self._matches(p, url, target) for p in self.exclude)
+
+    def score(self, url: str, depth: int, inlinks: int = 1) -> float:
+        """Priority of url, higher is crawled first"""
+        score = (self.sitemap_weight * self.sitemap_priority.get(url, 0.5)
+                 - self.depth_weight * depth
+                 + self.inlink_weight * math.log2(1 + inlinks))
+        if self.boosts:
+            target = self._target(url)
+            score += sum(weight for pattern, weight in self.boosts if self._matches(pattern, url, target))
+        return score
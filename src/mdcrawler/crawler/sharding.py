@@ -0,0 +1,235 @@
+"""Sharded crawls: several processes or hosts crawl one site through a shared SQLite frontier
+
+Every URL belongs to one shard, picked by hashing its canonical key
+(state.shard_of), and only that shard's node fetches it. Nodes push the
+links they find into the shared database whatever shard owns them, share
+the visited set and the spelling chosen for each canonical URL, and write
+their pages into output trees of their own. Content fingerprints are
+shared too, so a page duplicating one crawled by another node still becomes
+an alias. Markdown paths are a pure function of the URL, so links between
+pages crawled by different nodes already agree; merge_mirrors combines the
+trees into one mirror.
+"""
+
+import filecmp
+import json
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from mdcrawler.crawler.dedupe import ContentIndex
+from mdcrawler.crawler.scoring import UrlScorer
+from mdcrawler.crawler.state import DEQUEUED, PENDING, SKIPPED, VISITED, CrawlState
+
+_SHARD_SCHEMA = """
+CREATE TABLE IF NOT EXISTS forms (
+    key TEXT PRIMARY KEY,
+    url TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS shards (
+    shard INTEGER PRIMARY KEY,
+    running INTEGER NOT NULL,
+    heartbeat REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS digests (
+    digest TEXT PRIMARY KEY,
+    url TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS bands (
+    band INTEGER NOT NULL,
+    value INTEGER NOT NULL,
+    fingerprint TEXT NOT NULL,
+    url TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS bands_by_value ON bands(band, value);
+"""
+
+# Files of a node's output tree that belong to that node and are not merged
+_NODE_FILES = (".mdcrawler", ".spill")
+
+
+class ShardedCrawlState(CrawlState):
+    """CrawlState in a database shared by the nodes of a sharded crawl
+
+    The file is never cleared: nodes start and resume against whatever it
+    holds, so a fresh crawl needs a new path. Every write commits at once,
+    as other nodes are waiting on the lock, and the rollback journal is used
+    instead of WAL so the file can live on a network filesystem (one with
+    working locks).
+
+    A node whose queue is empty keeps waiting while any other node could
+    still push URLs into it: while that node has URLs pending or in
+    progress, and until every shard has registered. Nodes that stopped, or
+    whose heartbeat is older than stale_after seconds, are not waited for.
+    """
+
+    def __init__(self, path: Path, shard: int, shards: int, scorer: Optional[UrlScorer] = None,
+                 key: Optional[Callable[[str], str]] = None, stale_after: float = 60.0, poll_interval: float = 0.5):
+        if not 0 <= shard < shards:
+            raise ValueError(f"shard must be between 0 and {shards - 1}, got {shard}")
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._open(path, scorer, shard=shard, shards=shards, key=key, timeout=60.0, isolation_level=None)
+        self._conn.executescript(_SHARD_SCHEMA)
+        self.stale_after = stale_after
+        self.poll_interval = poll_interval
+        self.url_to_path: Dict[str, str] = {}  # paths derive from shared URL spellings, nothing to share
+
+        with self._transaction():
+            # This shard's pages that were in progress when its last run stopped go back in the queue
+            self._conn.execute("UPDATE urls SET status = ? WHERE shard = ? AND status IN (?, ?, ?)",
+                               (PENDING, shard, DEQUEUED, VISITED, SKIPPED))
+            self.resumed = self._conn.execute("SELECT 1 FROM shards WHERE shard = ?", (shard,)).fetchone() is not None
+            self._conn.execute("INSERT OR REPLACE INTO shards(shard, running, heartbeat) VALUES (?, 1, ?)",
+                               (shard, time.time()))
+        self.started = time.time()
+
+        self._stop = threading.Event()
+        self._heartbeat = threading.Thread(target=self._beat, name="mdcrawler-heartbeat", daemon=True)
+        self._heartbeat.start()
+
+    def _init_journal(self):
+        self._conn.execute("PRAGMA journal_mode=DELETE")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+
+    @contextmanager
+    def _transaction(self):
+        """Run the statements of the with block as one write transaction"""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def _beat(self):
+        interval = max(1.0, self.stale_after / 6)
+        while not self._stop.wait(interval):
+            with self._lock:
+                self._conn.execute("UPDATE shards SET heartbeat = ? WHERE shard = ?", (time.time(), self.shard))
+
+    def push(self, url: str, depth: int) -> bool:
+        with self._transaction():
+            return self._push(url, depth)
+
+    def push_many(self, entries: Iterable[Tuple[str, int]]):
+        with self._transaction():
+            for url, depth in entries:
+                self._push(url, depth)
+
+    def pop(self) -> Optional[Tuple[str, int]]:
+        with self._transaction():
+            return super().pop()
+
+    def claim_form(self, key: str, url: str) -> str:
+        with self._transaction():
+            self._conn.execute("INSERT OR IGNORE INTO forms(key, url) VALUES (?, ?)", (key, url))
+            return self._conn.execute("SELECT url FROM forms WHERE key = ?", (key,)).fetchone()[0]
+
+    def wait_for_work(self) -> bool:
+        with self._lock:
+            if self._conn.execute("SELECT 1 FROM urls WHERE shard = ? AND status = ? LIMIT 1",
+                                  (self.shard, PENDING)).fetchone():
+                return True
+            now = time.time()
+            registered = self._conn.execute("SELECT COUNT(*) FROM shards").fetchone()[0]
+            # Shards still to start, or live ones with URLs pending or in progress, may push more
+            waiting = registered < self.shards and now - self.started < self.stale_after
+            waiting = waiting or self._conn.execute(
+                "SELECT 1 FROM shards s WHERE s.shard != ? AND s.running = 1 AND s.heartbeat > ? AND EXISTS "
+                "(SELECT 1 FROM urls u WHERE u.shard = s.shard AND u.status IN (?, ?, ?))",
+                (self.shard, now - self.stale_after, PENDING, DEQUEUED, VISITED)).fetchone() is not None
+        if waiting:
+            time.sleep(self.poll_interval)
+        return waiting
+
+    def close(self):
+        """Record that this shard stopped, then close the database"""
+        self._stop.set()
+        self._heartbeat.join()
+        with self._lock:
+            self._conn.execute("UPDATE shards SET running = 0, heartbeat = ? WHERE shard = ?", (time.time(), self.shard))
+        super().close()
+
+
+class SharedContentIndex(ContentIndex):
+    """ContentIndex whose fingerprints live in a ShardedCrawlState, so duplicates are found across shards
+
+    Lookup and insert happen in one transaction, so of two nodes converting
+    the same content at once exactly one keeps it. A page matching its own
+    fingerprint from an earlier run is not a duplicate.
+    """
+
+    def __init__(self, state: ShardedCrawlState, max_distance: int = 0):
+        super().__init__(max_distance)
+        self._state = state
+
+    def _match_or_add(self, url: str, digest: str, fingerprint: Optional[int]) -> Optional[str]:
+        conn = self._state._conn
+        with self._state._transaction():
+            row = conn.execute("SELECT url FROM digests WHERE digest = ?", (digest,)).fetchone()
+            if row is not None:
+                return row[0] if row[0] != url else None
+            keys = self._band_keys(fingerprint) if fingerprint is not None else []
+            for band, value in keys:
+                for other, other_url in conn.execute(
+                        "SELECT fingerprint, url FROM bands WHERE band = ? AND value = ?", (band, value)):
+                    # Stored as hex: fingerprints use all 64 bits, SQLite integers are signed
+                    if other_url != url and bin(fingerprint ^ int(other, 16)).count('1') <= self.max_distance:
+                        return other_url
+            conn.execute("INSERT INTO digests(digest, url) VALUES (?, ?)", (digest, url))
+            conn.executemany("INSERT INTO bands(band, value, fingerprint, url) VALUES (?, ?, ?, ?)",
+                             [(band, value, f"{fingerprint:x}", url) for band, value in keys])
+        return None
+
+
+def merge_mirrors(sources: List[Path], output_dir: Path) -> Dict[str, int]:
+    """Combine the output trees of a sharded crawl into one mirror, returns counts of what was merged
+
+    Files are copied over whatever output_dir already holds, so a mirror can
+    be merged into again after every run. Two shards should never write the
+    same path; if they do with different contents the first source wins and
+    the clash is reported. aliases.json files are combined.
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    merged: Dict[str, Path] = {}
+    aliases: Dict[str, str] = {}
+    stats = {"files": 0, "unchanged": 0, "conflicts": 0}
+
+    for source in map(Path, sources):
+        aliases_path = source / "aliases.json"
+        if aliases_path.exists():
+            try:
+                aliases.update(json.loads(aliases_path.read_text(encoding="utf-8")))
+            except (OSError, ValueError) as e:
+                print(f"Error reading {aliases_path}: {e}")
+
+        for path in sorted(source.rglob("*")):
+            relative = path.relative_to(source)
+            if not path.is_file() or relative.parts[0].startswith(_NODE_FILES) or relative == Path("aliases.json"):
+                continue
+            target = output_dir / relative
+            first = merged.get(relative.as_posix())
+            if first is not None:
+                if not filecmp.cmp(first, path, shallow=False):
+                    print(f"Conflict: {path} differs from {first}, keeping {first}")
+                    stats["conflicts"] += 1
+                continue
+            merged[relative.as_posix()] = path
+            if target.exists() and filecmp.cmp(target, path, shallow=False):
+                stats["unchanged"] += 1
+                continue
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(path, target)
+            stats["files"] += 1
+
+    if aliases:
+        (output_dir / "aliases.json").write_text(json.dumps(dict(sorted(aliases.items())), indent=2), encoding="utf-8")
+    stats["aliases"] = len(aliases)
+    return stats
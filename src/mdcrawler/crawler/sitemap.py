@@ -0,0 +1,219 @@
+"""Streaming sitemap reader with gzip support and concurrent child sitemaps"""
+
+import asyncio
+import queue
+import threading
+import xml.etree.ElementTree as ET
+import zlib
+from datetime import date, datetime
+from typing import Iterator, List, NamedTuple, Optional, Set
+
+from mdcrawler.crawler.fetcher import AsyncFetcher
+
+_DONE = object()
+
+
+class SitemapEntry(NamedTuple):
+    """A <url> entry of a sitemap"""
+    url: str
+    lastmod: Optional[str] = None
+    priority: Optional[float] = None
+
+
+def parse_lastmod(value: Optional[str]) -> Optional[date]:
+    """Date part of a W3C datetime lastmod value, None if missing or malformed"""
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value.strip()[:10])
+    except ValueError:
+        try:
+            return datetime.fromisoformat(value.strip()).date()
+        except ValueError:
+            return None
+
+
+def _local_name(tag: str) -> str:
+    """Element name without its namespace"""
+    return tag.rsplit('}', 1)[-1]
+
+
+# Fields of a <url> or <sitemap> entry; extensions such as image and video
+# sitemaps nest their own <loc> elements deeper, which are not the page's
+_FIELDS = ('loc', 'lastmod', 'priority')
+_ENTRIES = ('url', 'sitemap')
+
+
+class SitemapReader:
+    """Read a sitemap or sitemap index in the background, streaming entries through a bounded queue
+
+    Documents are parsed incrementally as their bytes arrive, so neither the
+    XML nor the URL list is ever held in memory whole. Gzip is handled
+    transparently, both as Content-Encoding and for .xml.gz files. Child
+    sitemaps of an index are fetched concurrently on the fetcher's event
+    loop. With since set, entries and child sitemaps whose lastmod is older
+    are skipped; entries without lastmod are kept.
+    """
+
+    def __init__(self, fetcher: AsyncFetcher, sitemap_url: str, since: Optional[date] = None,
+                 max_workers: int = 8, max_queued: int = 10000):
+        self.fetcher = fetcher
+        self.since = since
+        self.max_workers = max(1, max_workers)
+        self.queue: "queue.Queue" = queue.Queue(maxsize=max_queued)
+        self.finished = False
+        self._stop = threading.Event()
+        # Only touched on the event loop
+        self._pending = 0
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self.fetcher.loop.run(self._begin(sitemap_url))
+
+    async def _begin(self, sitemap_url: str):
+        self._slots = asyncio.Semaphore(self.max_workers)
+        self._submit(sitemap_url)
+
+    def _submit(self, sitemap_url: str):
+        self._pending += 1
+        task = asyncio.ensure_future(self._read(sitemap_url))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _put(self, item) -> bool:
+        """Put into the queue unless the reader was closed, returns False once stopped"""
+        while not self._stop.is_set():
+            try:
+                self.queue.put_nowait(item)
+                return True
+            except queue.Full:
+                await asyncio.sleep(0.05)
+        return False
+
+    def _is_recent(self, lastmod: Optional[str]) -> bool:
+        if self.since is None:
+            return True
+        modified = parse_lastmod(lastmod)
+        return modified is None or modified >= self.since
+
+    async def _read(self, sitemap_url: str):
+        try:
+            async with self._slots:
+                async with self.fetcher.stream(sitemap_url) as response:
+                    response.raise_for_status()
+                    await self._parse(response)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Error parsing sitemap {sitemap_url}: {e}")
+        finally:
+            self._pending -= 1
+            if self._pending == 0:
+                await self._put(_DONE)
+
+    async def _parse(self, response):
+        """Feed the body to a pull parser chunk by chunk, decompressing .gz payloads"""
+        parser = ET.XMLPullParser(events=('start', 'end'))
+        fields: dict = {}
+        open_elements: List[str] = []
+        decompressor = None
+        head = b''
+
+        async for chunk in response.aiter_bytes():
+            if decompressor is None and head is not None:
+                # Sniff the gzip magic bytes before parsing anything
+                head += chunk
+                if len(head) < 2:
+                    continue
+                chunk, head = head, None
+                if chunk[:2] == b'\x1f\x8b':
+                    decompressor = zlib.decompressobj(wbits=31)
+            parser.feed(decompressor.decompress(chunk) if decompressor else chunk)
+            if not await self._handle(parser, fields, open_elements):
+                return
+        if head:
+            parser.feed(head)
+        if decompressor:
+            parser.feed(decompressor.flush())
+        parser.close()
+        await self._handle(parser, fields, open_elements)
+
+    async def _handle(self, parser: ET.XMLPullParser, fields: dict, open_elements: List[str]) -> bool:
+        """Act on the elements parsed so far, returns False once the reader was closed
+
+        open_elements holds the local names of the elements enclosing the
+        current one: entries are the children of the root element, and only
+        their own children count as their fields.
+        """
+        for event, elem in parser.read_events():
+            if self._stop.is_set():
+                return False
+            name = _local_name(elem.tag)
+            if event == 'start':
+                open_elements.append(name)
+                continue
+            open_elements.pop()
+            if name in _FIELDS:
+                if len(open_elements) == 2 and open_elements[-1] in _ENTRIES:
+                    fields[name] = (elem.text or '').strip()
+            elif len(open_elements) != 1:
+                continue
+            elif name == 'sitemap':
+                # Entry of a sitemap index: read the child concurrently
+                if fields.get('loc') and self._is_recent(fields.get('lastmod')):
+                    self._submit(fields['loc'])
+                fields.clear()
+                elem.clear()
+            elif name == 'url':
+                if fields.get('loc') and self._is_recent(fields.get('lastmod')):
+                    try:
+                        priority = float(fields['priority']) if fields.get('priority') else None
+                    except ValueError:
+                        priority = None
+                    if not await self._put(SitemapEntry(fields['loc'], fields.get('lastmod') or None, priority)):
+                        return False
+                fields.clear()
+                elem.clear()
+        return True
+
+    def poll(self, max_items: int = 1000) -> List[SitemapEntry]:
+        """Entries available right now, without blocking"""
+        entries = []
+        while len(entries) < max_items and not self.finished:
+            try:
+                item = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _DONE:
+                self.finished = True
+            else:
+                entries.append(item)
+        return entries
+
+    def wait(self, timeout: Optional[float] = None) -> List[SitemapEntry]:
+        """Block until at least one entry is available or reading has finished"""
+        if self.finished:
+            return []
+        try:
+            item = self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return []
+        if item is _DONE:
+            self.finished = True
+            return []
+        return [item] + self.poll()
+
+    def __iter__(self) -> Iterator[SitemapEntry]:
+        while not self.finished:
+            yield from self.wait()
+
+    def close(self):
+        """Stop reading and cancel outstanding fetches"""
+        self._stop.set()
+        if self.fetcher.loop.started:
+            self.fetcher.loop.run(self._cancel())
+
+    async def _cancel(self):
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
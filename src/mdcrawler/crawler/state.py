@@ -0,0 +1,253 @@
+"""Durable crawl state kept in a SQLite file inside the output directory"""
+
+import hashlib
+import sqlite3
+import threading
+from collections.abc import MutableMapping, MutableSet
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, Optional, Tuple
+
+from mdcrawler.crawler.scoring import UrlScorer
+
+STATE_FILENAME = ".mdcrawler_state.sqlite"
+
+# URL status values; SKIPPED marks pages dropped or failed without being written
+PENDING = 0
+DEQUEUED = -1
+SKIPPED = -2
+VISITED = 1
+DONE = 2
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS urls (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    url TEXT NOT NULL UNIQUE,
+    depth INTEGER NOT NULL,
+    status INTEGER NOT NULL,
+    priority REAL NOT NULL DEFAULT 0,
+    inlinks INTEGER NOT NULL DEFAULT 0,
+    shard INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS paths (
+    url TEXT PRIMARY KEY,
+    path TEXT NOT NULL
+);
+"""
+
+# Added after the first release; state files from older versions get them on open
+_COLUMNS = {
+    "priority": "REAL NOT NULL DEFAULT 0",
+    "inlinks": "INTEGER NOT NULL DEFAULT 0",
+    "shard": "INTEGER NOT NULL DEFAULT 0",
+}
+
+
+def shard_of(key: str, shards: int) -> int:
+    """Shard out of shards that owns the URL with canonical key; stable across processes and hosts"""
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % shards
+
+
+class CrawlState:
+    """SQLite-backed frontier, visited set and url_to_path mapping
+
+    Nothing is held in Python containers, so memory stays flat no matter how
+    large the frontier grows. Pages are marked done after their
+    markdown is written and their links are queued, so an interrupted crawl
+    can be resumed without losing or repeating work.
+
+    With a scorer, pending URLs are popped best score first and every push
+    of a waiting URL counts as an inlink and rescores it; without one the
+    frontier is FIFO.
+    """
+
+    def __init__(self, output_dir: Path, resume: bool = False, scorer: Optional[UrlScorer] = None):
+        path = Path(output_dir) / STATE_FILENAME
+        if not resume and path.exists():
+            path.unlink()
+        self._open(path, scorer)
+
+        # Pages that were dequeued or in progress when the last run stopped go back in the queue
+        self._conn.execute("UPDATE urls SET status = ? WHERE status IN (?, ?, ?)", (PENDING, DEQUEUED, VISITED, SKIPPED))
+        self._conn.commit()
+
+    def _open(self, path: Path, scorer: Optional[UrlScorer], shard: int = 0, shards: int = 1,
+              key: Optional[Callable[[str], str]] = None, **connect):
+        """Open (creating or upgrading) the database at path; this node pops URLs of shard out of shards"""
+        self.path = path
+        self.shard = shard
+        self.shards = shards
+        self._key = key
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, **connect)
+        self._init_journal()
+        self._conn.executescript(_SCHEMA)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(urls)")}
+        for name, definition in _COLUMNS.items():
+            if name not in columns:
+                self._conn.execute(f"ALTER TABLE urls ADD COLUMN {name} {definition}")
+        self._conn.execute("DROP INDEX IF EXISTS urls_pending")
+        self._conn.execute("DROP INDEX IF EXISTS urls_by_priority")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS urls_by_shard ON urls(shard, status, priority DESC, seq)")
+        self.scorer = scorer
+
+        self.visited = VisitedSet(self)
+        self.url_to_path = PathMap(self)
+
+    def _init_journal(self):
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+
+    def _shard_of(self, url: str) -> int:
+        """Shard that crawls url"""
+        if self.shards <= 1:
+            return 0
+        return shard_of(self._key(url) if self._key else url, self.shards)
+
+    def push(self, url: str, depth: int) -> bool:
+        """Queue url at depth, returns False if it was already seen"""
+        with self._lock:
+            return self._push(url, depth)
+
+    def push_many(self, entries: Iterable[Tuple[str, int]]):
+        """Queue several (url, depth) entries"""
+        with self._lock:
+            for url, depth in entries:
+                self._push(url, depth)
+
+    def _push(self, url: str, depth: int) -> bool:
+        priority = self.scorer.score(url, depth, 1) if self.scorer else 0
+        cursor = self._conn.execute(
+            "INSERT OR IGNORE INTO urls(url, depth, status, priority, inlinks, shard) VALUES (?, ?, ?, ?, 1, ?)",
+            (url, depth, PENDING, priority, self._shard_of(url)))
+        if cursor.rowcount:
+            return True
+        if self.scorer is None:
+            self._conn.execute(
+                "UPDATE urls SET depth = ? WHERE url = ? AND status = ? AND depth > ?", (depth, url, PENDING, depth))
+            return False
+        row = self._conn.execute(
+            "SELECT depth, inlinks FROM urls WHERE url = ? AND status = ?", (url, PENDING)).fetchone()
+        if row is not None:
+            depth, inlinks = min(depth, row[0]), row[1] + 1
+            self._conn.execute("UPDATE urls SET depth = ?, inlinks = ?, priority = ? WHERE url = ?",
+                               (depth, inlinks, self.scorer.score(url, depth, inlinks), url))
+        return False
+
+    def pop(self) -> Optional[Tuple[str, int]]:
+        """Take the best pending URL (the oldest without a scorer) and its depth, or None if nothing is waiting"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT seq, url, depth FROM urls WHERE shard = ? AND status = ? ORDER BY priority DESC, seq LIMIT 1",
+                (self.shard, PENDING)).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE urls SET status = ? WHERE seq = ?", (DEQUEUED, row[0]))
+            return row[1], row[2]
+
+    def done(self, url: str):
+        """Mark url as written and commit everything recorded so far"""
+        with self._lock:
+            self._conn.execute("UPDATE urls SET status = ? WHERE url = ?", (DONE, url))
+            self._conn.commit()
+
+    def release(self, url: str):
+        """Record that url was dropped or failed without being written; it is retried by the next run"""
+        with self._lock:
+            self._conn.execute("UPDATE urls SET status = ? WHERE url = ? AND status < ?", (SKIPPED, url, DONE))
+
+    def claim_form(self, key: str, url: str) -> str:
+        """Spelling that stands for every URL with canonical key, the first one claimed"""
+        return url
+
+    def wait_for_work(self) -> bool:
+        """Whether more URLs may still arrive once the queue is empty, after waiting a moment for them"""
+        return False
+
+    def completed(self) -> int:
+        """Number of pages already written"""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM urls WHERE shard = ? AND status = ?",
+                                      (self.shard, DONE)).fetchone()[0]
+
+    def is_empty(self) -> bool:
+        """True if nothing has ever been queued"""
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM urls LIMIT 1").fetchone() is None
+
+    def close(self):
+        """Commit and close the database"""
+        with self._lock:
+            self._conn.commit()
+            self._conn.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM urls WHERE shard = ? AND status = ?",
+                                      (self.shard, PENDING)).fetchone()[0]
+
+
+class VisitedSet(MutableSet):
+    """Set view over URLs that have been visited (in progress or done)"""
+
+    def __init__(self, state: CrawlState):
+        self._state = state
+
+    def __contains__(self, url) -> bool:
+        with self._state._lock:
+            row = self._state._conn.execute("SELECT status FROM urls WHERE url = ?", (url,)).fetchone()
+        return row is not None and row[0] >= VISITED
+
+    def add(self, url: str):
+        with self._state._lock:
+            self._state._conn.execute(
+                "INSERT INTO urls(url, depth, status, shard) VALUES (?, 0, ?, ?) "
+                "ON CONFLICT(url) DO UPDATE SET status = MAX(status, excluded.status)",
+                (url, VISITED, self._state._shard_of(url)))
+
+    def discard(self, url: str):
+        with self._state._lock:
+            self._state._conn.execute(
+                "UPDATE urls SET status = ? WHERE url = ? AND status >= ?", (DEQUEUED, url, VISITED))
+
+    def __iter__(self) -> Iterator[str]:
+        with self._state._lock:
+            rows = self._state._conn.execute("SELECT url FROM urls WHERE status >= ?", (VISITED,)).fetchall()
+        return (row[0] for row in rows)
+
+    def __len__(self) -> int:
+        with self._state._lock:
+            return self._state._conn.execute("SELECT COUNT(*) FROM urls WHERE status >= ?", (VISITED,)).fetchone()[0]
+
+
+class PathMap(MutableMapping):
+    """Mapping view over the persisted URL to local markdown path table"""
+
+    def __init__(self, state: CrawlState):
+        self._state = state
+
+    def __getitem__(self, url: str) -> str:
+        with self._state._lock:
+            row = self._state._conn.execute("SELECT path FROM paths WHERE url = ?", (url,)).fetchone()
+        if row is None:
+            raise KeyError(url)
+        return row[0]
+
+    def __setitem__(self, url: str, path: str):
+        with self._state._lock:
+            self._state._conn.execute("INSERT OR REPLACE INTO paths(url, path) VALUES (?, ?)", (url, path))
+
+    def __delitem__(self, url: str):
+        with self._state._lock:
+            cursor = self._state._conn.execute("DELETE FROM paths WHERE url = ?", (url,))
+        if not cursor.rowcount:
+            raise KeyError(url)
+
+    def __iter__(self) -> Iterator[str]:
+        with self._state._lock:
+            rows = self._state._conn.execute("SELECT url FROM paths").fetchall()
+        return (row[0] for row in rows)
+
+    def __len__(self) -> int:
+        with self._state._lock:
+            return self._state._conn.execute("SELECT COUNT(*) FROM paths").fetchone()[0]
@@ -1,43 +1,123 @@
 """Web crawler that converts websites to markdown"""
 
+import os
 import re
+import html
 import hashlib
+import json
+import tempfile
 import time
-import requests
-import xml.etree.ElementTree as ET
+import threading
+import asyncio
+import httpx
 from pathlib import Path
-from typing import Set, Dict, Optional, List
+from datetime import date
+from typing import Set, Dict, Optional, List, Tuple, Union, TYPE_CHECKING
 from io import BytesIO
 from urllib.parse import urljoin, urlparse
+from functools import lru_cache
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor, Future, wait, FIRST_COMPLETED
+from contextlib import nullcontext
+import multiprocessing
 from html.parser import HTMLParser
 
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from docling.document_converter import DocumentConverter
-from docling.datamodel.base_models import DocumentStream, InputFormat
-from docling.datamodel.pipeline_options import ConvertPipelineOptions, ThreadedPdfPipelineOptions
+from mdcrawler.crawler.readiness import wait_until_ready, STRATEGIES
+from mdcrawler.crawler.frontier import Frontier, PriorityFrontier
+from mdcrawler.crawler.scoring import UrlScorer
+from mdcrawler.crawler.sharding import ShardedCrawlState, SharedContentIndex
+from mdcrawler.crawler.state import CrawlState
+from mdcrawler.crawler.cache import PageCache, CachedPage
+from mdcrawler.crawler.assets import AssetDownloader, asset_extension
+from mdcrawler.crawler.capture import CaptureWriter, read_capture, read_info, PAGE, ASSET
+from mdcrawler.crawler.rewriter import rewrite_html, find_canonical, truncate_html
+from mdcrawler.crawler.canonical import UrlCanonicalizer, TRACKING_PARAMS
+from mdcrawler.crawler.dedupe import ContentIndex
+from mdcrawler.crawler.sitemap import SitemapReader, SitemapEntry
+from mdcrawler.crawler.politeness import PolitenessScheduler
+from mdcrawler.crawler.browser import BrowserPool
+from mdcrawler.crawler.fetcher import AsyncFetcher
+from mdcrawler.utils.batching import BatchQueue
+from mdcrawler.utils.memory import PeakRssSampler, iter_utf8, utf8_size, MB
+from mdcrawler.utils.metrics import Metrics
 
+# Selenium and Docling (with its model stack) take seconds to import, so they
+# are only imported once a browser is started or a page is converted
+if TYPE_CHECKING:
+    from selenium import webdriver
+    from docling.document_converter import DocumentConverter
 
-class ImageExtractor(HTMLParser):
-    """Extract image URLs from HTML"""
+class PageShellDetector(HTMLParser):
+    """Measure visible body text to tell server-rendered pages from JS app shells"""
+    SKIP_TAGS = {'script', 'style', 'noscript', 'template', 'svg'}
+    
     def __init__(self):
         super().__init__()
-        self.images = []
+        self.in_body = False
+        self.skip_depth = 0
+        self.text_chars = 0
+        self.scripts = 0
+        self.has_noscript = False
     
     def handle_starttag(self, tag, attrs):
-        if tag == 'img':
-            for name, value in attrs:
-                if name == 'src':
-                    self.images.append(value)
+        if tag == 'body':
+            self.in_body = True
+        elif tag == 'script':
+            self.scripts += 1
+        if tag == 'noscript':
+            self.has_noscript = True
+        if tag in self.SKIP_TAGS:
+            self.skip_depth += 1
+    
+    def handle_endtag(self, tag):
+        if tag in self.SKIP_TAGS and self.skip_depth > 0:
+            self.skip_depth -= 1
+    
+    def handle_data(self, data):
+        if self.in_body and not self.skip_depth:
+            self.text_chars += len(data.strip())
+
+
+RENDERERS = ('auto', 'http', 'browser')
+
+# Crawl order: best score first, or plain breadth-first
+ORDERS = ('priority', 'bfs')
+
+# What happens to a page whose HTML is larger than max_page_mb
+OVERSIZE_POLICIES = ('truncate', 'skip')
+
+_MARKDOWN_LINK = re.compile(r'(?<!!)\[((?:[^\[\]]|\[[^\[\]]*\](?:\([^()\s]*\))?)*)\]\(([^()\s]+)\)')
+_MARKDOWN_ESCAPE = re.compile(r'\\([\\`*_{}\[\]()#+\-.!|~])')
 
 
 class WebCrawler:
     """Crawls a website and converts pages to markdown with local links"""
     
-    def __init__(self, output_dir: str = "mirror", max_pages: int = 10, depth: int = 1, download_assets: bool = False, use_sitemap: bool = False):
+    def __init__(self, output_dir: str = "mirror", max_pages: int = 10, depth: int = 1, download_assets: bool = False, use_sitemap: bool = False, workers: int = 1, renderer: str = "browser", wait_strategy: str = "mutation", wait_timeout: float = 10.0, wait_quiet: float = 0.5,
+                 persist_state: bool = False, resume: bool = False, incremental: bool = False,
+                 asset_workers: int = 8, convert_workers: int = 0, link_cache_size: int = 65536,
+                 since: Optional[date] = None, sitemap_workers: int = 8,
+                 max_per_host: int = 0, rate: float = 0.0, respect_robots: bool = True, max_retries: int = 3,
+                 trace_path: Optional[str] = None, metrics_path: Optional[str] = None,
+                 recycle_pages: int = 200, recycle_rss_mb: int = 2048, block_resources: bool = True, http2: bool = True,
+                 canonicalize: bool = True, drop_params: Optional[List[str]] = None, dedupe: bool = True, simhash_distance: int = 0,
+                 order: str = "priority", include: Optional[List[str]] = None, exclude: Optional[List[str]] = None,
+                 boosts: Optional[List[Tuple[str, float]]] = None, depth_weight: float = 1.0, inlink_weight: float = 0.5,
+                 sitemap_weight: float = 1.0, capture_path: Optional[str] = None, max_page_mb: float = 50.0,
+                 oversize: str = "truncate", spill_mb: float = 8.0, shared_state: Optional[str] = None,
+                 shard: int = 0, shards: int = 1, shared: Optional["WebCrawler"] = None):
+        if renderer not in RENDERERS:
+            raise ValueError(f"Unknown renderer {renderer!r}, expected one of {', '.join(RENDERERS)}")
+        if order not in ORDERS:
+            raise ValueError(f"Unknown crawl order {order!r}, expected one of {', '.join(ORDERS)}")
+        if oversize not in OVERSIZE_POLICIES:
+            raise ValueError(f"Unknown oversize policy {oversize!r}, expected one of {', '.join(OVERSIZE_POLICIES)}")
+        if wait_strategy not in STRATEGIES:
+            raise ValueError(f"Unknown wait strategy {wait_strategy!r}, expected one of {', '.join(STRATEGIES)}")
+        if shards > 1 and not shared_state:
+            raise ValueError("A sharded crawl needs a shared state file")
+        if not 0 <= shard < max(1, shards):
+            raise ValueError(f"Shard must be between 0 and {max(1, shards) - 1}, got {shard}")
+            
         self.output_dir = Path(output_dir)
         self.visited: Set[str] = set()
         self.url_to_path: Dict[str, str] = {}
@@ -47,8 +127,117 @@ class WebCrawler:
         self.download_assets = download_assets
         self.use_sitemap = use_sitemap
         self.assets_dir = self.output_dir / "assets"
-        self.assets_dir.mkdir(parents=True, exist_ok=True)
         self.image_map: Dict[str, str] = {}  # Maps original image URLs to local paths
+        self.workers = max(1, workers)
+        
+        # URL filters and scores; with the priority order the best scoring URL is crawled next,
+        # so a crawl cut short by max_pages has spent its budget on the most valuable pages
+        self.order = order
+        self.scorer = UrlScorer(include or (), exclude or (), boosts or (), depth_weight=depth_weight,
+                                inlink_weight=inlink_weight, sitemap_weight=sitemap_weight)
+        
+        # Frontier of URLs to crawl; replaced by the on-disk CrawlState when persisting
+        self.frontier = PriorityFrontier(self.scorer) if order == 'priority' else Frontier()
+        self.persist_state = persist_state or resume
+        self.resume = resume
+        
+        # Sharded crawls: this node crawls the URLs hashing to shard out of shards,
+        # coordinating with the other nodes through the SQLite file at shared_state
+        self.shared_state = Path(shared_state) if shared_state else None
+        self.shard = shard
+        self.shards = max(1, shards)
+        
+        # Incremental recrawls: validators from the previous run and sitemap <lastmod> values
+        self.incremental = incremental
+        self.page_cache: Optional[PageCache] = None
+        self.sitemap_lastmod: Dict[str, str] = {}
+        self.pages_unchanged = 0
+        
+        # Sitemaps are streamed in the background while the crawl runs;
+        # since drops entries whose <lastmod> is older than that date
+        self.since = since
+        self.sitemap_workers = max(1, sitemap_workers)
+        self._sitemap_reader: Optional[SitemapReader] = None
+        self.sitemap_urls = 0
+        
+        # Shared bookkeeping (visited, url_to_path) is guarded by this lock;
+        # each worker thread gets its own browser session, all share one converter.
+        # With shared set, browsers, converter, HTTP client and politeness scheduler
+        # are borrowed from that crawler (batch crawls) and left open by close()
+        self._lock = threading.RLock()
+        self._shared = shared
+        if shared is None:
+            # A standby browser is only worth starting when a session may be recycled before the crawl ends
+            standby = renderer != 'http' and max_pages > 1 and (recycle_rss_mb > 0 or 0 < recycle_pages < max_pages)
+            self.browsers = BrowserPool(self._create_driver, max_pages=recycle_pages, max_rss_mb=recycle_rss_mb,
+                                        block_resources=block_resources, standby=standby)
+        else:
+            self.browsers = shared.browsers
+        self._converter: Optional["DocumentConverter"] = None
+        self._convert_queue: Optional[BatchQueue] = None
+        
+        # Optional process pool that converts and writes pages off the fetch threads.
+        # _convert_slots bounds how many fetched pages may wait for conversion, and
+        # _awaiting counts the stages (links queued, markdown written) a page still needs
+        self.convert_workers = max(0, convert_workers)
+        self._convert_pool: Optional[ProcessPoolExecutor] = None
+        self._convert_slots = threading.BoundedSemaphore(max(1, self.convert_workers * 2))
+        self._awaiting: Dict[str, int] = {}
+        
+        # Memoized link resolution: repeated nav/footer links cost a dict lookup
+        self._resolve_cached = lru_cache(maxsize=link_cache_size)(self._resolve_uncached)
+        
+        # Async HTTP client on a background event loop, shared by static fetches, sitemaps and assets;
+        # browser work stays on the worker threads
+        self.renderer = renderer
+        if shared is None:
+            self.fetcher = AsyncFetcher(max_concurrency=max(64, self.workers * 2 + asset_workers), http2=http2)
+        else:
+            self.fetcher = shared.fetcher
+        # Optional capture store recording rendered pages, response headers and assets for reconvert
+        self.capture = CaptureWriter(Path(capture_path)) if capture_path else None
+        self.assets = AssetDownloader(self.fetcher, self.assets_dir, self.output_dir, max_workers=asset_workers,
+                                      capture=self.capture)
+        
+        # Per-host pacing for page requests: concurrency cap, rate, robots.txt and backoff
+        if shared is None:
+            self.scheduler = PolitenessScheduler(self.fetcher, max_per_host=max_per_host, rate=rate, respect_robots=respect_robots)
+        else:
+            self.scheduler = shared.scheduler
+        self.max_retries = max(0, max_retries)
+        
+        # Browser readiness: strategy, cap and quiet window, plus seconds waited per URL
+        self.wait_strategy = wait_strategy
+        self.wait_timeout = wait_timeout
+        self.wait_quiet = wait_quiet
+        self.readiness_timings: Dict[str, float] = {}
+        
+        # Stage timings and counters, traced per page as JSON lines and summarized at the end
+        self.metrics = Metrics(Path(trace_path) if trace_path else None)
+        self.metrics_path = Path(metrics_path) if metrics_path else None
+        
+        # URL canonicalization (tracking/session params, query order, host case) and the
+        # spelling first seen for each canonical key, which is the one that gets fetched
+        self.drop_params = list(drop_params or [])
+        self.canonicalizer = UrlCanonicalizer(TRACKING_PARAMS + tuple(self.drop_params)) if canonicalize else None
+        self._url_forms: Dict[str, str] = {}
+        
+        # Content fingerprints of converted pages; duplicates are written as alias stubs
+        self.content_index = ContentIndex(simhash_distance) if dedupe else None
+        self.aliases: Dict[str, str] = {}
+        
+        # Large pages: HTML beyond max_page_bytes is truncated or skipped, rewritten HTML beyond
+        # spill_bytes reaches the converter through a file in spill_dir, and each page's peak RSS is traced
+        self.max_page_bytes = int(max_page_mb * MB) if max_page_mb > 0 else 0
+        self.oversize = oversize
+        self.spill_bytes = int(spill_mb * MB) if spill_mb > 0 else 0
+        self.spill_dir = self.output_dir / ".spill"
+        self.rss = PeakRssSampler()
+        
+    def _create_driver(self) -> "webdriver.Chrome":
+        """Start a new headless Chrome session"""
+        from selenium import webdriver
+        from selenium.webdriver.chrome.options import Options
         
         options = Options()
         options.add_argument("--headless")
@@ -57,10 +246,38 @@ class WebCrawler:
         options.add_argument("--disable-gpu")
         options.add_argument("--window-size=1920,1080")
         
-        self.driver = webdriver.Chrome(options=options)
-        
-        self.converter = DocumentConverter()
-        
+        return webdriver.Chrome(options=options)
+    
+    @property
+    def driver(self) -> "webdriver.Chrome":
+        """Browser session owned by the calling thread"""
+        return self.browsers.driver()
+    
+    @property
+    def converter(self) -> "DocumentConverter":
+        """Docling converter shared by all workers, restricted to HTML input"""
+        if self._shared is not None:
+            return self._shared.converter
+        with self._lock:
+            if self._converter is None:
+                from docling.document_converter import DocumentConverter, HTMLFormatOption
+                from docling.datamodel.base_models import InputFormat
+                from docling.datamodel.backend_options import HTMLBackendOptions
+                from docling.datamodel.pipeline_options import ConvertPipelineOptions
+                
+                # HTML only with picture models and image fetching off, so no PDF/OCR stack is loaded
+                pipeline_options = ConvertPipelineOptions(do_picture_classification=False, do_picture_description=False)
+                self._converter = DocumentConverter(
+                    allowed_formats=[InputFormat.HTML],
+                    format_options={
+                        InputFormat.HTML: HTMLFormatOption(
+                            pipeline_options=pipeline_options,
+                            backend_options=HTMLBackendOptions(fetch_images=False),
+                        )
+                    },
+                )
+            return self._converter
+    
     def _make_safe_filename(self, url: str) -> str:
         """Convert URL to safe filename"""
         parsed = urlparse(url)
@@ -86,42 +303,56 @@ class WebCrawler:
             
         return f"{safe_path}.md"
     
+    def _local_path(self, url: str) -> str:
+        """Return the local markdown path for a normalized URL, assigning one if needed"""
+        with self._lock:
+            local_path = self.url_to_path.get(url)
+            if local_path is None:
+                local_path = self._make_safe_filename(url)
+                self.url_to_path[url] = local_path
+            return local_path
+    
+    def _resolution_key(self, base_url: str, link: str) -> Tuple[str, str]:
+        """Smallest part of base_url that link's resolution depends on, paired with the link
+        
+        Absolute links resolve the same from any page and root-relative links
+        only depend on the origin, so they share cache entries across pages.
+        """
+        if '://' in link.split('?', 1)[0]:
+            return '', link
+        parsed = urlparse(base_url)
+        if link.startswith('//'):
+            return f"{parsed.scheme}:", link
+        if link.startswith('/'):
+            return f"{parsed.scheme}://{parsed.netloc}", link
+        if link.startswith(('?', '#')) or not link:
+            return base_url.split('#')[0], link
+        return base_url.split('#')[0].split('?')[0].rsplit('/', 1)[0] + '/', link
+    
+    def _resolve_uncached(self, base: str, link: str) -> Optional[str]:
+        normalized = self._normalize_url(base or link, link)
+        if not normalized:
+            return None
+        return self._local_path(normalized)
+    
+    def _resolve_link(self, base_url: str, link: str) -> Optional[str]:
+        """Local markdown path for a link found on base_url, or None if it is not a crawlable link"""
+        base, link = self._resolution_key(base_url, link)
+        return self._resolve_cached(base, link)
+    
     def _download_asset(self, asset_url: str) -> Optional[str]:
         """Download an asset and return local relative path"""
         if not self.download_assets:
             return asset_url
             
-        try:
-            parsed = urlparse(asset_url)
-            asset_name = parsed.path.split('/')[-1] or "asset"
-            
-            if not asset_name:
-                return None
-                
-            safe_name = re.sub(r'[^a-zA-Z0-9_\-\.]', '_', asset_name)
-            safe_name = re.sub(r'_+', '_', safe_name)
-            
-            asset_dir = self.assets_dir
-            asset_dir.mkdir(parents=True, exist_ok=True)
-            local_path = asset_dir / safe_name
-            
-            if not local_path.exists():
-                response = requests.get(asset_url, timeout=10)
-                response.raise_for_status()
-                with open(local_path, 'wb') as f:
-                    f.write(response.content)
-                    
-            relative_path = local_path.relative_to(self.output_dir)
-            return str(relative_path)
-            
-        except Exception as e:
-            print(f"Error downloading {asset_url}: {e}")
-            return asset_url
+        return self.assets.download(asset_url) or asset_url
     
     def _normalize_url(self, base_url: str, link: str) -> Optional[str]:
         """Normalize a link relative to base URL, keeping .html extension for internal lookup"""
         try:
             normalized = urljoin(base_url, link)
+            if self.canonicalizer is not None:
+                normalized = self.canonicalizer.canonicalize(normalized)
             parsed = urlparse(normalized)
             
             if parsed.scheme not in ('http', 'https'):
@@ -131,11 +362,22 @@ class WebCrawler:
                 return None
                 
             fragment_removed = normalized.split('#')[0]
+            if self.canonicalizer is not None:
+                # Slash and index.html variants all stand for the spelling seen first
+                fragment_removed = self._url_form(self.canonicalizer.key(fragment_removed), fragment_removed)
             # Keep .html for internal lookup - convert to .md later for output
             return fragment_removed
         except Exception:
             return None
     
+    def _url_form(self, key: str, url: str) -> str:
+        """Spelling that stands for every URL with canonical key, claimed through the frontier (shared by shards)"""
+        with self._lock:
+            form = self._url_forms.get(key)
+            if form is None:
+                form = self._url_forms[key] = self.frontier.claim_form(key, url)
+            return form
+    
     def _normalize_for_output(self, url: str) -> str:
         """Normalize URL for output - convert .html to .md and fix paths"""
         if not url:
@@ -148,98 +390,59 @@ class WebCrawler:
             url = url[:-9] + '_index_html.md'
         return url
     
-    def _extract_image_urls(self, html_content: str) -> list:
-        """Extract image URLs from HTML content"""
-        extractor = ImageExtractor()
-        extractor.feed(html_content)
-        return extractor.images
-    
-    def _download_images(self, html_content: str, base_url: str) -> Dict[str, str]:
-        """Download images from HTML content and return mapping to local paths"""
-        image_urls = self._extract_image_urls(html_content)
-        image_mapping = {}
+    def _download_images(self, image_urls: List[str], base_url: str) -> Dict[str, str]:
+        """Download images found on a page and return mapping to local paths"""
+        # Convert relative URLs to absolute, keeping first-seen order without duplicates
+        full_urls = dict.fromkeys(urljoin(base_url, img_url) for img_url in image_urls if img_url)
         
-        for img_url in image_urls:
-            # Convert relative URL to absolute
-            full_url = urljoin(base_url, img_url)
-            
-            # Download the image
-            local_path = self._download_asset(full_url)
-            
-            if local_path and local_path != full_url:
-                print(f"Downloaded: {full_url} -> {local_path}")
-                image_mapping[full_url] = local_path
+        image_mapping = self.assets.download_all(full_urls)
+        for full_url, local_path in image_mapping.items():
+            print(f"Downloaded: {full_url} -> {local_path}")
                 
         return image_mapping
     
     def _replace_image_refs_in_markdown(self, markdown: str, image_mapping: Dict[str, str]) -> str:
         """Replace image URLs in markdown with local paths"""
+        # Index downloaded images by filename for URLs that do not match exactly
+        by_filename: Dict[str, str] = {}
+        for orig_url, local_path in image_mapping.items():
+            by_filename.setdefault(urlparse(orig_url).path.split('/')[-1], local_path)
+        
         def replace_img(match):
             alt_text = match.group(1)
-            img_url = match.group(2)
+            img_url = self._unescape_markdown_url(match.group(2))
             
-            # Parse the URL
-            parsed = urlparse(img_url)
-            img_filename = parsed.path.split('/')[-1]
-            
-            # Check if this image was downloaded (match by filename)
-            for orig_url, local_path in image_mapping.items():
-                if orig_url.endswith(img_filename):
-                    return f"![{alt_text}]({local_path})"
+            local_path = image_mapping.get(img_url)
+            if local_path is None:
+                local_path = by_filename.get(urlparse(img_url).path.split('/')[-1])
+            if local_path is not None:
+                return f"![{alt_text}]({local_path})"
             
             return match.group(0)
         
         # Match markdown image syntax: ![alt](url)
         return re.sub(r'!\[([^\]]*)\]\(([^)]+)\)', replace_img, markdown)
     
+    def _unescape_markdown_url(self, url: str) -> str:
+        """Undo the escaping Docling applies to URLs in markdown (backslash escapes, HTML entities)"""
+        if '\\' in url:
+            url = _MARKDOWN_ESCAPE.sub(r'\1', url)
+        if '&' in url:
+            url = html.unescape(url)
+        return url
+    
     def _fix_local_links(self, markdown: str, base_url: str) -> str:
         """Fix markdown links to be local, excluding image-only references"""
         def replace_link(match):
             link_text = match.group(1)
-            link_url = match.group(2)
-            
-            # Skip if this is an image reference
-            if link_text.startswith('!'):
+            local_path = self._resolve_link(base_url, self._unescape_markdown_url(match.group(2)))
+            if local_path is None:
                 return match.group(0)
-            
-            # For relative links, resolve them first then convert to safe filename
-            if not link_url.startswith('http'):
-                # Resolve relative URL to absolute
-                resolved_url = urljoin(base_url, link_url)
-                # Normalize and convert to safe filename
-                normalized = self._normalize_url(base_url, resolved_url)
-                if not normalized:
-                    return match.group(0)
-                
-                if normalized in self.url_to_path:
-                    local_path = self.url_to_path[normalized]
-                    return f"[{link_text}]({local_path})"
-                
-                filename = self._make_safe_filename(normalized)
-                self.url_to_path[normalized] = filename
-                return f"[{link_text}]({filename})"
-            
-            # Normalize the URL
-            normalized = self._normalize_url(base_url, link_url)
-            
-            if not normalized:
-                return match.group(0)
-            
-            # Check if we have this URL in our mapping
-            if normalized in self.url_to_path:
-                local_path = self.url_to_path[normalized]
-                return f"[{link_text}]({local_path})"
-            
-            # Generate the filename for this URL
-            filename = self._make_safe_filename(normalized)
-            self.url_to_path[normalized] = filename
-            
-            return f"[{link_text}]({filename})"
+            return f"[{link_text}]({local_path})"
         
-        # Match markdown links: [text](url)
-        # Use a non-greedy pattern that handles nested brackets and stops at whitespace or end
-        result = re.sub(r'\[([^\]]*(?:\][^\]]*)*?)\]\(([^)]+?)\)(?=\s|$)', replace_link, markdown)
-        return result
+        # Markdown links [text](url); link text may contain an image ![alt](src) or [brackets].
+        # Plain images (preceded by '!') are left for _replace_image_refs_in_markdown
+        return _MARKDOWN_LINK.sub(replace_link, markdown)
     
 
     def _fix_html_links(self, markdown: str, base_url: str) -> str:
@@ -248,22 +451,11 @@ class WebCrawler:
             href = match.group(1)
             link_text = match.group(2)
             
-            # Normalize the URL
-            normalized = self._normalize_url(base_url, href)
-            
-            if not normalized:
+            local_path = self._resolve_link(base_url, html.unescape(href))
+            if local_path is None:
                 return match.group(0)
             
-            # Check if we have this URL in our mapping
-            if normalized in self.url_to_path:
-                local_path = self.url_to_path[normalized]
-                return f"[{link_text}]({local_path})"
-            
-            # Generate the filename for this URL
-            filename = self._make_safe_filename(normalized)
-            self.url_to_path[normalized] = filename
-            
-            return f"[{link_text}]({filename})"
+            return f"[{link_text}]({local_path})"
         
         # Match HTML anchor links: <a href="url">text</a>
         # Use re.DOTALL to match multi-line content, and capture everything between tags as link text
@@ -276,110 +468,471 @@ class WebCrawler:
         # Keeping minimal implementation to avoid double-conversion
         return markdown
     
-    def _convert_to_markdown(self, html_content: str, url: str) -> str:
+    def _convert_to_markdown(self, html_content: str, url: str, preprocessed: bool = False) -> str:
         """Convert HTML content to markdown using Docling with referenced images"""
+        if not preprocessed:
+            html_content = rewrite_html(html_content, url).html
+        if self._convert_queue is not None:
+            # Parallel crawl: hand the page to the shared batch converter
+            return self._convert_queue.submit((html_content, url)).result()
+        return self.convert_batch([(html_content, url)], preprocessed=True)[0]
+    
+    def convert_batch(self, pages: List[Tuple[Union[str, Path], str]], preprocessed: bool = False) -> List[str]:
+        """Convert (html_content, url) pairs to markdown with a single Docling convert_all call
+        
+        Set preprocessed when img and anchor tags were already rewritten by rewrite_html;
+        preprocessed pages may be given as the path of a file holding their HTML.
+        """
+        from docling.datamodel.base_models import DocumentStream
+        
+        error_markdown = "# Error converting content\n\n[Original HTML content could not be parsed]"
+        results: List[str] = [error_markdown] * len(pages)
+        streams = []
+        indices = []
+        
+        for i, (html_content, url) in enumerate(pages):
+            try:
+                # Pre-process HTML to convert img and anchor tags to markdown syntax
+                processed_html = html_content if preprocessed else rewrite_html(html_content, url).html
+                if isinstance(processed_html, Path):
+                    # Spilled page: Docling reads the file itself
+                    streams.append(processed_html)
+                else:
+                    streams.append(DocumentStream(name=url.split('/')[-1] or "index.html", stream=BytesIO(processed_html.encode('utf-8'))))
+                indices.append(i)
+            except Exception as e:
+                print(f"Error converting {url}: {e}")
+        
+        if not streams:
+            return results
+        
         try:
-            # Pre-process HTML to convert img and anchor tags to markdown syntax
-            processed_html = self._convert_img_tags_to_markdown(html_content, url)
-            processed_html = self._convert_anchor_tags_to_markdown(processed_html, url)
-            
-            stream = DocumentStream(name=url.split('/')[-1] or "index.html", stream=BytesIO(processed_html.encode('utf-8')))
-            result = self.converter.convert(stream)
-            
-            if result.document:
-                # Export to markdown
-                markdown = result.document.export_to_markdown()
-                if markdown:
-                    # Post-process to replace HTML links with markdown links
-                    markdown = self._fix_html_links(markdown, url)
-                    # Post-process to replace .html with .md in paths
-                    markdown = self._replace_html_extensions(markdown)
-                    return markdown
-                    
-            return html_content
-            
+            for i, result in zip(indices, self.converter.convert_all(streams, raises_on_error=False)):
+                html_content, url = pages[i]
+                try:
+                    results[i] = self._markdown_from_result(result, html_content, url)
+                except Exception as e:
+                    print(f"Error converting {url}: {e}")
         except Exception as e:
-            print(f"Error converting {url}: {e}")
-            return "# Error converting content\n\n[Original HTML content could not be parsed]"
-    
-    def _convert_img_tags_to_markdown(self, html_content: str, base_url: str) -> str:
-        """Convert HTML img tags to markdown image syntax"""
-        def replace_img_tag(match):
-            img_tag = match.group(0)
-            # Extract alt text
-            alt_match = re.search(r'alt=["\']([^"\']*)["\']', img_tag)
-            alt_text = alt_match.group(1) if alt_match else "image"
+            print(f"Error converting batch of {len(streams)} pages: {e}")
             
-            # Extract src
-            src_match = re.search(r'src=["\']([^"\']*)["\']', img_tag)
-            if src_match:
-                img_src = src_match.group(1)
-                full_url = urljoin(base_url, img_src)
-                return f"![{alt_text}]({full_url})"
-            
-            return match.group(0)
+        return results
+    
+    def _markdown_from_result(self, result, html_content: str, url: str) -> str:
+        """Export a Docling conversion result to markdown with links post-processed"""
+        from docling.datamodel.base_models import ConversionStatus
+        
+        if result.status not in (ConversionStatus.SUCCESS, ConversionStatus.PARTIAL_SUCCESS):
+            errors = "; ".join(error.error_message for error in result.errors) or result.status
+            print(f"Error converting {url}: {errors}")
+            return "# Error converting content\n\n[Original HTML content could not be parsed]"
         
-        # Match img tags with src attribute
-        return re.sub(r'<img[^>]*src=["\'][^"\']*["\'][^>]*>', replace_img_tag, html_content, flags=re.IGNORECASE)
+        if result.document:
+            # Export to markdown
+            markdown = result.document.export_to_markdown()
+            if markdown:
+                # Post-process to replace HTML links with markdown links
+                markdown = self._fix_html_links(markdown, url)
+                # Post-process to replace .html with .md in paths
+                markdown = self._replace_html_extensions(markdown)
+                return markdown
+                
+        return html_content.read_text(encoding='utf-8') if isinstance(html_content, Path) else html_content
     
-    def _convert_anchor_tags_to_markdown(self, html_content: str, base_url: str) -> str:
-        """Convert HTML anchor tags to markdown links"""
-        def replace_anchor_tag(match):
-            anchor_tag = match.group(0)
-            # Extract text content (between opening and closing tags)
-            text_match = re.search(r'>([^<]*)</a>', anchor_tag, re.IGNORECASE)
-            link_text = text_match.group(1).strip() if text_match else "link"
-            
-            # Extract href
-            href_match = re.search(r'href=["\']([^"\']*)["\']', anchor_tag)
-            if href_match:
-                href = href_match.group(1)
-                full_url = urljoin(base_url, href)
-                return f"[{link_text}]({full_url})"
-            
-            return match.group(0)
+    def _polite_get(self, url: str, headers: Optional[dict] = None, read: bool = True, max_bytes: int = 0) -> httpx.Response:
+        """GET a page within the host's politeness limits, retrying while it answers 429/503
         
-        # Match anchor tags with href attribute (including multi-line content)
-        return re.sub(r'<a[^>]*href=["\'][^"\']*["\'][^>]*>.*?</a>', replace_anchor_tag, html_content, flags=re.IGNORECASE | re.DOTALL)
+        With read unset only the status and headers are received, with max_bytes at most that much of the body.
+        """
+        for attempt in range(self.max_retries + 1):
+            with self.scheduler.slot(url) as waited:
+                self.metrics.observe(url, 'polite_wait', waited)
+                start = time.monotonic()
+                response = self.fetcher.fetch(url, headers=headers, read=read, max_bytes=max_bytes)
+                self.scheduler.record(url, response.status_code, time.monotonic() - start, response.headers.get('Retry-After'))
+            if not self.scheduler.should_retry(response.status_code) or attempt == self.max_retries:
+                return response
+            print(f"{url} answered {response.status_code}, backing off")
+            self.metrics.count('retries')
+        return response
     
-    def crawl_page(self, url: str) -> Optional[str]:
-        """Crawl a single page and return markdown"""
-        if url in self.visited:
+    def _fetch_static(self, url: str, response_info: Optional[dict] = None,
+                      response: Optional[httpx.Response] = None) -> Optional[str]:
+        """Fetch a page over plain HTTP, returns None if it is not HTML
+        
+        The status and headers of the response are stored in response_info when given.
+        A response already fetched for the page, with its body read, is used instead of fetching again.
+        """
+        if response is None:
+            response = self._polite_get(url, max_bytes=self._read_limit())
+        if response_info is not None:
+            response_info['status'] = response.status_code
+            response_info['headers'] = dict(response.headers)
+        response.raise_for_status()
+        
+        content_type = response.headers.get('Content-Type', '')
+        if 'html' not in content_type.lower():
             return None
-            
-        self.visited.add(url)
-        print(f"Crawling: {url}")
+        # Without a charset in Content-Type the fetcher guesses it from the body
+        return response.text
+    
+    def _read_limit(self) -> int:
+        """Bytes of a page body to read, 0 for all of it"""
+        # One byte over the cap is enough for _limit_page to see the page is oversized
+        return self.max_page_bytes + 1 if self.max_page_bytes else 0
+    
+    def _needs_browser(self, html_content: str) -> bool:
+        """Guess whether a statically fetched page only renders with JavaScript"""
+        detector = PageShellDetector()
+        detector.feed(html_content)
+        
+        if detector.text_chars == 0:
+            return True
+        # Little visible text plus scripts or a <noscript> fallback looks like an app shell
+        return detector.text_chars < 200 and (detector.has_noscript or detector.scripts > 0)
+    
+    def _fetch_page(self, url: str, response_info: Optional[dict] = None, response: Optional[httpx.Response] = None) -> str:
+        """Load a page once and return its HTML, rendering in the browser when needed
+        
+        response_info, when given, receives the renderer used and the HTTP status and headers of a static fetch.
+        response is a GET of the page already made, whose body stands in for the static fetch.
+        """
+        if response_info is not None:
+            response_info['renderer'] = 'http'
+        if self.renderer != 'browser':
+            try:
+                with self.metrics.timed(url, 'http_fetch'):
+                    html_content = self._fetch_static(url, response_info, response)
+            except Exception as e:
+                if self.renderer == 'http':
+                    raise
+                print(f"Static fetch failed for {url}, using browser: {e}")
+                html_content = None
+                
+            if self.renderer == 'http':
+                if html_content is None:
+                    raise ValueError(f"{url} did not return HTML")
+                return html_content
+            if html_content is not None and not self._needs_browser(html_content):
+                return html_content
+        
+        if response_info is not None:
+            response_info['renderer'] = 'browser'
+        return self._render_page(url)
+    
+    def _render_page(self, url: str) -> str:
+        """Load a page in the browser and return the rendered HTML, restarting a crashed browser once"""
+        from selenium.common.exceptions import WebDriverException
         
         try:
+            page_source = self._load_in_browser(url)
+        except WebDriverException:
+            if self.browsers.alive():
+                raise
+            self.metrics.count('browser_restarts')
+            self.browsers.restart()
+            page_source = self._load_in_browser(url)
+        self.browsers.page_loaded()
+        return page_source
+    
+    def _load_in_browser(self, url: str) -> str:
+        """Navigate the calling thread's browser to url and wait until the page is ready"""
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
+        
+        with self.scheduler.slot(url) as waited:
+            self.metrics.observe(url, 'polite_wait', waited)
+            load_start = time.monotonic()
             self.driver.get(url)
-            WebDriverWait(self.driver, 10).until(
+            start = time.monotonic()
+            WebDriverWait(self.driver, self.wait_timeout).until(
                 EC.presence_of_element_located((By.TAG_NAME, "body"))
             )
-            time.sleep(2)
-            
-            page_source = self.driver.page_source
+            # No status code from the browser, only latency feeds the backoff
+            self.scheduler.record(url, None, time.monotonic() - load_start)
+        ready_start = time.monotonic()
+        self.metrics.observe(url, 'navigate', ready_start - load_start)
+        remaining = max(0.0, self.wait_timeout - (ready_start - start))
+        wait_until_ready(self.driver, self.wait_strategy, timeout=remaining, quiet=self.wait_quiet)
+        
+        end = time.monotonic()
+        self.metrics.observe(url, 'readiness', end - ready_start)
+        with self._lock:
+            self.readiness_timings[url] = end - start
+        
+        return self.driver.page_source
+    
+    def _normalize_links(self, hrefs: List[str], base_url: str) -> Set[str]:
+        """Normalize raw anchor hrefs into crawlable links"""
+        links = set()
+        for href in hrefs:
+            normalized = self._normalize_url(base_url, href.strip())
+            if normalized:
+                links.add(normalized)
+        return links
+    
+    def _revalidate(self, url: str, cached: CachedPage) -> Tuple[bool, Optional[httpx.Response]]:
+        """Check whether a previously written page changed, returns (unchanged, response of the conditional GET)
+        
+        When the page changed and may be used without the browser, the response
+        holds its body, so the page is not downloaded a second time.
+        """
+        lastmod = self.sitemap_lastmod.get(url)
+        if lastmod and lastmod == cached.lastmod:
+            return True, None
+        
+        headers = {}
+        if cached.etag:
+            headers['If-None-Match'] = cached.etag
+        if cached.last_modified:
+            headers['If-Modified-Since'] = cached.last_modified
+        if not headers:
+            # Nothing to revalidate with; the HTML hash decides after fetching
+            return False, None
+        
+        try:
+            # Pages rendered in the browser are loaded there anyway: only the status and headers are needed
+            read = self.renderer != 'browser'
+            with self.metrics.timed(url, 'revalidate'):
+                response = self._polite_get(url, headers=headers, read=read, max_bytes=self._read_limit() if read else 0)
+            if response.status_code == 304:
+                return True, None
+            return False, response
+        except Exception as e:
+            print(f"Error revalidating {url}: {e}")
+            return False, None
+    
+    def _validators_from_headers(self, headers) -> Dict[str, str]:
+        """Pick the HTTP cache validators out of response headers"""
+        validators = {}
+        if headers.get('ETag'):
+            validators['etag'] = headers['ETag']
+        if headers.get('Last-Modified'):
+            validators['last_modified'] = headers['Last-Modified']
+        return validators
+    
+    def _reuse_page(self, url: str, cached: CachedPage, md_path: Path) -> Tuple[Optional[str], Set[str]]:
+        """Keep the markdown from the previous run and return the links recorded for it"""
+        with self._lock:
+            self.pages_unchanged += 1
+        self.metrics.count('cache_hits')
+        self.metrics.set(url, 'outcome', 'unchanged')
+        print(f"Unchanged: {url}")
+        try:
+            markdown = md_path.read_text(encoding='utf-8')
+        except OSError as e:
+            print(f"Error reading {md_path}: {e}")
+            return None, set(cached.links)
+        return markdown, set(cached.links)
+    
+    def _crawl_page(self, url: str) -> Tuple[Optional[str], Set[str]]:
+        """Crawl a single page and return markdown and outgoing links from one page load"""
+        with self._lock:
+            if url in self.visited:
+                return None, set()
+            self.visited.add(url)
             
+        print(f"Crawling: {url}")
+        
+        self.rss.start(url)
+        try:
+            return self._process_page(url)
+        finally:
+            self._record_peak_rss(url, 'peak_rss_bytes')
+    
+    def _record_peak_rss(self, url: str, field: str):
+        """Stop tracking url's memory and attach its peak RSS to the page's metrics"""
+        peak = self.rss.stop(url)
+        if peak is not None:
+            self.metrics.set(url, field, peak)
+    
+    def _process_page(self, url: str) -> Tuple[Optional[str], Set[str]]:
+        """Fetch, dedupe and convert a page claimed by _crawl_page"""
+        md_path = self.output_dir / self._local_path(url)
+        cached = self.page_cache.get(url) if self.page_cache else None
+        if cached and not md_path.exists():
+            cached = None
+        
+        revalidated = None
+        if cached:
+            unchanged, revalidated = self._revalidate(url, cached)
+            if unchanged:
+                return self._reuse_page(url, cached, md_path)
+        
+        # The static fetch's status and headers, for the capture store and the page cache's validators
+        response_info = {} if self.capture is not None or self.page_cache else None
+        try:
+            body = revalidated if revalidated is not None and self.renderer != 'browser' else None
+            page_source = self._fetch_page(url, response_info, body)
+        except Exception as e:
+            print(f"Error crawling {url}: {e}")
+            self._page_error(url, 'fetch')
+            return None, set()
+        page_source = self._limit_page(url, page_source)
+        if page_source is None:
+            return None, set()
+        
+        # Record the page as rendered, before dedupe, so reconvert can make every decision again
+        if self.capture is not None:
+            try:
+                with self.metrics.timed(url, 'capture'):
+                    self.capture.write_page(url, page_source, response_info)
+            except Exception as e:
+                print(f"Error capturing {url}: {e}")
+        
+        # One scan of the snapshot rewrites img/anchor tags and collects images and links
+        with self.metrics.timed(url, 'rewrite'):
+            page = rewrite_html(page_source, url)
+            links = self._normalize_links(page.links, url)
+        
+        # Pages declaring another URL as canonical, or repeating a page already seen, become aliases
+        with self.metrics.timed(url, 'dedupe'):
+            original = self._canonical_target(page_source, url)
+            if original is None and self.content_index is not None:
+                original = self.content_index.add(url, page_source)
+        if original is not None:
+            links.add(original)
+            return self._write_alias(url, original), links
+        
+        digest = None
+        if self.page_cache:
+            text_hash = hashlib.sha256()
+            for data in iter_utf8(page_source):
+                text_hash.update(data)
+            digest = text_hash.hexdigest()
+            validators = self._page_validators(url, response_info, revalidated)
+            if cached and cached.sha256 == digest:
+                # Same rendered HTML as last time: skip conversion, refresh the validators
+                self.page_cache.put(CachedPage(url=url, sha256=digest, lastmod=self.sitemap_lastmod.get(url), links=list(links), **validators))
+                return self._reuse_page(url, cached, md_path)
+        
+        # Only the rewritten copy is needed from here on
+        page_source = None
+        
+        try:
             # Download images and build mapping
             image_mapping = {}
             if self.download_assets:
-                image_mapping = self._download_images(page_source, url)
-            
-            markdown = self._convert_to_markdown(page_source, url)
+                with self.metrics.timed(url, 'assets'):
+                    image_mapping = self._download_images(page.images, url)
+        except Exception as e:
+            print(f"Error crawling {url}: {e}")
+            self._page_error(url, 'assets')
+            return None, links
+        
+        record = CachedPage(url=url, sha256=digest, lastmod=self.sitemap_lastmod.get(url), links=list(links), **validators) if digest else None
+        processed_html, page = self._spill(url, page.html), None
+        
+        if self._convert_pool is not None:
+            # The conversion may finish before this thread returns, so the peak is recorded first
+            self._record_peak_rss(url, 'peak_rss_bytes')
+            self._submit_conversion(url, processed_html, image_mapping, record, links)
+            return None, links
+        
+        markdown = self._convert_and_write(url, processed_html, image_mapping)
+        if markdown is not None and record:
+            self.page_cache.put(record)
+        return markdown, links
+    
+    def _limit_page(self, url: str, page_source: str) -> Optional[str]:
+        """Record the page's size and apply the oversize policy, returns None if the page is skipped"""
+        size = utf8_size(page_source)
+        self.metrics.set(url, 'html_bytes', size)
+        if not self.max_page_bytes or size <= self.max_page_bytes:
+            return page_source
+        if self.oversize == 'skip':
+            print(f"Skipping {url}: more than {self.max_page_bytes / MB:.4g}MB of HTML")
+            self.metrics.set(url, 'outcome', 'oversize')
+            return None
+        print(f"Truncating {url} to {self.max_page_bytes / MB:.4g}MB of HTML")
+        self.metrics.count('pages_truncated')
+        self.metrics.set(url, 'truncated', True)
+        return truncate_html(page_source, self.max_page_bytes)
+    
+    def _spill(self, url: str, processed_html: str) -> Union[str, Path]:
+        """Move rewritten HTML above spill_bytes to a file, so only the converter holds the page in memory"""
+        if not self.spill_bytes or utf8_size(processed_html) <= self.spill_bytes:
+            return processed_html
+        with self.metrics.timed(url, 'spill'):
+            self.spill_dir.mkdir(parents=True, exist_ok=True)
+            fd, name = tempfile.mkstemp(suffix='.html', dir=self.spill_dir)
+            with os.fdopen(fd, 'wb') as f:
+                for data in iter_utf8(processed_html):
+                    f.write(data)
+        self.metrics.count('pages_spilled')
+        return Path(name)
+    
+    def _canonical_target(self, page_source: str, url: str) -> Optional[str]:
+        """The other crawlable URL this page names as its rel=canonical, if any, on the crawl's domain"""
+        if self.canonicalizer is None:
+            return None
+        canonical = find_canonical(page_source, url)
+        canonical = self._normalize_url(url, canonical) if canonical else None
+        if canonical is None or canonical == url:
+            return None
+        # Before crawl() sets the domain, only the page's own host counts
+        if urlparse(canonical).netloc != (self.domain or urlparse(url).netloc):
+            return None
+        with self._lock:
+            # Two pages naming each other: the one crawled second keeps its content
+            if self.aliases.get(canonical) == url:
+                return None
+        if not self.scheduler.allowed(canonical):
+            return None
+        return canonical
+    
+    def _write_alias(self, url: str, original: str) -> Optional[str]:
+        """Write a stub pointing at original in place of url's page, returns its markdown"""
+        with self._lock:
+            self.aliases[url] = original
+        self.metrics.set(url, 'outcome', 'duplicate')
+        self.metrics.set(url, 'duplicate_of', original)
+        print(f"Duplicate of {original}: {url}")
+        
+        markdown = f"Duplicate of [{original}]({self._local_path(original)})\n"
+        try:
+            md_path = self.output_dir / self._local_path(url)
+            md_path.parent.mkdir(parents=True, exist_ok=True)
+            with self.metrics.timed(url, 'write'), open(md_path, 'w', encoding='utf-8') as f:
+                f.write(f"# [{url}]({url})\n\n")
+                f.write(f"**Source URL:** {url}\n\n")
+                f.write("---\n\n")
+                f.write(markdown)
+            return markdown
+        except Exception as e:
+            print(f"Error writing alias for {url}: {e}")
+            self._page_error(url, 'write')
+            return None
+    
+    def _write_aliases(self):
+        """Record every alias and the page it duplicates in aliases.json"""
+        path = self.output_dir / "aliases.json"
+        try:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(dict(sorted(self.aliases.items())), f, indent=2)
+        except OSError as e:
+            print(f"Error writing {path}: {e}")
+    
+    def _convert_and_write(self, url: str, processed_html: Union[str, Path], image_mapping: Dict[str, str]) -> Optional[str]:
+        """Convert a fetched page (already passed through rewrite_html, maybe spilled to a file) to markdown and write it to the mirror"""
+        try:
+            with self.metrics.timed(url, 'convert'):
+                markdown = self._convert_to_markdown(processed_html, url, preprocessed=True)
             
             # Replace image references in markdown with local paths
             if self.download_assets and image_mapping:
-                markdown = self._replace_image_refs_in_markdown(markdown, image_mapping)
-            
-            filename = self._make_safe_filename(url)
-            self.url_to_path[url] = filename
+                with self.metrics.timed(url, 'image_refs'):
+                    markdown = self._replace_image_refs_in_markdown(markdown, image_mapping)
             
-            md_path = self.output_dir / filename
+            md_path = self.output_dir / self._local_path(url)
             md_path.parent.mkdir(parents=True, exist_ok=True)
             
             # Fix any remaining links to be local paths
-            markdown = self._fix_local_links(markdown, url)
+            with self.metrics.timed(url, 'link_fix'):
+                markdown = self._fix_local_links(markdown, url)
             
-            with open(md_path, 'w', encoding='utf-8') as f:
+            with self.metrics.timed(url, 'write'), open(md_path, 'w', encoding='utf-8') as f:
                 f.write(f"# [{url}]({url})\n\n")
                 f.write(f"**Source URL:** {url}\n\n")
                 f.write("---\n\n")
@@ -389,73 +942,128 @@ class WebCrawler:
             
         except Exception as e:
             print(f"Error crawling {url}: {e}")
+            self._page_error(url, 'convert')
             return None
+        finally:
+            if isinstance(processed_html, Path):
+                processed_html.unlink(missing_ok=True)
     
-    def _parse_sitemap(self, sitemap_url: str) -> List[str]:
-        """Parse sitemap.xml or sitemap_index.xml and extract URLs"""
-        urls = []
+    def _submit_conversion(self, url: str, processed_html: Union[str, Path], image_mapping: Dict[str, str], record: Optional[CachedPage],
+                           links: Set[str] = frozenset()):
+        """Queue a fetched page for the conversion process pool, blocking while the queue is full
         
+        links are the page's normalized links; their spellings go along so the
+        worker resolves them to the same local paths as this process.
+        """
+        url_forms = {self.canonicalizer.key(link): link for link in links} if self.canonicalizer is not None else {}
+        self._convert_slots.acquire()
+        with self._lock:
+            self._awaiting[url] = 2
         try:
-            response = requests.get(sitemap_url, timeout=10)
-            response.raise_for_status()
-            
-            root = ET.fromstring(response.content)
-            
-            # Check if it's a sitemap index
-            ns = {'sm': 'http://www.sitemaps.org/schemas/sitemap/0.9'}
-            
-            # Try namespace first, then without namespace
-            sitemap_nodes = root.findall('.//{http://www.sitemaps.org/schemas/sitemap/0.9}sitemap') or root.findall('.//sitemap')
-            
-            if sitemap_nodes:
-                # It's a sitemap index - recursively parse each sitemap
-                for sitemap in sitemap_nodes:
-                    loc = sitemap.find('.//{http://www.sitemaps.org/schemas/sitemap/0.9}loc') or sitemap.find('.//loc')
-                    if loc is not None and loc.text:
-                        urls.extend(self._parse_sitemap(loc.text))
-            else:
-                # It's a regular sitemap - extract URLs
-                url_nodes = root.findall('.//{http://www.sitemaps.org/schemas/sitemap/0.9}url') or root.findall('.//url')
-                
-                for url_elem in url_nodes:
-                    loc = url_elem.find('.//{http://www.sitemaps.org/schemas/sitemap/0.9}loc') or url_elem.find('.//loc')
-                    if loc is not None and loc.text:
-                        normalized = self._normalize_url(sitemap_url, loc.text)
-                        if normalized:
-                            urls.append(normalized)
-            
+            future = self._convert_pool.submit(_convert_in_worker, url, processed_html, image_mapping, url_forms)
+        except Exception:
+            self._convert_slots.release()
+            with self._lock:
+                self._awaiting.pop(url, None)
+            raise
+        future.add_done_callback(lambda f: self._conversion_finished(url, record, f))
+    
+    def _conversion_finished(self, url: str, record: Optional[CachedPage], future: Future):
+        """Record the outcome of a pooled conversion"""
+        self._convert_slots.release()
+        try:
+            written, paths, timings, peak = future.result()
         except Exception as e:
-            print(f"Error parsing sitemap {sitemap_url}: {e}")
-            
+            print(f"Error converting {url}: {e}")
+            written, paths, timings, peak = False, {}, {}, None
+            self._page_error(url, 'convert')
+        
+        self.metrics.merge(url, timings)
+        if peak is not None:
+            self.metrics.set(url, 'convert_rss_bytes', peak)
+        self.metrics.page_done(url, 'written' if written else 'error')
+        with self._lock:
+            for link_url, local_path in paths.items():
+                if link_url not in self.url_to_path:
+                    self.url_to_path[link_url] = local_path
+            if not written:
+                self._awaiting.pop(url, None)
+        if not written:
+            self.frontier.release(url)
+            return
+        
+        if record and self.page_cache:
+            self.page_cache.put(record)
+        self._stage_done(url)
+    
+    def _page_error(self, url: str, stage: str):
+        """Count a failed page and note the stage it failed in"""
+        self.metrics.count('errors')
+        self.metrics.set(url, 'outcome', 'error')
+        self.metrics.set(url, 'failed_stage', stage)
+    
+    def _stage_done(self, url: str):
+        """Mark one completion stage of url; the page is done once every stage has finished"""
+        with self._lock:
+            remaining = self._awaiting.get(url, 1) - 1
+            if remaining > 0:
+                self._awaiting[url] = remaining
+                return
+            self._awaiting.pop(url, None)
+        self.frontier.done(url)
+    
+    def _page_validators(self, url: str, response_info: dict, revalidated: Optional[httpx.Response]) -> Dict[str, str]:
+        """ETag/Last-Modified of a fetched page, from the GET that fetched it when there was one"""
+        if 'headers' in response_info:
+            return self._validators_from_headers(httpx.Headers(response_info['headers']))
+        if revalidated is not None:
+            return self._validators_from_headers(revalidated.headers)
+        # Rendered in the browser only, which exposes no response headers
+        return self._head_validators(url)
+    
+    def _head_validators(self, url: str) -> Dict[str, str]:
+        """Fetch ETag/Last-Modified for a page with a HEAD request"""
+        try:
+            with self.scheduler.slot(url):
+                response = self.fetcher.fetch_head(url)
+            return self._validators_from_headers(response.headers)
+        except Exception:
+            return {}
+    
+    def crawl_page(self, url: str) -> Optional[str]:
+        """Crawl a single page and return markdown"""
+        markdown, _ = self._crawl_page(url)
+        return markdown
+    
+    def _add_sitemap_entries(self, entries: List[SitemapEntry]) -> List[str]:
+        """Normalize sitemap entries, remember their lastmod and return the URLs"""
+        urls = []
+        for entry in entries:
+            normalized = self._normalize_url(entry.url, entry.url)
+            if normalized:
+                urls.append(normalized)
+                if entry.lastmod:
+                    self.sitemap_lastmod[normalized] = entry.lastmod
+                if entry.priority is not None:
+                    self.scorer.sitemap_priority[normalized] = entry.priority
+        self.sitemap_urls += len(urls)
         return urls
     
+    def _parse_sitemap(self, sitemap_url: str) -> List[str]:
+        """Parse sitemap.xml or sitemap_index.xml and extract URLs"""
+        reader = SitemapReader(self.fetcher, sitemap_url, since=self.since, max_workers=self.sitemap_workers)
+        try:
+            return self._add_sitemap_entries(list(reader))
+        finally:
+            reader.close()
+    
     def extract_links(self, url: str) -> Set[str]:
         """Extract all links from a page"""
-        links = set()
-        
         try:
-            self.driver.get(url)
-            WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.TAG_NAME, "body"))
-            )
-            time.sleep(1)
-            
-            elements = self.driver.find_elements(By.TAG_NAME, "a")
-            
-            for elem in elements:
-                try:
-                    href = elem.get_attribute("href")
-                    if href:
-                        normalized = self._normalize_url(url, href)
-                        if normalized:
-                            links.add(normalized)
-                except Exception:
-                    continue
-                    
+            return self._normalize_links(rewrite_html(self._fetch_page(url), url).links, url)
         except Exception as e:
             print(f"Error extracting links from {url}: {e}")
-            
-        return links
+            return set()
     
     def _get_sitemap_url(self, start_url: str) -> Optional[str]:
         """Check for sitemap.xml and sitemap_index.xml at common locations"""
@@ -468,92 +1076,484 @@ class WebCrawler:
             f"{base_url}/sitemap_index.xml.gz",
         ]
         
-        for sitemap_url in sitemap_locations:
-            try:
-                response = requests.head(sitemap_url, timeout=5)
-                if response.status_code == 200:
-                    print(f"Found sitemap: {sitemap_url}")
-                    return sitemap_url
-            except Exception:
-                continue
+        # Probe every location at once, the first one in the list that exists wins
+        async def probe_all():
+            return await asyncio.gather(*(self.fetcher.head(url) for url in sitemap_locations), return_exceptions=True)
+        
+        for sitemap_url, response in zip(sitemap_locations, self.fetcher.loop.run(probe_all())):
+            if not isinstance(response, Exception) and response.status_code == 200:
+                print(f"Found sitemap: {sitemap_url}")
+                return sitemap_url
                 
         return None
     
-    def crawl(self, start_url: str, max_pages: int = None):
-        """Crawl website starting from start_url"""
+    def crawl(self, start_url: str, max_pages: int = None, pool: Optional[Executor] = None) -> int:
+        """Crawl website starting from start_url, returns the number of pages crawled
+        
+        With pool, pages are fetched on that executor's threads (shared with other
+        crawls in a batch) instead of on threads of this crawl's own.
+        """
         if max_pages is None:
             max_pages = self.max_pages
             
+        if self.canonicalizer is not None:
+            start_url = self.canonicalizer.canonicalize(start_url.split('#')[0])
         parsed = urlparse(start_url)
         self.domain = parsed.netloc
+        self._resolve_cached.cache_clear()
         
         self.output_dir.mkdir(parents=True, exist_ok=True)
         
-        # Track depth for each URL: {url: depth_level}
-        url_depths = {}
-        to_visit: List[str] = []
-        pages_crawled = 0
+        state = self._open_state()
+        if state is not None:
+            resuming = state.resumed if isinstance(state, ShardedCrawlState) else self.resume and not state.is_empty()
+            self.frontier = state
+            self.visited = state.visited
+            self.url_to_path = state.url_to_path
+            if isinstance(state, ShardedCrawlState) and self.content_index is not None:
+                self.content_index = SharedContentIndex(state, self.content_index.max_distance)
+            if resuming:
+                print(f"Resuming crawl: {state.completed()} pages done, {len(state)} queued")
+                aliases_path = self.output_dir / "aliases.json"
+                if aliases_path.exists():
+                    try:
+                        self.aliases.update(json.loads(aliases_path.read_text(encoding='utf-8')))
+                    except (OSError, ValueError) as e:
+                        print(f"Error reading {aliases_path}: {e}")
+        else:
+            resuming = False
+        
+        if self.incremental:
+            self.page_cache = PageCache(self.output_dir)
+        
+        if self.capture is not None:
+            # Settings reconvert needs to resolve links the same way this crawl did
+            self.capture.write_info({
+                "start-url": start_url,
+                "domain": self.domain,
+                "canonicalize": self.canonicalizer is not None,
+                "drop-params": " ".join(self.drop_params),
+                "download-assets": self.download_assets,
+            })
+        
+        # Always add the start URL (even if using sitemap, for depth tracking)
+        if self.canonicalizer is not None:
+            # The start URL's spelling wins, unless another shard claimed one first
+            self._url_forms.pop(self.canonicalizer.key(start_url), None)
+            start_url = self._url_form(self.canonicalizer.key(start_url), start_url)
+        self.frontier.push(start_url, 0)
         
-        # Optional: Use sitemap to get initial URLs
-        if self.use_sitemap:
+        # Optional: stream sitemap URLs into the frontier while crawling (already queued when resuming);
+        # in a sharded crawl the first shard reads it for everyone
+        if self.use_sitemap and not resuming and self.shard == 0:
             sitemap_url = self._get_sitemap_url(start_url)
             if sitemap_url:
-                sitemap_urls = self._parse_sitemap(sitemap_url)
-                print(f"Discovered {len(sitemap_urls)} URLs from sitemap")
-                
-                # Add sitemap URLs to queue
-                for url in sitemap_urls:
-                    if url not in url_depths:
-                        url_depths[url] = 0
-                        to_visit.append(url)
+                self._sitemap_reader = SitemapReader(self.fetcher, sitemap_url, since=self.since, max_workers=self.sitemap_workers)
         
-        # Always add the start URL (even if using sitemap, for depth tracking)
-        if start_url not in url_depths:
-            url_depths[start_url] = 0
-            to_visit.append(start_url)
+        if self.convert_workers:
+            self._start_convert_pool()
         
-        while to_visit and pages_crawled < max_pages:
-            url = to_visit.pop(0)
-            
-            if url in self.visited:
+        try:
+            if self.workers > 1 or pool is not None:
+                pages_crawled = self._crawl_parallel(max_pages, pool)
+            else:
+                pages_crawled = self._crawl_sequential(max_pages)
+        finally:
+            if self._sitemap_reader is not None:
+                self._sitemap_reader.close()
+                self._sitemap_reader = None
+            if self._convert_pool is not None:
+                # Let queued conversions finish so their pages are written and marked done
+                self._convert_pool.shutdown(wait=True)
+                self._convert_pool = None
+            self.frontier.close()
+            if self.page_cache:
+                self.page_cache.close()
+                self.page_cache = None
+            if self.aliases:
+                self._write_aliases()
+            self._remove_spill_dir()
+        
+        print(f"\nCrawl complete!")
+        print(f"Pages crawled: {pages_crawled}")
+        if self.sitemap_urls:
+            print(f"Discovered {self.sitemap_urls} URLs from sitemap")
+        if self.incremental:
+            print(f"Pages unchanged since last run: {self.pages_unchanged}")
+        if self.aliases:
+            print(f"Duplicate pages recorded as aliases: {len(self.aliases)} (see aliases.json)")
+        if self.capture is not None:
+            print(f"Captured {self.capture.pages} pages and {self.capture.assets} assets to {self.capture.path}")
+        disallowed = self.metrics.counters.get('robots_disallowed', 0)
+        if self.scheduler.backoffs or disallowed:
+            print(f"Backed off on {self.scheduler.backoffs} responses, {disallowed} URLs disallowed by robots.txt")
+        for line in self.metrics.summary():
+            print(line)
+        if self.metrics_path:
+            self.metrics.write_prometheus(self.metrics_path)
+            print(f"Metrics written to {self.metrics_path}")
+        if self.browsers.recycled or self.browsers.restarts:
+            print(f"Browser sessions recycled: {self.browsers.recycled}, restarted after a crash: {self.browsers.restarts}")
+        if self.readiness_timings:
+            timings = sorted(self.readiness_timings.values())
+            print(f"Browser readiness ({self.wait_strategy}): "
+                  f"avg {sum(timings) / len(timings):.2f}s, "
+                  f"median {timings[len(timings) // 2]:.2f}s, max {timings[-1]:.2f}s")
+        print(f"Output directory: {self.output_dir}")
+        return pages_crawled
+        
+    def _open_state(self) -> Optional[CrawlState]:
+        """Frontier backend for this crawl: the shared or on-disk state, or None to stay in memory"""
+        scorer = self.scorer if self.order == 'priority' else None
+        if self.shared_state is not None:
+            print(f"Shard {self.shard} of {self.shards}, shared state: {self.shared_state}")
+            return ShardedCrawlState(self.shared_state, self.shard, self.shards, scorer=scorer,
+                                     key=self.canonicalizer.key if self.canonicalizer is not None else None)
+        if self.persist_state:
+            return CrawlState(self.output_dir, resume=self.resume, scorer=scorer)
+        return None
+    
+    def _remove_spill_dir(self):
+        """Remove the spill directory once every spilled page has been converted"""
+        try:
+            self.spill_dir.rmdir()
+        except OSError:
+            pass
+    
+    def _start_convert_pool(self):
+        """Start the conversion process pool for the current domain"""
+        # Spawn rather than fork: the parent already runs browser and pool threads
+        self._convert_pool = ProcessPoolExecutor(
+            max_workers=self.convert_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_convert_worker,
+            initargs=(str(self.output_dir), self.domain, self.download_assets,
+                      self.canonicalizer is not None, self.drop_params),
+        )
+    
+    def replay(self, capture_path: str) -> int:
+        """Rebuild the mirror from a capture store without network or browser, returns the number of pages converted
+        
+        Captured assets are restored into assets/ first, then the latest capture
+        of every page is converted in capture order, with canonical and duplicate
+        pages detected again. Conversions run on convert_workers processes when set.
+        """
+        capture_path = Path(capture_path)
+        info = read_info(capture_path)
+        self.domain = info.get('domain', '')
+        self._resolve_cached.cache_clear()
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        
+        # First pass: restore assets and find the latest capture of each page
+        latest: Dict[str, int] = {}
+        asset_paths: Dict[str, str] = {}
+        for n, record in enumerate(read_capture(capture_path)):
+            if not record.url:
                 continue
-                
-            # Check depth limit (0 = unlimited)
-            current_depth = url_depths.get(url, 0)
-            if self.depth > 0 and current_depth >= self.depth:
+            if record.kind == PAGE:
+                latest[record.url] = n
+                if self.canonicalizer is not None:
+                    # Links resolve to the spellings the crawl fetched
+                    self._url_forms.setdefault(self.canonicalizer.key(record.url), record.url)
+            elif record.kind == ASSET and self.download_assets:
+                asset_paths[record.url] = self._restore_asset(record.url, record.content, record.content_type)
+        if not self.domain and latest:
+            self.domain = urlparse(next(iter(latest))).netloc
+        print(f"Replaying {len(latest)} pages and {len(asset_paths)} assets from {capture_path}")
+        
+        if self.convert_workers:
+            self._start_convert_pool()
+        pages_converted = 0
+        try:
+            for n, record in enumerate(read_capture(capture_path)):
+                if record.kind == PAGE and latest.get(record.url) == n:
+                    page_source = record.content.decode('utf-8', errors='replace')
+                    record.content = b''  # keep only the decoded copy
+                    self._replay_page(record.url, page_source, latest, asset_paths)
+                    page_source = None
+                    pages_converted += 1
+        finally:
+            if self._convert_pool is not None:
+                self._convert_pool.shutdown(wait=True)
+                self._convert_pool = None
+            if self.aliases:
+                self._write_aliases()
+            self._remove_spill_dir()
+        
+        print(f"\nReconvert complete!")
+        print(f"Pages converted: {pages_converted}")
+        if self.aliases:
+            print(f"Duplicate pages recorded as aliases: {len(self.aliases)} (see aliases.json)")
+        for line in self.metrics.summary():
+            print(line)
+        if self.metrics_path:
+            self.metrics.write_prometheus(self.metrics_path)
+            print(f"Metrics written to {self.metrics_path}")
+        print(f"Output directory: {self.output_dir}")
+        return pages_converted
+    
+    def _restore_asset(self, url: str, content: bytes, content_type: str) -> str:
+        """Write a captured asset under the name the downloader gives it, returns its path relative to the output directory"""
+        local_path = self.assets_dir / f"{hashlib.sha256(content).hexdigest()[:16]}{asset_extension(url, content_type)}"
+        if not local_path.exists():
+            self.assets_dir.mkdir(parents=True, exist_ok=True)
+            local_path.write_bytes(content)
+        return str(local_path.relative_to(self.output_dir))
+    
+    def _replay_page(self, url: str, page_source: str, captured: Dict[str, int], asset_paths: Dict[str, str]):
+        """Convert one captured page the way _crawl_page converts a fetched one"""
+        with self._lock:
+            self.visited.add(url)
+        print(f"Converting: {url}")
+        self.rss.start(url)
+        try:
+            markdown = self._replay_conversion(url, page_source, captured, asset_paths)
+        finally:
+            self._record_peak_rss(url, 'peak_rss_bytes')
+        self._page_finished(url, 0, markdown, set())
+    
+    def _replay_conversion(self, url: str, page_source: str, captured: Dict[str, int],
+                           asset_paths: Dict[str, str]) -> Optional[str]:
+        """Dedupe and convert a captured page, returns its markdown (None when skipped or handed to the pool)"""
+        page_source = self._limit_page(url, page_source)
+        if page_source is None:
+            return None
+        
+        with self.metrics.timed(url, 'rewrite'):
+            page = rewrite_html(page_source, url)
+        
+        # Only pages present in the capture can stand in for others
+        with self.metrics.timed(url, 'dedupe'):
+            original = self._canonical_target(page_source, url)
+            if original not in captured:
+                original = None
+            if original is None and self.content_index is not None:
+                original = self.content_index.add(url, page_source)
+        
+        if original is not None:
+            return self._write_alias(url, original)
+        page_source = None
+        
+        image_mapping = {}
+        if self.download_assets:
+            full_urls = dict.fromkeys(urljoin(url, img_url) for img_url in page.images if img_url)
+            image_mapping = {full_url: asset_paths[full_url] for full_url in full_urls if full_url in asset_paths}
+        links = self._normalize_links(page.links, url) if self._convert_pool is not None else set()
+        processed_html, page = self._spill(url, page.html), None
+        if self._convert_pool is not None:
+            self._record_peak_rss(url, 'peak_rss_bytes')
+            self._submit_conversion(url, processed_html, image_mapping, None, links)
+            return None
+        return self._convert_and_write(url, processed_html, image_mapping)
+    
+    def _within_depth(self, depth: int) -> bool:
+        """Check depth limit (0 = unlimited)"""
+        return self.depth <= 0 or depth < self.depth
+    
+    def _feed_sitemap(self, block: bool = False):
+        """Move sitemap entries read so far into the frontier, optionally waiting for more"""
+        reader = self._sitemap_reader
+        if reader is None or reader.finished:
+            return
+        entries = reader.wait() if block else reader.poll()
+        self.frontier.push_many([(url, 0) for url in self._add_sitemap_entries(entries) if self.scorer.allowed(url)])
+    
+    def _next_url(self, block: bool = True) -> Optional[Tuple[str, int]]:
+        """Pop the next URL that still needs crawling and is within the depth limit
+        
+        While a sitemap is still being read an empty frontier is not the end of
+        the crawl: with block set this waits for more sitemap entries.
+        """
+        while True:
+            self._feed_sitemap()
+            entry = self.frontier.pop()
+            if entry is None:
+                if block and self._sitemap_reader is not None and not self._sitemap_reader.finished:
+                    self._feed_sitemap(block=True)
+                    continue
+                return None
+            url, current_depth = entry
+            if url in self.visited or not self._within_depth(current_depth):
+                self.frontier.release(url)
                 continue
-                
-            self.crawl_page(url)
-            pages_crawled += 1
-            
-            if pages_crawled >= max_pages:
+            if not self.scheduler.allowed(url):
+                print(f"Disallowed by robots.txt: {url}")
+                self.metrics.count('robots_disallowed')
+                self.frontier.release(url)
+                continue
+            return entry
+    
+    def _page_finished(self, url: str, current_depth: int, markdown: Optional[str], new_links: Set[str]):
+        """Queue links discovered on a page, then mark the page as done if it was written"""
+        # A page's canonical URL stands in for the page itself, so it is queued at the same depth
+        original = self.aliases.get(url)
+        entries = [(link, current_depth if link == original else current_depth + 1) for link in new_links]
+        # Links past the depth limit are not queued: popped and dropped there, they would stay seen
+        # and never be crawled when a shallower page links to them later (the priority order is not BFS)
+        self.frontier.push_many([(link, depth) for link, depth in entries
+                                 if self._within_depth(depth) and link not in self.visited and self.scorer.allowed(link)])
+        with self._lock:
+            converting = url in self._awaiting
+        if not converting:
+            self.metrics.page_done(url, 'written' if markdown is not None else 'error')
+        if markdown is not None or converting:
+            self._stage_done(url)
+        else:
+            self.frontier.release(url)
+    
+    def _crawl_sequential(self, max_pages: int) -> int:
+        """Breadth-first crawl on the calling thread, returns the number of pages crawled"""
+        pages_crawled = self.frontier.completed()
+        
+        while pages_crawled < max_pages:
+            entry = self._next_url()
+            if entry is None:
+                if self.frontier.wait_for_work():
+                    continue
                 break
-                
-            new_links = self.extract_links(url)
+            url, current_depth = entry
             
-            for link in new_links:
-                if link not in self.visited and link not in to_visit:
-                    to_visit.append(link)
-                    url_depths[link] = current_depth + 1
+            markdown, new_links = self._crawl_page(url)
+            pages_crawled += 1
+            self._page_finished(url, current_depth, markdown, new_links)
                     
-        print(f"\nCrawl complete!")
-        print(f"Pages crawled: {pages_crawled}")
-        print(f"Output directory: {self.output_dir}")
+        return pages_crawled
+    
+    def _crawl_parallel(self, max_pages: int, pool: Optional[Executor] = None) -> int:
+        """Crawl with a pool of browser workers fed from a shared frontier
+        
+        The frontier is only touched by the scheduling thread; workers fetch,
+        convert and write pages and hand back the discovered links. Pages
+        rendered concurrently are converted together through one convert_all call.
+        On a pool shared with other sites, this thread waits out the host's
+        pacing before submitting a page, so workers go to sites that are ready.
+        """
+        pages_crawled = self.frontier.completed()
+        in_flight = {}
         
+        self._convert_queue = BatchQueue(lambda pages: self.convert_batch(pages, preprocessed=True), max_batch=self.workers)
+        try:
+            own_pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="mdcrawler") if pool is None else None
+            with own_pool or nullcontext(pool) as pool:
+                while True:
+                    # Keep every worker busy while the page budget allows
+                    while len(in_flight) < self.workers and pages_crawled < max_pages:
+                        # Pages in flight may still add links, so only wait on the sitemap when idle
+                        entry = self._next_url(block=not in_flight)
+                        if entry is None:
+                            break
+                        if own_pool is None:
+                            time.sleep(self.scheduler.ready_in(entry[0]))
+                        in_flight[pool.submit(self._crawl_page, entry[0])] = entry
+                        pages_crawled += 1
+                    
+                    if not in_flight:
+                        # Other shards may still queue pages for this one
+                        if pages_crawled < max_pages and self.frontier.wait_for_work():
+                            continue
+                        break
+                    
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        url, current_depth = in_flight.pop(future)
+                        markdown, new_links = future.result()
+                        self._page_finished(url, current_depth, markdown, new_links)
+        finally:
+            self._convert_queue.close()
+            self._convert_queue = None
+        
+        return pages_crawled
+    
     def close(self):
         """Cleanup resources"""
-        self.driver.quit()
+        self.assets.close()
+        self.metrics.close()
+        self.rss.close()
+        if self.capture is not None:
+            self.capture.close()
+        if self._shared is None:
+            self.fetcher.close()
+            self.browsers.close()
 
 
-def crawl_website(start_url: str, output_dir: str = "mirror", max_pages: int = 10, depth: int = 1, download_assets: bool = False, use_sitemap: bool = False):
+# Conversion process pool workers each hold a crawler used only for its conversion methods
+_worker_crawler: Optional[WebCrawler] = None
+
+
+def _init_convert_worker(output_dir: str, domain: str, download_assets: bool, canonicalize: bool, drop_params: List[str]):
+    """Set up the converting crawler in a pool worker process"""
+    global _worker_crawler
+    _worker_crawler = WebCrawler(output_dir, download_assets=download_assets, canonicalize=canonicalize, drop_params=drop_params)
+    _worker_crawler.domain = domain
+
+
+def _convert_in_worker(url: str, processed_html: Union[str, Path], image_mapping: Dict[str, str],
+                       url_forms: Dict[str, str]) -> Tuple[bool, Dict[str, str], dict, Optional[int]]:
+    """Convert and write one page
+    
+    Returns whether it was written, the link paths it assigned, its metrics and
+    the worker process's peak RSS during the conversion, which the crawler's own
+    sampler cannot see.
+    """
+    _worker_crawler.url_to_path = {}
+    _worker_crawler._url_forms.update(url_forms)
+    _worker_crawler.rss.start(url)
+    try:
+        markdown = _worker_crawler._convert_and_write(url, processed_html, image_mapping)
+    finally:
+        peak = _worker_crawler.rss.stop(url)
+    return markdown is not None, _worker_crawler.url_to_path, _worker_crawler.metrics.take(url), peak
+
+
+def crawl_website(start_url: str, output_dir: str = "mirror", max_pages: int = 10, depth: int = 1, download_assets: bool = False, use_sitemap: bool = False, workers: int = 1, renderer: str = "browser", wait_strategy: str = "mutation", wait_timeout: float = 10.0, wait_quiet: float = 0.5,
+                  persist_state: bool = False, resume: bool = False, incremental: bool = False, asset_workers: int = 8,
+                  convert_workers: int = 0, since: Optional[date] = None, max_per_host: int = 0, rate: float = 0.0,
+                  respect_robots: bool = True, trace_path: Optional[str] = None, metrics_path: Optional[str] = None,
+                  recycle_pages: int = 200, recycle_rss_mb: int = 2048, block_resources: bool = True, http2: bool = True,
+                  canonicalize: bool = True, drop_params: Optional[List[str]] = None, dedupe: bool = True, simhash_distance: int = 0,
+                  order: str = "priority", include: Optional[List[str]] = None, exclude: Optional[List[str]] = None,
+                  boosts: Optional[List[Tuple[str, float]]] = None, depth_weight: float = 1.0, inlink_weight: float = 0.5,
+                  sitemap_weight: float = 1.0, capture_path: Optional[str] = None, max_page_mb: float = 50.0,
+                  oversize: str = "truncate", spill_mb: float = 8.0, shared_state: Optional[str] = None, shard: int = 0,
+                  shards: int = 1):
     """ Convenience function to crawl a website """
-    crawler = WebCrawler(output_dir, max_pages=max_pages, depth=depth, download_assets=download_assets, use_sitemap=use_sitemap)
+    crawler = WebCrawler(output_dir, max_pages=max_pages, depth=depth, download_assets=download_assets, use_sitemap=use_sitemap, workers=workers, renderer=renderer,
+                         wait_strategy=wait_strategy, wait_timeout=wait_timeout, wait_quiet=wait_quiet,
+                         persist_state=persist_state, resume=resume, incremental=incremental, asset_workers=asset_workers,
+                         convert_workers=convert_workers, since=since, max_per_host=max_per_host, rate=rate, respect_robots=respect_robots,
+                         trace_path=trace_path, metrics_path=metrics_path,
+                         recycle_pages=recycle_pages, recycle_rss_mb=recycle_rss_mb, block_resources=block_resources,
+                         http2=http2, canonicalize=canonicalize, drop_params=drop_params, dedupe=dedupe,
+                         simhash_distance=simhash_distance, order=order, include=include, exclude=exclude, boosts=boosts,
+                         depth_weight=depth_weight, inlink_weight=inlink_weight, sitemap_weight=sitemap_weight,
+                         capture_path=capture_path, max_page_mb=max_page_mb, oversize=oversize, spill_mb=spill_mb,
+                         shared_state=shared_state, shard=shard, shards=shards)
     try:
         crawler.crawl(start_url)
     finally:
         crawler.close()
 
 
+def reconvert_capture(capture_path: str, output_dir: str = "mirror", workers: int = 1, download_assets: Optional[bool] = None,
+                      dedupe: bool = True, simhash_distance: int = 0, trace_path: Optional[str] = None,
+                      metrics_path: Optional[str] = None, max_page_mb: float = 50.0, oversize: str = "truncate",
+                      spill_mb: float = 8.0) -> int:
+    """Convenience function to rebuild a mirror from a capture store, resolving links as the capturing crawl did"""
+    info = read_info(Path(capture_path))
+    if download_assets is None:
+        download_assets = info.get('download-assets') == 'True'
+    # Robots.txt is not consulted: nothing is fetched
+    crawler = WebCrawler(output_dir, download_assets=download_assets, convert_workers=workers if workers > 1 else 0,
+                         respect_robots=False, trace_path=trace_path, metrics_path=metrics_path,
+                         canonicalize=info.get('canonicalize', 'True') == 'True',
+                         drop_params=info.get('drop-params', '').split(), dedupe=dedupe, simhash_distance=simhash_distance,
+                         max_page_mb=max_page_mb, oversize=oversize, spill_mb=spill_mb)
+    try:
+        return crawler.replay(capture_path)
+    finally:
+        crawler.close()
+
+
 if __name__ == "__main__":
     import sys
     
@@ -1,10 +1,12 @@
 """Main CLI entry point"""
 
+import os
 import typer
+from datetime import date
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 
-from mdcrawler.crawler.web_crawler import crawl_website, WebCrawler
+from mdcrawler.crawler.scoring import parse_boost
 
 app = typer.Typer(help="Website to Markdown Converter")
 
@@ -16,27 +18,212 @@ def crawl(
     max_pages: int = typer.Option(10, "-m", "--max-pages", help="Maximum number of pages to crawl"),
     depth: int = typer.Option(1, "-d", "--depth", help="Maximum depth to crawl (0 = unlimited)"),
     download_assets: bool = typer.Option(False, "--download-assets", help="Download images and assets"),
+    asset_workers: int = typer.Option(8, "--asset-workers", help="Number of concurrent asset downloads"),
+    http2: bool = typer.Option(True, "--http2/--no-http2", help="Use HTTP/2 where the server supports it (needs the http2 extra)"),
     use_sitemap: bool = typer.Option(False, "--use-sitemap", help="Use sitemap.xml if available to discover URLs"),
+    since: Optional[str] = typer.Option(None, "--since", help="Only take sitemap entries with <lastmod> on or after this date (YYYY-MM-DD)"),
+    order: str = typer.Option("priority", "--order", help="Crawl order: priority (best score first) or bfs (discovery order)"),
+    include: Optional[List[str]] = typer.Option(None, "--include", help="Only queue URLs whose path matches this glob (repeatable)"),
+    exclude: Optional[List[str]] = typer.Option(None, "--exclude", help="Never queue URLs whose path matches this glob (repeatable)"),
+    boost: Optional[List[str]] = typer.Option(None, "--boost", help="Add WEIGHT to the score of URLs matching GLOB, as GLOB=WEIGHT (repeatable, negative to demote)"),
+    depth_weight: float = typer.Option(1.0, "--depth-weight", help="Score lost per level of depth"),
+    inlink_weight: float = typer.Option(0.5, "--inlink-weight", help="Score gained per doubling of the pages linking to a URL"),
+    sitemap_weight: float = typer.Option(1.0, "--sitemap-weight", help="Weight of the sitemap <priority> (0.5 for URLs without one)"),
+    workers: int = typer.Option(1, "-w", "--workers", help="Number of parallel browser workers"),
+    max_per_host: int = typer.Option(0, "--max-per-host", help="Maximum concurrent page requests per host (0 = as many as workers)"),
+    rate: float = typer.Option(0.0, "--rate", help="Maximum page requests per second per host (0 = unlimited)"),
+    ignore_robots: bool = typer.Option(False, "--ignore-robots", help="Do not apply robots.txt rules and Crawl-delay"),
+    convert_workers: int = typer.Option(0, "--convert-workers", help="Processes converting pages to markdown off the fetch threads (0 = convert inline)"),
+    renderer: str = typer.Option("browser", "--renderer", help="Page fetching: auto (HTTP first, browser fallback), http or browser"),
+    wait: str = typer.Option("mutation", "--wait", help="Browser readiness strategy: fixed, load, network-idle or mutation"),
+    wait_timeout: float = typer.Option(10.0, "--wait-timeout", help="Maximum seconds to wait for a page to become ready"),
+    wait_quiet: float = typer.Option(0.5, "--wait-quiet", help="Quiet window in seconds (sleep duration for 'fixed')"),
+    recycle_pages: int = typer.Option(200, "--recycle-pages", help="Restart each browser after this many pages (0 = never)"),
+    recycle_rss: int = typer.Option(2048, "--recycle-rss", help="Restart a browser once its processes use more than this many MB (0 = never)"),
+    block_resources: bool = typer.Option(True, "--block-resources/--no-block-resources", help="Block images, fonts, media and analytics in the browser"),
+    canonicalize: bool = typer.Option(True, "--canonicalize/--no-canonicalize", help="Drop tracking/session query parameters, sort queries and follow rel=canonical"),
+    drop_param: Optional[List[str]] = typer.Option(None, "--drop-param", help="Extra query parameter to drop when canonicalizing (glob, repeatable)"),
+    dedupe: bool = typer.Option(True, "--dedupe/--no-dedupe", help="Record pages with the same or nearly the same text as aliases instead of converting them"),
+    simhash_distance: int = typer.Option(0, "--simhash-distance", help="Also alias near duplicates differing in up to this many SimHash bits (0 = exact duplicates only, max 3)"),
+    state: bool = typer.Option(False, "--state/--no-state", help="Keep crawl state on disk in the output directory so the crawl can be resumed (implied by --resume)"),
+    resume: bool = typer.Option(False, "--resume", help="Resume an interrupted crawl from the saved state"),
+    incremental: bool = typer.Option(False, "--incremental", help="Only re-convert pages that changed since the last crawl into this output directory"),
+    shared_state: Optional[str] = typer.Option(None, "--shared-state", help="SQLite file holding the frontier shared by the shards of a sharded crawl"),
+    shard: int = typer.Option(0, "--shard", help="Shard crawled by this process, from 0 to --shards - 1"),
+    shards: int = typer.Option(1, "--shards", help="Number of processes or hosts sharing the crawl through --shared-state"),
+    max_page_mb: float = typer.Option(50.0, "--max-page-mb", help="Pages with more HTML than this are truncated or skipped (0 = no limit)"),
+    oversize: str = typer.Option("truncate", "--oversize", help="What to do with pages over --max-page-mb: truncate or skip"),
+    spill_mb: float = typer.Option(8.0, "--spill-mb", help="Hand pages with more HTML than this to the converter through a temporary file (0 = never)"),
+    capture: Optional[str] = typer.Option(None, "--capture", help="Record rendered pages, response headers and assets in this .warc.gz capture store for reconvert"),
+    trace: Optional[str] = typer.Option(None, "--trace", help="Append a JSON line per page (stage timings, HTML size, outcome) to this file"),
+    metrics: Optional[str] = typer.Option(None, "--metrics", help="Write crawl metrics in Prometheus text format to this file at the end"),
 ):
     """Crawl a website and convert pages to markdown"""
+    # Imported here so that --help and version do not load the crawler's dependencies
+    from mdcrawler.crawler.web_crawler import crawl_website
+    
+    try:
+        since_date = date.fromisoformat(since) if since else None
+    except ValueError:
+        raise typer.BadParameter(f"expected YYYY-MM-DD, got {since!r}", param_hint="--since")
+    try:
+        boosts = [parse_boost(spec) for spec in boost or []]
+    except ValueError as e:
+        raise typer.BadParameter(str(e), param_hint="--boost")
+    if shards > 1 and not shared_state:
+        raise typer.BadParameter("a sharded crawl needs a shared state file", param_hint="--shared-state")
+    if not 0 <= shard < max(1, shards):
+        raise typer.BadParameter(f"expected 0 to {max(1, shards) - 1}, got {shard}", param_hint="--shard")
+    
     print(f"Starting crawl of {url}")
     print(f"Output directory: {output}")
     print(f"Maximum pages: {max_pages}")
     print(f"Crawl depth: {depth}")
     print(f"Download assets: {download_assets}")
     print(f"Use sitemap: {use_sitemap}")
+    if since_date:
+        print(f"Sitemap entries since: {since_date}")
+    print(f"Order: {order}" + (f" (depth {depth_weight}, inlinks {inlink_weight}, sitemap {sitemap_weight})" if order == "priority" else ""))
+    if include or exclude:
+        print(f"URL filters: include {', '.join(include or []) or 'all'}, exclude {', '.join(exclude or []) or 'none'}")
+    if boosts:
+        print(f"Boosts: {', '.join(f'{pattern} {weight:+g}' for pattern, weight in boosts)}")
+    print(f"Workers: {workers}")
+    print(f"Convert workers: {convert_workers}")
+    print(f"Per host: {max_per_host or 'unlimited'} concurrent, {rate or 'unlimited'} requests/s, robots.txt {'ignored' if ignore_robots else 'respected'}")
+    print(f"Renderer: {renderer}")
+    print(f"Readiness: {wait} (quiet {wait_quiet}s, cap {wait_timeout}s)")
+    print(f"Browser recycling: every {recycle_pages or 'unlimited'} pages or {recycle_rss or 'unlimited'}MB, resource blocking {'on' if block_resources else 'off'}")
+    print(f"Canonicalize URLs: {canonicalize}" + (f" (also dropping {', '.join(drop_param)})" if canonicalize and drop_param else ""))
+    print(f"Dedupe: {(f'SimHash distance {simhash_distance}' if simhash_distance else 'exact') if dedupe else 'off'}")
+    print(f"State: {'on disk' if state or resume else 'in memory'}, resume: {resume}")
+    print(f"Incremental: {incremental}")
+    if shared_state:
+        print(f"Shard: {shard} of {shards} (shared state {shared_state})")
+    print(f"Page size limit: {f'{max_page_mb:g}MB ({oversize})' if max_page_mb > 0 else 'none'}, spill above {f'{spill_mb:g}MB' if spill_mb > 0 else 'never'}")
+    if capture:
+        print(f"Capture: {capture}")
+    if trace:
+        print(f"Trace: {trace}")
     print()
     
-    crawl_website(url, output_dir=output, max_pages=max_pages, depth=depth, download_assets=download_assets, use_sitemap=use_sitemap)
+    crawl_website(url, output_dir=output, max_pages=max_pages, depth=depth, download_assets=download_assets, use_sitemap=use_sitemap, workers=workers, renderer=renderer,
+                  wait_strategy=wait, wait_timeout=wait_timeout, wait_quiet=wait_quiet, persist_state=state, resume=resume, incremental=incremental, asset_workers=asset_workers,
+                  convert_workers=convert_workers, since=since_date,
+                  max_per_host=max_per_host, rate=rate, respect_robots=not ignore_robots,
+                  trace_path=trace, metrics_path=metrics, recycle_pages=recycle_pages, recycle_rss_mb=recycle_rss,
+                  block_resources=block_resources, http2=http2, canonicalize=canonicalize, drop_params=drop_param,
+                  dedupe=dedupe, simhash_distance=simhash_distance, order=order, include=include, exclude=exclude,
+                  boosts=boosts, depth_weight=depth_weight, inlink_weight=inlink_weight, sitemap_weight=sitemap_weight,
+                  capture_path=capture, max_page_mb=max_page_mb, oversize=oversize, spill_mb=spill_mb,
+                  shared_state=shared_state, shard=shard, shards=shards)
+
+
+@app.command()
+def crawl_batch(
+    urls: Optional[List[str]] = typer.Argument(None, help="Seed URLs, one site each"),
+    sites_file: Optional[Path] = typer.Option(None, "-f", "--file", help="File with one site per line: URL [option=value ...]"),
+    output: str = typer.Option("mirrors", "-o", "--output", help="Output directory, each site gets a subdirectory"),
+    max_pages: int = typer.Option(10, "-m", "--max-pages", help="Maximum number of pages per site"),
+    depth: int = typer.Option(1, "-d", "--depth", help="Maximum depth to crawl (0 = unlimited)"),
+    download_assets: bool = typer.Option(False, "--download-assets", help="Download images and assets"),
+    use_sitemap: bool = typer.Option(False, "--use-sitemap", help="Use sitemap.xml if available to discover URLs"),
+    workers: int = typer.Option(4, "-w", "--workers", help="Browser workers shared by all sites"),
+    parallel_sites: int = typer.Option(4, "--parallel-sites", help="Sites crawled at the same time"),
+    site_workers: int = typer.Option(2, "--site-workers", help="Pages in flight per site"),
+    max_per_host: int = typer.Option(0, "--max-per-host", help="Maximum concurrent page requests per host (0 = unlimited)"),
+    rate: float = typer.Option(0.0, "--rate", help="Maximum page requests per second per host (0 = unlimited)"),
+    ignore_robots: bool = typer.Option(False, "--ignore-robots", help="Do not apply robots.txt rules and Crawl-delay"),
+    renderer: str = typer.Option("browser", "--renderer", help="Page fetching: auto (HTTP first, browser fallback), http or browser"),
+    wait: str = typer.Option("mutation", "--wait", help="Browser readiness strategy: fixed, load, network-idle or mutation"),
+    incremental: bool = typer.Option(False, "--incremental", help="Only re-convert pages that changed since the last crawl"),
+    http2: bool = typer.Option(True, "--http2/--no-http2", help="Use HTTP/2 where the server supports it (needs the http2 extra)"),
+):
+    """Crawl many sites, sharing warm browsers and the converter between them"""
+    from mdcrawler.crawler.batch import crawl_batch as run_batch, parse_site_line, read_sites
+    
+    try:
+        sites = [parse_site_line(url) for url in urls or []]
+        if sites_file:
+            sites += read_sites(sites_file)
+    except (OSError, ValueError) as e:
+        raise typer.BadParameter(str(e))
+    sites = [site for site in sites if site is not None]
+    if not sites:
+        raise typer.BadParameter("give seed URLs or a --file of sites")
+    
+    print(f"Crawling {len(sites)} sites into {output}")
+    print(f"Workers: {workers} shared, {parallel_sites} sites at a time, {site_workers} pages in flight per site")
+    print(f"Per site: {max_pages} pages, depth {depth}, renderer {renderer}")
+    print()
+    
+    run_batch(sites, output_dir=output, workers=workers, parallel_sites=parallel_sites, site_workers=site_workers,
+              max_pages=max_pages, depth=depth, download_assets=download_assets, use_sitemap=use_sitemap,
+              max_per_host=max_per_host, rate=rate, respect_robots=not ignore_robots, renderer=renderer,
+              wait_strategy=wait, incremental=incremental, http2=http2)
+
+
+@app.command()
+def reconvert(
+    capture: Path = typer.Argument(..., help="Capture store written by crawl --capture"),
+    output: str = typer.Option("mirror", "-o", "--output", help="Output directory"),
+    workers: int = typer.Option(os.cpu_count() or 1, "-w", "--workers", help="Processes converting pages to markdown"),
+    assets: Optional[bool] = typer.Option(None, "--assets/--no-assets", help="Restore captured assets and link them (default: as the capturing crawl did)"),
+    dedupe: bool = typer.Option(True, "--dedupe/--no-dedupe", help="Record pages with the same or nearly the same text as aliases instead of converting them"),
+    simhash_distance: int = typer.Option(0, "--simhash-distance", help="Also alias near duplicates differing in up to this many SimHash bits (0 = exact duplicates only, max 3)"),
+    max_page_mb: float = typer.Option(50.0, "--max-page-mb", help="Pages with more HTML than this are truncated or skipped (0 = no limit)"),
+    oversize: str = typer.Option("truncate", "--oversize", help="What to do with pages over --max-page-mb: truncate or skip"),
+    spill_mb: float = typer.Option(8.0, "--spill-mb", help="Hand pages with more HTML than this to the converter through a temporary file (0 = never)"),
+    trace: Optional[str] = typer.Option(None, "--trace", help="Append a JSON line per page (stage timings, HTML size, outcome) to this file"),
+    metrics: Optional[str] = typer.Option(None, "--metrics", help="Write metrics in Prometheus text format to this file at the end"),
+):
+    """Rebuild a markdown mirror from a capture store, without network or browser"""
+    from mdcrawler.crawler.web_crawler import reconvert_capture
+    
+    if not capture.is_file():
+        raise typer.BadParameter(f"{capture} does not exist", param_hint="CAPTURE")
+    
+    print(f"Reconverting {capture}")
+    print(f"Output directory: {output}")
+    print(f"Convert workers: {workers}")
+    print(f"Dedupe: {(f'SimHash distance {simhash_distance}' if simhash_distance else 'exact') if dedupe else 'off'}")
+    print()
+    
+    reconvert_capture(str(capture), output_dir=output, workers=workers, download_assets=assets, dedupe=dedupe,
+                      simhash_distance=simhash_distance, trace_path=trace, metrics_path=metrics,
+                      max_page_mb=max_page_mb, oversize=oversize, spill_mb=spill_mb)
+
+
+@app.command()
+def merge(
+    sources: List[Path] = typer.Argument(..., help="Output directories of the shards of a sharded crawl"),
+    output: str = typer.Option("mirror", "-o", "--output", help="Output directory of the merged mirror"),
+):
+    """Merge the output directories of a sharded crawl into one mirror"""
+    from mdcrawler.crawler.sharding import merge_mirrors
+    
+    for source in sources:
+        if not source.is_dir():
+            raise typer.BadParameter(f"{source} is not a directory", param_hint="SOURCES")
+    
+    print(f"Merging {len(sources)} shard directories into {output}")
+    stats = merge_mirrors(sources, Path(output))
+    print(f"Copied {stats['files']} files ({stats['unchanged']} unchanged), "
+          f"{stats['aliases']} aliases, {stats['conflicts']} conflicts")
 
 
 @app.command()
 def single_page(
     url: str = typer.Argument(..., help="URL of the page to convert"),
     output: str = typer.Option("page.md", "-o", "--output", help="Output markdown file"),
+    renderer: str = typer.Option("browser", "--renderer", help="Page fetching: auto (HTTP first, browser fallback), http or browser"),
+    wait: str = typer.Option("mutation", "--wait", help="Browser readiness strategy: fixed, load, network-idle or mutation"),
 ):
     """Convert a single page to markdown"""
-    crawler = WebCrawler(output_dir="tmp")
+    from mdcrawler.crawler.web_crawler import WebCrawler
+    
+    # One page has nothing to be a duplicate of: always convert it, whatever its rel=canonical says
+    crawler = WebCrawler(output_dir="tmp", renderer=renderer, wait_strategy=wait, canonicalize=False, dedupe=False)
     try:
         markdown = crawler.crawl_page(url)
         if markdown:
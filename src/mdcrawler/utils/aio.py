@@ -0,0 +1,55 @@
+"""Background asyncio event loop that synchronous code can hand coroutines to"""
+
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Awaitable, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class EventLoopThread:
+    """Run one asyncio event loop on a daemon thread, started on first use
+
+    Worker threads (browser sessions, converters) stay synchronous and either
+    wait for a coroutine with run() or get a concurrent Future back from
+    submit(), while the I/O itself is multiplexed on the single loop.
+    """
+
+    def __init__(self, name: str = "mdcrawler-io"):
+        self.name = name
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever, name=self.name, daemon=True)
+                self._thread.start()
+            return self._loop
+
+    @property
+    def started(self) -> bool:
+        return self._loop is not None
+
+    def submit(self, coro: Awaitable[T]) -> Future:
+        """Schedule a coroutine on the loop and return a concurrent.futures.Future for its result"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro: Awaitable[T]) -> T:
+        """Run a coroutine on the loop and block the calling thread until it finishes"""
+        return self.submit(coro).result()
+
+    def close(self):
+        """Stop the loop once pending callbacks have run and join its thread"""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None:
+            return
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
@@ -0,0 +1,73 @@
+"""Micro-batching queue: callers submit single items, a worker processes them in batches"""
+
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Callable, Generic, List, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+_STOP = object()
+
+
+class BatchQueue(Generic[T, R]):
+    """Collect items submitted from many threads and hand them to process_batch together
+
+    A batch is flushed when it reaches max_batch items or when max_wait seconds
+    pass without the batch filling up. process_batch must return one result per
+    item, in order.
+    """
+
+    def __init__(self, process_batch: Callable[[List[T]], List[R]], max_batch: int = 8, max_wait: float = 0.05):
+        self.process_batch = process_batch
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max_wait
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="mdcrawler-batch", daemon=True)
+        self._thread.start()
+
+    def submit(self, item: T) -> Future:
+        """Queue an item and return a future for its result"""
+        future: Future = Future()
+        self._queue.put((item, future))
+        return future
+
+    def _run(self):
+        while True:
+            entry = self._queue.get()
+            if entry is _STOP:
+                return
+            batch = [entry]
+
+            # Gather whatever else arrives shortly, up to a full batch
+            stop = False
+            while len(batch) < self.max_batch:
+                try:
+                    entry = self._queue.get(timeout=self.max_wait)
+                except queue.Empty:
+                    break
+                if entry is _STOP:
+                    stop = True
+                    break
+                batch.append(entry)
+
+            self._flush(batch)
+            if stop:
+                return
+
+    def _flush(self, batch):
+        items = [item for item, _ in batch]
+        try:
+            results = self.process_batch(items)
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
+
+    def close(self):
+        """Process anything still queued and stop the worker thread"""
+        self._queue.put(_STOP)
+        self._thread.join()
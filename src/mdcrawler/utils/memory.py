@@ -0,0 +1,115 @@
+"""Memory helpers for large pages: UTF-8 sizes and encodings without whole-document copies, and per-page peak RSS"""
+
+import os
+import threading
+import time
+from typing import Dict, Iterator, Optional
+
+try:
+    import psutil
+except ImportError:  # falls back to /proc, or no RSS reporting
+    psutil = None
+
+# Characters encoded at a time, so a large page never has a full UTF-8 copy in memory
+ENCODE_CHUNK = 1024 * 1024
+
+MB = 1024 * 1024
+
+
+def iter_utf8(text: str, chunk: int = ENCODE_CHUNK) -> Iterator[bytes]:
+    """UTF-8 encoding of text, chunk characters at a time"""
+    for start in range(0, len(text), chunk):
+        yield text[start:start + chunk].encode('utf-8')
+
+
+def utf8_size(text: str) -> int:
+    """Length of text in UTF-8 bytes, without encoding it in one piece"""
+    if text.isascii():
+        return len(text)
+    return sum(len(data) for data in iter_utf8(text))
+
+
+def utf8_prefix_length(text: str, max_bytes: int) -> int:
+    """Number of leading characters of text whose UTF-8 encoding fits in max_bytes, encoded a chunk at a time"""
+    if text.isascii():
+        return min(len(text), max_bytes)
+    for start in range(0, len(text), ENCODE_CHUNK):
+        data = text[start:start + ENCODE_CHUNK].encode('utf-8')
+        if len(data) > max_bytes:
+            # Characters of this chunk that fit whole; a multi-byte one cut in two is dropped
+            return start + len(data[:max_bytes].decode('utf-8', errors='ignore'))
+        max_bytes -= len(data)
+    return len(text)
+
+
+def current_rss() -> Optional[int]:
+    """Resident set size of this process in bytes, None where it cannot be read"""
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class PeakRssSampler:
+    """Track the peak RSS of the process while each page is being handled
+
+    A background thread samples RSS every interval seconds while at least one
+    page is tracked. RSS belongs to the whole process, so with several
+    workers a page's peak includes the pages handled alongside it, and
+    excludes child processes: conversion pool workers run a sampler of their
+    own and report its peak with each page.
+    """
+
+    def __init__(self, interval: float = 0.02):
+        self.interval = interval
+        self.enabled = current_rss() is not None
+        self._lock = threading.Lock()
+        self._peaks: Dict[str, int] = {}
+        self._wake = threading.Event()
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+
+    def _sample(self):
+        rss = current_rss() or 0
+        with self._lock:
+            for url, peak in self._peaks.items():
+                if rss > peak:
+                    self._peaks[url] = rss
+
+    def _run(self):
+        while not self._closed:
+            with self._lock:
+                idle = not self._peaks
+            if idle:
+                self._wake.wait()
+                self._wake.clear()
+                continue
+            self._sample()
+            time.sleep(self.interval)
+
+    def start(self, url: str):
+        """Start tracking url"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._peaks.setdefault(url, 0)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="mdcrawler-rss", daemon=True)
+                self._thread.start()
+        self._sample()
+        self._wake.set()
+
+    def stop(self, url: str) -> Optional[int]:
+        """Stop tracking url and return its peak RSS in bytes"""
+        if not self.enabled:
+            return None
+        self._sample()
+        with self._lock:
+            return self._peaks.pop(url, None)
+
+    def close(self):
+        self._closed = True
+        self._wake.set()
@@ -0,0 +1,217 @@
+"""Crawl metrics: per-page stage timings, counters, a JSON-lines trace and percentile summaries"""
+
+import json
+import math
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+# Per-page values in bytes that are summarized like stage timings: HTML size, and the
+# peak RSS of the crawler and of the conversion worker while handling the page
+SIZE_FIELDS = ('html_bytes', 'peak_rss_bytes', 'convert_rss_bytes')
+
+
+class Histogram:
+    """Distribution of non-negative values in logarithmic buckets
+
+    Memory depends on the range of the values, not on how many there are:
+    each bucket spans a factor of GROWTH, so quantiles are within 1% of the
+    exact nearest-rank value. Count, sum, min and max are exact.
+    """
+
+    GROWTH = 1.02
+
+    def __init__(self):
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = 0.0
+        self._zeros = 0
+        self._buckets: Dict[int, int] = {}
+
+    def add(self, value: float):
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        if value <= 0:
+            self._zeros += 1
+            return
+        index = math.floor(math.log(value, self.GROWTH))
+        self._buckets[index] = self._buckets.get(index, 0) + 1
+
+    def quantile(self, q: float) -> float:
+        """Nearest-rank quantile, the middle of the bucket it falls in"""
+        if not self.count:
+            return 0.0
+        rank = min(self.count, max(1, math.ceil(q * self.count)))
+        seen = self._zeros
+        if rank <= seen:
+            return 0.0
+        for index in sorted(self._buckets):
+            seen += self._buckets[index]
+            if seen >= rank:
+                return min(self.max, max(self.min, self.GROWTH ** (index + 0.5)))
+        return self.max
+
+    def copy(self) -> "Histogram":
+        other = Histogram()
+        other.count, other.sum, other.min, other.max, other._zeros = self.count, self.sum, self.min, self.max, self._zeros
+        other._buckets = dict(self._buckets)
+        return other
+
+
+class Metrics:
+    """Collect stage timings per page and crawl-wide counters
+
+    Timings are aggregated per stage into histograms for the end-of-run
+    percentiles, and attached to the page they belong to only until the page
+    is finished: its record (URL, outcome, HTML size, stage timings) is then
+    appended to the JSON-lines trace if one was requested and dropped, so
+    memory does not grow with the number of pages. Safe to use from several
+    threads.
+    """
+
+    def __init__(self, trace_path: Optional[Path] = None):
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, Histogram] = {}
+        self._pages: Dict[str, dict] = {}
+        self.counters: Dict[str, int] = {}
+        self._trace = open(trace_path, 'a', encoding='utf-8') if trace_path else None
+
+    def _page(self, url: str) -> dict:
+        page = self._pages.get(url)
+        if page is None:
+            page = self._pages[url] = {'timings': {}}
+        return page
+
+    def observe(self, url: Optional[str], stage: str, seconds: float):
+        """Record the duration of one stage, attributed to url when given"""
+        with self._lock:
+            self._add(stage, seconds)
+            if url is not None:
+                timings = self._page(url)['timings']
+                timings[stage] = timings.get(stage, 0.0) + seconds
+
+    @contextmanager
+    def timed(self, url: Optional[str], stage: str) -> Iterator[None]:
+        """Time the enclosed block as stage of url"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(url, stage, time.perf_counter() - start)
+
+    def set(self, url: str, field: str, value):
+        """Attach a value (HTML size, outcome, ...) to url's trace record"""
+        with self._lock:
+            self._page(url)[field] = value
+            if field in SIZE_FIELDS:
+                self._add(field, value)
+
+    def _add(self, name: str, value: float):
+        """Add value to name's histogram (lock held)"""
+        histogram = self._histograms.get(name)
+        if histogram is None:
+            histogram = self._histograms[name] = Histogram()
+        histogram.add(value)
+
+    def _snapshot(self):
+        with self._lock:
+            return {name: h.copy() for name, h in self._histograms.items()}, dict(self.counters)
+
+    def count(self, name: str, n: int = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def take(self, url: str) -> dict:
+        """Remove and return url's record, e.g. to ship it from a worker process"""
+        with self._lock:
+            return self._pages.pop(url, {'timings': {}})
+
+    def merge(self, url: str, record: dict):
+        """Add a record taken from another Metrics instance to url"""
+        for stage, seconds in record.get('timings', {}).items():
+            self.observe(url, stage, seconds)
+        for field, value in record.items():
+            if field != 'timings':
+                self.set(url, field, value)
+
+    def page_done(self, url: str, outcome: str):
+        """Finish url's record and append it to the trace; an outcome set earlier wins
+
+        Does nothing if url has no open record, so a page reported finished
+        from two places is only traced once.
+        """
+        with self._lock:
+            record = self._pages.pop(url, None)
+        if record is None:
+            return
+        record.setdefault('outcome', outcome)
+        record['timings'] = {stage: round(seconds, 6) for stage, seconds in record['timings'].items()}
+        self.count(f"pages_{record['outcome']}")
+        if self._trace is None:
+            return
+        line = json.dumps({'ts': round(time.time(), 3), 'url': url, **record})
+        with self._lock:
+            self._trace.write(line + '\n')
+            self._trace.flush()
+
+    def summary(self) -> List[str]:
+        """Lines of the end-of-run report: p50/p95/p99 per stage, then the counters"""
+        histograms, counters = self._snapshot()
+        lines = []
+        if histograms:
+            lines.append(f"{'stage':<17} {'count':>6} {'p50':>9} {'p95':>9} {'p99':>9} {'total':>9}")
+        for stage, h in sorted(histograms.items()):
+            p50, p95, p99 = (h.quantile(q) for q in QUANTILES)
+            if stage == 'html_bytes':
+                lines.append(f"{stage:<17} {h.count:>6} {p50 / 1024:>7.0f}KB {p95 / 1024:>7.0f}KB {p99 / 1024:>7.0f}KB {h.sum / 1048576:>7.1f}MB")
+            elif stage in SIZE_FIELDS:
+                # Memory peaks do not add up: the last column is the largest
+                lines.append(f"{stage:<17} {h.count:>6} {p50 / 1048576:>7.0f}MB {p95 / 1048576:>7.0f}MB {p99 / 1048576:>7.0f}MB {h.max / 1048576:>4.0f}MB max")
+            else:
+                lines.append(f"{stage:<17} {h.count:>6} {p50:>8.3f}s {p95:>8.3f}s {p99:>8.3f}s {h.sum:>8.1f}s")
+        if counters:
+            lines.append(", ".join(f"{name}: {value}" for name, value in sorted(counters.items())))
+        return lines
+
+    def prometheus(self) -> str:
+        """Metrics in the Prometheus text exposition format"""
+        histograms, counters = self._snapshot()
+        out = []
+        groups = [('mdcrawler_stage_seconds', [s for s in histograms if s not in SIZE_FIELDS])]
+        groups += [(f"mdcrawler_{field}", [field]) for field in SIZE_FIELDS if field in histograms]
+        for metric, stages in groups:
+            if not stages:
+                continue
+            out.append(f"# TYPE {metric} summary")
+            for stage in sorted(stages):
+                h = histograms[stage]
+                label = f'stage="{stage}"' if metric == 'mdcrawler_stage_seconds' else ''
+                labels = f"{{{label}}}" if label else ''
+                prefix = f"{label}," if label else ''
+                for q in QUANTILES:
+                    out.append(f'{metric}{{{prefix}quantile="{q}"}} {h.quantile(q)}')
+                out.append(f"{metric}_sum{labels} {h.sum}")
+                out.append(f"{metric}_count{labels} {h.count}")
+        for name, value in sorted(counters.items()):
+            out.append(f"# TYPE mdcrawler_{name}_total counter")
+            out.append(f"mdcrawler_{name}_total {value}")
+        return "\n".join(out) + "\n"
+
+    def write_prometheus(self, path: Path):
+        """Write the Prometheus text file atomically, for node_exporter's textfile collector"""
+        path = Path(path)
+        tmp_path = path.with_name(path.name + '.tmp')
+        tmp_path.write_text(self.prometheus(), encoding='utf-8')
+        tmp_path.replace(path)
+
+    def close(self):
+        if self._trace is not None:
+            self._trace.close()
+            self._trace = None
@@ -0,0 +1,51 @@
+import threading
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from mdcrawler.crawler.fetcher import AsyncFetcher
+
+
+class RecordingHandler(SimpleHTTPRequestHandler):
+    """Serve files from a directory, recording the paths requested"""
+
+    def __init__(self, *args, requests, **kwargs):
+        self.requests = requests
+        super().__init__(*args, **kwargs)
+
+    def send_head(self):
+        self.requests.append(self.path)
+        return super().send_head()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class Site:
+    def __init__(self, root, url, requests):
+        self.root = root
+        self.url = url
+        self.requests = requests
+
+
+@pytest.fixture
+def site(tmp_path):
+    """A local HTTP server for the files under site.root"""
+    root = tmp_path / "site"
+    root.mkdir()
+    requests = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0),
+                                 partial(RecordingHandler, directory=str(root), requests=requests))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield Site(root, f"http://127.0.0.1:{server.server_address[1]}", requests)
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def fetcher():
+    fetcher = AsyncFetcher(http2=False)
+    yield fetcher
+    fetcher.close()
@@ -0,0 +1,52 @@
+from concurrent.futures import Future
+
+from mdcrawler.crawler.assets import AssetDownloader
+
+
+def downloader(fetcher, tmp_path):
+    return AssetDownloader(fetcher, tmp_path / "out" / "assets", tmp_path / "out")
+
+
+def test_same_url_is_downloaded_once(site, fetcher, tmp_path):
+    (site.root / "logo.png").write_bytes(b"png bytes")
+    assets = downloader(fetcher, tmp_path)
+    first = assets.download(f"{site.url}/logo.png")
+    assert assets.download_all([f"{site.url}/logo.png"] * 3) == {f"{site.url}/logo.png": first}
+    assert site.requests == ["/logo.png"]
+    assert (tmp_path / "out" / first).read_bytes() == b"png bytes"
+    assets.close()
+
+
+def test_identical_content_is_stored_once(site, fetcher, tmp_path):
+    (site.root / "a.png").write_bytes(b"same image")
+    (site.root / "b.png").write_bytes(b"same image")
+    assets = downloader(fetcher, tmp_path)
+    mapping = assets.download_all([f"{site.url}/a.png", f"{site.url}/b.png"])
+    assert len(set(mapping.values())) == 1
+    assert [p.name for p in (tmp_path / "out" / "assets").iterdir()] == [mapping[f"{site.url}/a.png"].split("/")[-1]]
+    assets.close()
+
+
+def test_failures_are_not_cached(site, fetcher, tmp_path):
+    assets = downloader(fetcher, tmp_path)
+    assert assets.download(f"{site.url}/late.png") is None
+    (site.root / "late.png").write_bytes(b"here now")
+    assert assets.download(f"{site.url}/late.png") is not None
+    assert site.requests == ["/late.png", "/late.png"]
+    assets.close()
+
+
+def finished(path):
+    future = Future()
+    future.set_result(path)
+    return future
+
+
+def test_remembered_paths_are_bounded(fetcher, tmp_path):
+    assets = AssetDownloader(fetcher, tmp_path / "out" / "assets", tmp_path / "out", max_paths=2)
+    assets._finished("http://a/1.png", finished("assets/1.png"))
+    assets._finished("http://a/2.png", finished("assets/2.png"))
+    assert assets.download("http://a/1.png") == "assets/1.png"
+    assets._finished("http://a/3.png", finished("assets/3.png"))
+    # The least recently used path was dropped
+    assert list(assets._paths) == ["http://a/1.png", "http://a/3.png"]
@@ -0,0 +1,18 @@
+from urllib.parse import urlparse
+
+from mdcrawler.crawler.batch import BatchCrawler, parse_site_line
+
+
+def test_site_rate_applies_to_the_host_as_requested(site, tmp_path):
+    (site.root / "index.html").write_text("<html><body><h1>Home</h1><p>Hello.</p></body></html>")
+    netloc = f"LOCALHOST:{urlparse(site.url).port}"
+    spec = parse_site_line(f"http://{netloc}/index.html canonicalize=false rate=20 max-pages=1")
+    batch = BatchCrawler(str(tmp_path / "mirrors"), workers=1, parallel_sites=1, site_workers=1,
+                         renderer="http", http2=False)
+    try:
+        [result] = batch.crawl([spec])
+    finally:
+        batch.close()
+    assert result.error is None and result.pages == 1
+    # Not canonicalized, so requests went to the host spelled as given, and so did its rate
+    assert batch.host.scheduler._hosts[netloc].min_interval == 1 / 20
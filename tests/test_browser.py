@@ -0,0 +1,76 @@
+import threading
+import time
+
+from mdcrawler.crawler.browser import BrowserPool
+
+
+class FakeDriver:
+    def __init__(self, started, boot=0.0):
+        time.sleep(boot)
+        self.quit_called = False
+        started.append(self)
+
+    def execute_cdp_cmd(self, command, params):
+        pass
+
+    def quit(self):
+        self.quit_called = True
+
+
+def test_no_standby_unless_asked():
+    started = []
+    pool = BrowserPool(lambda: FakeDriver(started), max_pages=5)
+    pool.driver()
+    pool.page_loaded()
+    pool.close()
+    assert len(started) == 1 and started[0].quit_called
+
+
+def test_standby_replaces_a_recycled_session():
+    started = []
+    pool = BrowserPool(lambda: FakeDriver(started), max_pages=2, standby=True)
+    first = pool.driver()
+    pool.page_loaded()  # warms the standby
+    deadline = time.monotonic() + 5
+    while len(started) < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    pool.page_loaded()  # recycles onto the standby
+    assert first.quit_called and pool.driver() is started[1]
+    pool.close()
+    assert all(driver.quit_called for driver in started)
+
+
+def test_close_does_not_wait_for_a_starting_standby():
+    started, booting = [], threading.Event()
+
+    def create():
+        if started:
+            booting.set()
+            return FakeDriver(started, boot=0.5)
+        return FakeDriver(started)
+
+    pool = BrowserPool(create, max_pages=10, standby=True)
+    pool.driver()
+    pool.page_loaded()
+    booting.wait(5)
+    start = time.monotonic()
+    pool.close()
+    assert time.monotonic() - start < 0.25
+    deadline = time.monotonic() + 5
+    while not (len(started) == 2 and started[1].quit_called) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert started[1].quit_called
+
+
+def test_missing_psutil_is_reported_once(monkeypatch, capsys):
+    from mdcrawler.crawler import browser
+
+    monkeypatch.setattr(browser, "psutil", None)
+    started = []
+    pool = BrowserPool(lambda: FakeDriver(started), max_pages=1, max_rss_mb=512)
+    for _ in range(3):
+        pool.driver()
+        pool.page_loaded()
+    pool.close()
+    assert len(started) == 4  # recycled after every page
+    assert capsys.readouterr().out.count("psutil is not installed") == 1
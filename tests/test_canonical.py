@@ -0,0 +1,55 @@
+from mdcrawler.crawler.canonical import UrlCanonicalizer
+
+canonicalize = UrlCanonicalizer().canonicalize
+
+
+def test_host_scheme_and_default_port_are_normalized():
+    assert canonicalize("HTTP://Example.COM:80/Docs/A.html#top") == "http://example.com/Docs/A.html"
+    assert canonicalize("https://example.com:8443/") == "https://example.com:8443/"
+
+
+def test_userinfo_keeps_its_case():
+    assert canonicalize("http://User:Pw@A.com/p") == "http://User:Pw@a.com/p"
+
+
+def test_valueless_params_are_kept_as_written():
+    assert canonicalize("http://a.com/p?print") == "http://a.com/p?print"
+    assert canonicalize("http://a.com/p?b=2&print&utm_source=x") == "http://a.com/p?b=2&print"
+
+
+def test_kept_params_are_not_reencoded():
+    assert canonicalize("http://a.com/s?q=a%20b+c&x=%2F") == "http://a.com/s?q=a%20b+c&x=%2F"
+
+
+def test_tracking_params_are_dropped_and_query_sorted():
+    assert canonicalize("http://a.com/p?z=1&utm_medium=mail&a=2&gclid=abc") == "http://a.com/p?a=2&z=1"
+    assert canonicalize("http://a.com/p?utm_source=x") == "http://a.com/p"
+
+
+def test_generic_session_names_are_kept_unless_configured():
+    assert canonicalize("http://a.com/p?sid=42") == "http://a.com/p?sid=42"
+    assert canonicalize("http://a.com/p?sessionid=7") == "http://a.com/p?sessionid=7"
+    assert UrlCanonicalizer(["sid"]).canonicalize("http://a.com/p?sid=42") == "http://a.com/p"
+
+
+def test_path_session_ids_are_dropped():
+    assert canonicalize("http://a.com/shop;jsessionid=ABC123?item=1") == "http://a.com/shop?item=1"
+
+
+def test_key_ignores_trailing_slash_and_index_document():
+    canonicalizer = UrlCanonicalizer()
+    keys = {canonicalizer.key(canonicalize(url)) for url in
+            ("http://a.com/docs", "http://a.com/docs/", "http://a.com/docs/index.html")}
+    assert len(keys) == 1
+
+
+def test_rel_canonical_must_stay_on_the_crawled_host(tmp_path):
+    from mdcrawler.crawler.web_crawler import WebCrawler
+
+    page = '<head><link rel="canonical" href="{}"></head><body>text</body>'
+    crawler = WebCrawler(str(tmp_path), renderer="http", respect_robots=False)
+    try:
+        assert crawler._canonical_target(page.format("http://other.test/page"), "http://a.test/page?ref=1") is None
+        assert crawler._canonical_target(page.format("/page"), "http://a.test/page?ref=1") == "http://a.test/page"
+    finally:
+        crawler.close()
@@ -0,0 +1,71 @@
+import gzip
+
+from mdcrawler.crawler.capture import ASSET, PAGE, CaptureWriter, read_capture, read_info
+
+PAGES = {
+    "index.html": '<html><head><title>Home</title></head><body><h1>Home</h1>'
+                  '<p>Welcome. <a href="guide.html">Read the guide</a></p><img src="logo.png" alt="Logo"></body></html>',
+    "guide.html": '<html><head><title>Guide</title></head><body><h1>Guide</h1>'
+                  '<p>Step one, then step two. <a href="index.html">Back home</a></p></body></html>',
+}
+LOGO = b"\x89PNG\r\n\x1a\n" + bytes(range(256)) * 8
+
+
+def test_records_round_trip(tmp_path):
+    asset = tmp_path / "logo.png"
+    asset.write_bytes(LOGO)
+    writer = CaptureWriter(tmp_path / "store.warc.gz")
+    writer.write_info({"domain": "example.com"})
+    writer.write_page("http://example.com/", "<p>café</p>", {"status": 200, "headers": {"etag": '"v1"'}})
+    writer.write_asset("http://example.com/logo.png", asset, "image/png")
+    writer.close()
+    assert (writer.pages, writer.assets) == (1, 1)
+
+    info, page, metadata, image = read_capture(writer.path)
+    assert info.type == "warcinfo" and read_info(writer.path)["domain"] == "example.com"
+    assert (page.kind, page.url, page.content) == (PAGE, "http://example.com/", "<p>café</p>".encode())
+    assert metadata.type == "metadata" and metadata.headers["WARC-Concurrent-To"] == page.headers["WARC-Record-ID"]
+    assert (image.kind, image.content_type, image.content) == (ASSET, "image/png", LOGO)
+
+
+def test_later_runs_append_and_a_cut_record_is_dropped(tmp_path, capsys):
+    path = tmp_path / "store.warc.gz"
+    for n in range(2):
+        writer = CaptureWriter(path)
+        writer.write_page(f"http://example.com/{n}", "<p>page</p>")
+        writer.close()
+    whole = path.read_bytes()
+    path.write_bytes(whole + gzip.compress(b"WARC/1.1\r\nContent-Length: 100\r\n\r\nshort"))
+    assert [record.url for record in read_capture(path)] == ["http://example.com/0", "http://example.com/1"]
+    assert "incomplete record" in capsys.readouterr().out
+
+
+def test_replay_rebuilds_the_mirror_offline(site, tmp_path):
+    from mdcrawler.crawler.web_crawler import WebCrawler
+
+    for name, html in PAGES.items():
+        (site.root / name).write_text(html, encoding="utf-8")
+    (site.root / "logo.png").write_bytes(LOGO)
+    store = tmp_path / "store.warc.gz"
+    crawler = WebCrawler(str(tmp_path / "crawled"), depth=2, renderer="http", download_assets=True,
+                         capture_path=str(store), http2=False)
+    try:
+        assert crawler.crawl(f"{site.url}/index.html") == 2
+    finally:
+        crawler.close()
+
+    fetched = len(site.requests)
+    replayer = WebCrawler(str(tmp_path / "replayed"), download_assets=True, renderer="http")
+    try:
+        assert replayer.replay(str(store)) == 2
+    finally:
+        replayer.close()
+    assert len(site.requests) == fetched
+
+    crawled = sorted(p.relative_to(tmp_path / "crawled") for p in (tmp_path / "crawled").rglob("*")
+                     if p.is_file() and not p.name.startswith(".mdcrawler"))
+    replayed = sorted(p.relative_to(tmp_path / "replayed") for p in (tmp_path / "replayed").rglob("*") if p.is_file())
+    assert crawled == replayed
+    assert sorted(p.suffix for p in crawled) == [".md", ".md", ".png"]
+    for relative in crawled:
+        assert (tmp_path / "crawled" / relative).read_bytes() == (tmp_path / "replayed" / relative).read_bytes()
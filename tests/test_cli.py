@@ -0,0 +1,11 @@
+from mdcrawler.main import single_page
+
+
+def test_single_page_ignores_rel_canonical(site, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (site.root / "page.html").write_text('<html><head><link rel="canonical" href="/page.html"></head>'
+                                         '<body><h1>Pricing</h1><p>Plans start at ten euros.</p></body></html>')
+    single_page(f"{site.url}/page.html?utm_source=x&ref=1", output="page.md", renderer="http", wait="mutation")
+    markdown = (tmp_path / "page.md").read_text(encoding="utf-8")
+    assert "Plans start at ten euros." in markdown
+    assert "Duplicate of" not in markdown
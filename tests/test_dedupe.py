@@ -0,0 +1,48 @@
+from mdcrawler.crawler.dedupe import STREAM_CHARS, ContentIndex, page_tokens, simhash, simhash_batches, token_batches
+
+NAV = "".join(f'<li><a href="/category/{n}.html">Category {n} products</a></li>' for n in range(150))
+
+
+def product_page(name: str, price: str) -> str:
+    return (f"<html><body><nav><ul>{NAV}</ul></nav>"
+            f"<main><h1>{name}</h1><p class=price>{price}</p></main>"
+            f"<footer>Shipping, returns and contact details</footer></body></html>")
+
+
+def test_templated_pages_stay_distinct_by_default():
+    index = ContentIndex()
+    assert index.add("http://shop/a.html", product_page("Walnut desk", "$420")) is None
+    assert index.add("http://shop/b.html", product_page("Oak bookshelf", "$180")) is None
+
+
+def test_exact_duplicates_are_aliased():
+    index = ContentIndex()
+    page = product_page("Walnut desk", "$420")
+    assert index.add("http://shop/a.html", page) is None
+    assert index.add("http://shop/a.html?ref=x", page.replace("<body>", "<body><!-- tracking -->")) == "http://shop/a.html"
+
+
+def test_near_duplicates_need_a_distance():
+    words = " ".join(f"word{n}" for n in range(400))
+    original = f"<p>{words} updated monday</p>"
+    copy = f"<p>{words} updated tuesday</p>"
+    assert ContentIndex().add("http://a/1", original) is None
+    assert ContentIndex().add("http://a/1", original) is None
+
+    index = ContentIndex(max_distance=3)
+    index.add("http://a/1", original)
+    assert index.add("http://a/2", copy) == "http://a/1"
+
+
+def test_script_and_markup_are_not_text():
+    assert page_tokens("<style>p{}</style><p>Hello <b>World</b></p><script>x=1</script>") == ["hello", "world"]
+
+
+def test_large_pages_are_tokenized_in_batches_with_the_same_hash():
+    words = [f"word{n}" for n in range(STREAM_CHARS // 6)]
+    html = "<div><p>" + " <i>x</i> ".join(words) + "</p><script>ignored()</script></div>"
+    assert len(html) > STREAM_CHARS
+    batches = list(token_batches(html, size=1000))
+    tokens = [word for batch in batches for word in batch]
+    assert tokens == [token for word in words for token in (word, "x")][:-1]
+    assert simhash_batches(batches) == simhash(tokens)
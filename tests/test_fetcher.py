@@ -0,0 +1,46 @@
+import asyncio
+import time
+
+import pytest
+
+from mdcrawler.crawler.fetcher import AsyncFetcher, _CachingBackend
+
+
+def test_environment_proxies_are_used(site, monkeypatch):
+    monkeypatch.setenv("HTTP_PROXY", site.url)
+    monkeypatch.setenv("NO_PROXY", "direct.test")
+    fetcher = AsyncFetcher(http2=False)
+    try:
+        # The fixture server stands in for the proxy and sees the absolute URL
+        assert fetcher.fetch("http://proxied.test/page.html").status_code == 404
+    finally:
+        fetcher.close()
+    assert site.requests == ["http://proxied.test/page.html"]
+
+
+class FlakyBackend:
+    """Inner backend that refuses some addresses and records every attempt"""
+
+    def __init__(self, refused):
+        self.refused = refused
+        self.attempts = []
+
+    async def connect_tcp(self, host, port, **kwargs):
+        self.attempts.append(host)
+        if host in self.refused:
+            raise OSError(f"{host} refused")
+        return host
+
+
+def test_every_resolved_address_is_tried():
+    inner = FlakyBackend(refused={"2001:db8::1"})
+    backend = _CachingBackend(inner)
+    backend._cache[("dual.test", 80)] = (["2001:db8::1", "192.0.2.1"], time.monotonic() + 60)
+    assert asyncio.run(backend.connect_tcp("dual.test", 80)) == "192.0.2.1"
+    assert inner.attempts == ["2001:db8::1", "192.0.2.1"]
+
+    # When none answers the addresses are resolved again next time
+    inner.refused.add("192.0.2.1")
+    with pytest.raises(OSError):
+        asyncio.run(backend.connect_tcp("dual.test", 80))
+    assert ("dual.test", 80) not in backend._cache
@@ -0,0 +1,66 @@
+from mdcrawler.crawler.frontier import Frontier, PriorityFrontier
+from mdcrawler.crawler.scoring import UrlScorer
+
+
+def drain(frontier):
+    return list(iter(frontier.pop, None))
+
+
+def test_fifo_order_and_urls_are_queued_once():
+    frontier = Frontier()
+    assert frontier.push("http://a/1", 0)
+    assert frontier.push("http://a/2", 1)
+    assert not frontier.push("http://a/1", 1)
+    assert len(frontier) == 2
+    assert drain(frontier) == [("http://a/1", 0), ("http://a/2", 1)]
+    # Popped URLs are still remembered
+    assert not frontier.push("http://a/1", 0)
+    assert frontier.pop() is None
+
+
+def test_waiting_url_keeps_its_smallest_depth():
+    frontier = Frontier()
+    frontier.push_many([("http://a/1", 3), ("http://a/1", 1), ("http://a/1", 2)])
+    assert drain(frontier) == [("http://a/1", 1)]
+    frontier.push("http://a/1", 0)
+    assert frontier.url_depths["http://a/1"] == 1
+
+
+def test_best_score_first_and_ties_in_discovery_order():
+    frontier = PriorityFrontier(UrlScorer(boosts=[("/docs/*", 5.0)]))
+    frontier.push_many([("http://a/blog/1", 1), ("http://a/docs/1", 1), ("http://a/blog/2", 1), ("http://a/deep", 3)])
+    assert [url for url, _ in drain(frontier)] == ["http://a/docs/1", "http://a/blog/1", "http://a/blog/2", "http://a/deep"]
+
+
+def test_inlinks_rescore_waiting_urls():
+    frontier = PriorityFrontier(UrlScorer(inlink_weight=1.0))
+    frontier.push_many([("http://a/1", 1), ("http://a/2", 1)])
+    frontier.push("http://a/2", 2)
+    assert len(frontier) == 2
+    assert drain(frontier) == [("http://a/2", 1), ("http://a/1", 1)]
+
+
+LINKS = {
+    "index.html": ["boost/a.html", "b.html"],
+    "boost/a.html": ["c.html"],
+    "boost/c.html": ["x.html"],  # x is first found here, one level past the limit
+    "b.html": ["boost/x.html"],  # and only later within it
+    "boost/x.html": [],
+}
+
+
+def test_page_first_found_past_the_depth_limit_is_crawled_from_a_shallower_page(site, tmp_path):
+    from mdcrawler.crawler.web_crawler import WebCrawler
+
+    for name, links in LINKS.items():
+        path = site.root / name
+        path.parent.mkdir(exist_ok=True)
+        anchors = "".join(f'<a href="{link}">{link}</a>' for link in links)
+        path.write_text(f"<html><body><h1>{name}</h1><p>{anchors}</p></body></html>", encoding="utf-8")
+    crawler = WebCrawler(str(tmp_path / "out"), depth=3, renderer="http", http2=False,
+                         boosts=[("/boost/*", 10.0)])
+    try:
+        assert crawler.crawl(f"{site.url}/index.html") == len(LINKS)
+    finally:
+        crawler.close()
+    assert "/boost/x.html" in site.requests
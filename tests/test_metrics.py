@@ -0,0 +1,48 @@
+import json
+import math
+import random
+
+from mdcrawler.utils.metrics import Histogram, Metrics
+
+
+def exact(values, q):
+    values = sorted(values)
+    return values[min(len(values), max(1, math.ceil(q * len(values)))) - 1]
+
+
+def test_histogram_quantiles_are_within_one_percent():
+    rng = random.Random(7)
+    values = [rng.lognormvariate(-3, 1.5) for _ in range(20000)] + [0.0] * 10
+    h = Histogram()
+    for value in values:
+        h.add(value)
+    assert h.count == len(values) and h.max == max(values) and math.isclose(h.sum, sum(values))
+    for q in (0.5, 0.95, 0.99, 1.0):
+        assert math.isclose(h.quantile(q), exact(values, q), rel_tol=0.011)
+    assert h.quantile(0.0001) == 0.0
+
+
+def test_memory_does_not_grow_with_pages(tmp_path):
+    metrics = Metrics(tmp_path / "trace.jsonl")
+    for n in range(5000):
+        url = f"http://site/{n}.html"
+        metrics.observe(url, "http_fetch", 0.01 + (n % 100) / 1000)
+        metrics.set(url, "html_bytes", 50000 + n)
+        metrics.page_done(url, "written")
+    assert not metrics._pages
+    assert len(metrics._histograms["http_fetch"]._buckets) < 100
+    metrics.close()
+    lines = (tmp_path / "trace.jsonl").read_text().splitlines()
+    assert len(lines) == 5000 and json.loads(lines[0])["html_bytes"] == 50000
+
+
+def test_summary_and_prometheus_report_every_stage():
+    metrics = Metrics()
+    metrics.observe("http://site/a", "convert", 0.5)
+    metrics.set("http://site/a", "peak_rss_bytes", 300 * 1048576)
+    metrics.count("retries")
+    summary = "\n".join(metrics.summary())
+    assert "convert" in summary and "300MB max" in summary and "retries: 1" in summary
+    prometheus = metrics.prometheus()
+    assert 'mdcrawler_stage_seconds_count{stage="convert"} 1' in prometheus
+    assert "mdcrawler_peak_rss_bytes_sum 314572800" in prometheus
@@ -0,0 +1,145 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from mdcrawler.crawler import politeness
+from mdcrawler.crawler.politeness import PolitenessScheduler
+
+URL = "http://example.com/page.html"
+
+
+@pytest.fixture
+def scheduler(fetcher):
+    return PolitenessScheduler(fetcher, max_per_host=2, respect_robots=False)
+
+
+def test_reconfiguring_a_busy_host_releases_the_slot_acquired(scheduler):
+    with scheduler.slot(URL):
+        scheduler.configure_host(URL, max_per_host=1)
+    # The old semaphore got its slot back and the new one was never over-released
+    with scheduler.slot(URL):
+        pass
+
+
+def test_new_cap_applies_to_requests_started_afterwards(scheduler):
+    scheduler.configure_host(URL, max_per_host=1)
+    entered, release = threading.Event(), threading.Event()
+
+    def hold():
+        with scheduler.slot(URL):
+            entered.set()
+            release.wait(5)
+
+    holder = threading.Thread(target=hold)
+    holder.start()
+    entered.wait(5)
+    second = threading.Event()
+
+    def take():
+        with scheduler.slot(URL):
+            second.set()
+
+    waiter = threading.Thread(target=take)
+    waiter.start()
+    assert not second.wait(0.2)
+    release.set()
+    holder.join()
+    assert second.wait(5)
+    waiter.join()
+
+
+class RobotsHandler(BaseHTTPRequestHandler):
+    """Serve robots.txt with the next status of the server's list, a page otherwise"""
+
+    def do_GET(self):
+        self.server.requests.append(self.path)
+        if self.path == "/robots.txt":
+            time.sleep(self.server.delay)
+            status = self.server.statuses.pop(0) if len(self.server.statuses) > 1 else self.server.statuses[0]
+            body = b"User-agent: *\nDisallow: /private/\n" if status == 200 else b"error"
+        else:
+            status, body = 200, b"<html><body>page</body></html>"
+        self.send_response(status)
+        if status != 200:
+            self.send_header("Retry-After", "120")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def robots_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), RobotsHandler)
+    server.requests, server.statuses, server.delay = [], [200], 0.0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    server.url = f"http://127.0.0.1:{server.server_address[1]}"
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def robots_scheduler(fetcher):
+    return PolitenessScheduler(fetcher, max_delay=0.01)
+
+
+def test_robots_rules_are_fetched_once(robots_server, fetcher):
+    scheduler = robots_scheduler(fetcher)
+    assert scheduler.allowed(f"{robots_server.url}/docs/a.html")
+    assert not scheduler.allowed(f"{robots_server.url}/private/b.html")
+    assert not scheduler.allowed(f"{robots_server.url}/private/b.html")
+    assert robots_server.requests == ["/robots.txt"]
+
+
+def test_missing_robots_allows_everything(robots_server, fetcher):
+    robots_server.statuses = [404]
+    assert robots_scheduler(fetcher).allowed(f"{robots_server.url}/private/b.html")
+
+
+def test_robots_server_error_is_retried(robots_server, fetcher):
+    robots_server.statuses = [503, 500, 200]
+    scheduler = robots_scheduler(fetcher)
+    assert scheduler.allowed(f"{robots_server.url}/docs/a.html")
+    assert not scheduler.allowed(f"{robots_server.url}/private/b.html")
+    assert robots_server.requests == ["/robots.txt"] * 3
+
+
+def test_unreachable_robots_disallows_the_host_for_a_while(robots_server, fetcher):
+    robots_server.statuses = [500]
+    scheduler = robots_scheduler(fetcher)
+    assert not scheduler.allowed(f"{robots_server.url}/docs/a.html")
+    assert not scheduler.allowed(f"{robots_server.url}/docs/b.html")
+    assert robots_server.requests == ["/robots.txt"] * politeness.ROBOTS_ATTEMPTS
+
+    # Once the server recovers and the disallow lapses, robots.txt is fetched again
+    robots_server.statuses = [200]
+    scheduler._host(robots_server.url).robots_expires = time.monotonic()
+    assert scheduler.allowed(f"{robots_server.url}/docs/a.html")
+
+
+def test_retry_waits_are_capped(robots_server, fetcher, monkeypatch):
+    monkeypatch.setattr(politeness, "ROBOTS_MAX_WAIT", 0.05)
+    robots_server.statuses = [503]
+    started = time.monotonic()
+    assert not PolitenessScheduler(fetcher).allowed(f"{robots_server.url}/docs/a.html")
+    # Retry-After asked for two minutes between attempts
+    assert time.monotonic() - started < 5
+
+
+def test_concurrent_callers_share_one_fetch(robots_server, fetcher):
+    robots_server.delay = 0.3
+    scheduler = robots_scheduler(fetcher)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(scheduler.allowed(f"{robots_server.url}/docs/a.html")))
+               for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == [True] * 4
+    assert robots_server.requests == ["/robots.txt"]
@@ -0,0 +1,47 @@
+from mdcrawler.crawler.rewriter import find_canonical, rewrite_html, truncate_html
+
+BASE = "http://example.com/docs/page.html"
+
+
+def test_images_and_anchors_become_markdown():
+    result = rewrite_html('<p><img src="a.png" alt="A"> see <a href="/b?x=1&amp;y=2">the <b>next</b>\n page</a></p>', BASE)
+    assert result.html == "<p>![A](http://example.com/docs/a.png) see [the next page](http://example.com/b?x=1&amp;y=2)</p>"
+    assert result.images == ["a.png"]
+    assert result.links == ["/b?x=1&y=2"]
+
+
+def test_linked_image_and_empty_anchor():
+    result = rewrite_html('<a href="big.png"><img src=thumb.png></a><a href="#top"></a>', BASE)
+    assert result.html == ("[![image](http://example.com/docs/thumb.png)](http://example.com/docs/big.png)"
+                           "[link](http://example.com/docs/page.html#top)")
+
+
+def test_tags_in_scripts_comments_and_attributes_are_left_alone():
+    page = ('<script>var s = "<a href=x>";</script><!-- <img src=y> -->'
+            '<a title="1 > 0" href=z>z</a><a name=anchor>kept</a>')
+    result = rewrite_html(page, BASE)
+    assert result.html == ('<script>var s = "<a href=x>";</script><!-- <img src=y> -->'
+                           '[z](http://example.com/docs/z)<a name=anchor>kept</a>')
+    assert result.links == ["z"]
+
+
+def test_unclosed_anchor_is_kept_as_is():
+    assert rewrite_html('<a href="x">one <a href="y">two</a>', BASE).html == '<a href="x">one [two](http://example.com/docs/y)'
+
+
+def test_canonical_is_read_from_the_head_only():
+    head = '<head><link href="/canonical.html?a=1&amp;b=2" rel="Canonical"></head>'
+    assert find_canonical(head, BASE) == "http://example.com/canonical.html?a=1&b=2"
+    assert find_canonical('<head></head><body><link rel=canonical href=/x></body>', BASE) is None
+
+
+def test_truncation_does_not_split_a_tag():
+    assert truncate_html("<p>one</p><p>two</p>", 12) == "<p>one</p>"
+    assert truncate_html("<p>one</p>", 100) == "<p>one</p>"
+
+
+def test_truncation_counts_utf8_bytes():
+    page = "<p>" + "é" * 100 + "</p>"
+    assert truncate_html(page, 50) == "<p>" + "é" * 23
+    assert truncate_html("<p>€€</p><p>x</p>", 13) == "<p>€€</p>"
+    assert truncate_html("<p>€€</p><p>x</p>", 12) == "<p>€€"
@@ -0,0 +1,79 @@
+import json
+
+import pytest
+
+from mdcrawler.crawler.sharding import ShardedCrawlState, SharedContentIndex, merge_mirrors
+from mdcrawler.crawler.state import shard_of
+
+URLS = [f"http://a/{n}.html" for n in range(20)]
+
+
+@pytest.fixture
+def nodes(tmp_path):
+    nodes = [ShardedCrawlState(tmp_path / "state.sqlite", shard, 2, poll_interval=0.01) for shard in range(2)]
+    yield nodes
+    for node in nodes:
+        node.close()
+
+
+def drain(node):
+    return [url for url, _ in iter(node.pop, None)]
+
+
+def test_shard_of_is_stable_and_spreads_urls():
+    assert shard_of("http://a/1.html", 4) == shard_of("http://a/1.html", 4)
+    assert {shard_of(url, 2) for url in URLS} == {0, 1}
+
+
+def test_each_node_pops_only_its_own_shard(nodes):
+    first, second = nodes
+    first.push_many((url, 1) for url in URLS)
+    assert not second.push(URLS[0], 0)
+    popped = [drain(first), drain(second)]
+    for shard in range(2):
+        assert popped[shard] == [url for url in URLS if shard_of(url, 2) == shard]
+
+
+def test_first_spelling_claimed_wins_for_every_node(nodes):
+    first, second = nodes
+    assert first.claim_form("a/page", "http://a/page/") == "http://a/page/"
+    assert second.claim_form("a/page", "http://A/page") == "http://a/page/"
+
+
+def test_idle_node_waits_while_another_has_work(nodes):
+    first, second = nodes
+    second.push_many((url, 1) for url in URLS if shard_of(url, 2) == 0)
+    assert second.pop() is None
+    assert second.wait_for_work()
+    nodes.remove(first)
+    first.close()
+    assert not second.wait_for_work()
+
+
+def test_duplicates_are_found_across_nodes(nodes):
+    first, second = nodes
+    page = "<p>" + " ".join(f"word{n}" for n in range(200)) + "</p>"
+    assert SharedContentIndex(first).add("http://a/1.html", page) is None
+    assert SharedContentIndex(second).add("http://a/2.html", page) == "http://a/1.html"
+    # A node meeting its own page again in a later run keeps it
+    assert SharedContentIndex(first).add("http://a/1.html", page) is None
+
+
+def test_merge_mirrors(tmp_path, capsys):
+    sources = [tmp_path / "shard-0", tmp_path / "shard-1"]
+    for n, source in enumerate(sources):
+        (source / "docs").mkdir(parents=True)
+        (source / "docs" / f"page-{n}.md").write_text(f"page {n}")
+        (source / "index.md").write_text(f"index from shard {n}")
+        (source / ".mdcrawler_state.sqlite").write_text("node file")
+        (source / "aliases.json").write_text(json.dumps({f"http://a/{n}-copy": f"http://a/{n}"}))
+    output = tmp_path / "mirror"
+
+    stats = merge_mirrors(sources, output)
+    assert stats == {"files": 3, "unchanged": 0, "conflicts": 1, "aliases": 2}
+    assert "Conflict" in capsys.readouterr().out
+    assert (output / "index.md").read_text() == "index from shard 0"
+    assert sorted(p.relative_to(output).as_posix() for p in output.rglob("*") if p.is_file()) == [
+        "aliases.json", "docs/page-0.md", "docs/page-1.md", "index.md"]
+
+    assert merge_mirrors(sources, output)["unchanged"] == 3
@@ -0,0 +1,61 @@
+import gzip
+from datetime import date
+
+from mdcrawler.crawler.sitemap import SitemapEntry, SitemapReader
+
+IMAGE_SITEMAP = """<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"
+        xmlns:image="http://www.google.com/schemas/sitemap-image/1.1">
+  <url>
+    <loc>http://example.com/gallery.html</loc>
+    <lastmod>2024-05-01</lastmod>
+    <image:image>
+      <image:loc>http://cdn.example.com/photo-1.jpg</image:loc>
+    </image:image>
+    <image:image>
+      <image:loc>http://cdn.example.com/photo-2.jpg</image:loc>
+    </image:image>
+    <priority>0.8</priority>
+  </url>
+  <url>
+    <image:image><image:loc>http://cdn.example.com/photo-3.jpg</image:loc></image:image>
+    <loc>http://example.com/about.html</loc>
+  </url>
+</urlset>
+"""
+
+INDEX = """<?xml version="1.0" encoding="UTF-8"?>
+<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <sitemap><loc>{base}/old.xml</loc><lastmod>2020-01-01</lastmod></sitemap>
+  <sitemap><loc>{base}/new.xml.gz</loc><lastmod>2024-06-01</lastmod></sitemap>
+</sitemapindex>
+"""
+
+URLSET = """<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{}</urlset>"""
+
+
+def read_all(fetcher, url, since=None):
+    reader = SitemapReader(fetcher, url, since=since)
+    try:
+        return list(reader)
+    finally:
+        reader.close()
+
+
+def test_image_locs_do_not_replace_page_loc(site, fetcher):
+    (site.root / "sitemap.xml").write_text(IMAGE_SITEMAP, encoding="utf-8")
+    assert read_all(fetcher, f"{site.url}/sitemap.xml") == [
+        SitemapEntry("http://example.com/gallery.html", "2024-05-01", 0.8),
+        SitemapEntry("http://example.com/about.html"),
+    ]
+
+
+def test_index_skips_old_children_and_reads_gzip(site, fetcher):
+    (site.root / "index.xml").write_text(INDEX.format(base=site.url), encoding="utf-8")
+    (site.root / "old.xml").write_text(URLSET.format("<url><loc>http://example.com/old.html</loc></url>"))
+    (site.root / "new.xml.gz").write_bytes(gzip.compress(URLSET.format(
+        "<url><loc>http://example.com/new.html</loc><lastmod>2024-06-01</lastmod></url>"
+        "<url><loc>http://example.com/stale.html</loc><lastmod>2023-01-01</lastmod></url>"
+        "<url><loc>http://example.com/undated.html</loc></url>").encode()))
+    entries = read_all(fetcher, f"{site.url}/index.xml", since=date(2024, 1, 1))
+    assert [entry.url for entry in entries] == ["http://example.com/new.html", "http://example.com/undated.html"]
@@ -0,0 +1,51 @@
+from mdcrawler.crawler.scoring import UrlScorer
+from mdcrawler.crawler.state import STATE_FILENAME, CrawlState
+
+
+def test_frontier_visited_and_paths(tmp_path):
+    state = CrawlState(tmp_path)
+    assert state.is_empty()
+    state.push_many([("http://a/1", 0), ("http://a/2", 1)])
+    assert not state.push("http://a/1", 2)
+    assert len(state) == 2
+
+    assert state.pop() == ("http://a/1", 0)
+    state.visited.add("http://a/1")
+    state.url_to_path["http://a/1"] = "1.md"
+    state.done("http://a/1")
+    assert "http://a/1" in state.visited and "http://a/2" not in state.visited
+    assert dict(state.url_to_path) == {"http://a/1": "1.md"}
+    assert state.completed() == 1
+    state.close()
+
+
+def test_resume_requeues_unfinished_pages(tmp_path):
+    state = CrawlState(tmp_path)
+    state.push_many([("http://a/1", 0), ("http://a/2", 1), ("http://a/3", 1)])
+    url, _ = state.pop()
+    state.done(url)
+    state.pop()  # in progress when the crawl stops
+    state.close()
+
+    state = CrawlState(tmp_path, resume=True)
+    assert state.completed() == 1
+    assert [state.pop(), state.pop(), state.pop()] == [("http://a/2", 1), ("http://a/3", 1), None]
+    state.close()
+
+
+def test_fresh_crawl_starts_over(tmp_path):
+    state = CrawlState(tmp_path)
+    state.push("http://a/1", 0)
+    state.close()
+    assert (tmp_path / STATE_FILENAME).exists()
+    state = CrawlState(tmp_path)
+    assert state.is_empty()
+    state.close()
+
+
+def test_scorer_orders_the_queue_and_counts_inlinks(tmp_path):
+    state = CrawlState(tmp_path, scorer=UrlScorer(inlink_weight=1.0))
+    state.push_many([("http://a/1", 1), ("http://a/2", 1), ("http://a/3", 0)])
+    state.push("http://a/2", 2)
+    assert [state.pop()[0] for _ in range(3)] == ["http://a/3", "http://a/2", "http://a/1"]
+    state.close()